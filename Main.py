@@ -3,52 +3,192 @@ import pandas as pd
 import datetime
 import time
 
+import archive
+import cadence
+import confirmation_emails as ce
+import event_log
 import funcs as fns
+import ical
 import google_utils as gu
+import jobs
 import assign_schedule as assign
-
-
-MLATML_FOLDER_ID = st.secrets["mlatml_folder_id"]  # Folder ID for ML@ML
-MLATML_SLIDES_FOLDER_ID = st.secrets[
+import concurrency
+import search_index as si
+import slide_pool
+import schedule_model as sm
+import storage
+import tenancy
+import usage_stats
+import write_coalescer
+
+
+# The reading group is picked by ?group=<name>; without it the top-level
+# secrets are used (single-group deployment)
+tenant = tenancy.resolve_tenant(st.query_params)
+if tenant is None:
+    st.error("Unknown group.")
+    st.stop()
+
+MLATML_FOLDER_ID = tenant["mlatml_folder_id"]  # Folder ID for ML@ML
+MLATML_SLIDES_FOLDER_ID = tenant[
     "mlatml_slides_folder_id"
 ]  # Folder ID for ML@ML Slides
 
-SLIDES_TEMPLATE_ID = st.secrets["slides_template_id"]  # Template file ID for slides
-ZOOM_LINK = st.secrets["zoom_link"]  # Zoom link for the meeting
+SLIDES_TEMPLATE_ID = tenant["slides_template_id"]  # Template file ID for slides
+SLIDES_POOL_SIZE = int(tenant.get("slides_pool_size", slide_pool.DEFAULT_POOL_SIZE))
+ZOOM_LINK = tenant["zoom_link"]  # Zoom link for the meeting
+# Pause before a confirmation page returns to the schedule
+REDIRECT_SECONDS = float(tenant.get("redirect_seconds", 3))
+
+store = tenant.storage  # Backend from the [storage] config (Sheets by default)
+meeting_cadence = cadence.cadence_from_config(tenant.get("cadence", {}))
+
+
+# Cached per tenant and shared read-only across that tenant's sessions
+@tenancy.tenant_cache(ttl=300, max_entries=1)
+def load_schedule_model(tenant):
+    return sm.ScheduleModel(tenant.storage.get_schedule_df())
+
+
+@tenancy.tenant_cache(ttl=300, max_entries=1)
+def load_participants_data(tenant):
+    return tenant.storage.get_participants_list()
+
 
+@tenancy.tenant_cache(ttl=300, max_entries=1)
+def load_materials_data(tenant):
+    return tenant.storage.get_materials()
 
-@st.cache_data(ttl=300)
-def load_schedule_data():
-    return gu.get_schedule_df()
 
+# Archived meetings only change when the archive job runs, and are read only
+# for past dates (see archive.py)
+@tenancy.tenant_cache(ttl=3600, max_entries=1)
+def load_archived_schedule(tenant):
+    return archive.archived_schedule(tenant.archive)
 
-@st.cache_data(ttl=300)
-def load_participants_data():
-    return gu.get_participants_list()
 
+@tenancy.tenant_cache(ttl=3600, max_entries=1)
+def load_archived_materials(tenant):
+    return archive.archived_materials(tenant.archive)
 
-@st.cache_data(ttl=300)
-def load_materials_data():
-    ws = gu.get_sheet("Materials")
-    all_records = ws.get_all_records()
-    return all_records
 
+@tenancy.tenant_cache(max_entries=2)
+def load_full_schedule_model(tenant, version):
+    # Hot rows plus the archive, for usage over windows beyond the horizon
+    return sm.ScheduleModel(
+        archive.with_archive(
+            load_schedule_model(tenant).frame, load_archived_schedule(tenant)
+        )
+    )
 
-@st.cache_data(ttl=300)
-def load_slides_data(selected_date_str):
-    existing_slide = gu.find_slide(selected_date_str)
+
+@tenancy.tenant_cache(ttl=300, max_entries=32)
+def load_slides_data(tenant, selected_date_str):
+    existing_slide = tenant.storage.find_slide(selected_date_str)
     return existing_slide
 
 
+@tenancy.tenant_cache(ttl=300, max_entries=1)
+def load_schedule_history(tenant):
+    return tenant.storage.get_schedule_events()
+
+
+@tenancy.tenant_cache(ttl=300, max_entries=1)
+def load_unavailability(tenant):
+    return tenant.storage.get_unavailability()
+
+
+@tenancy.tenant_cache(ttl=300, max_entries=1)
+def load_all_slides(tenant):
+    return tenant.storage.get_slides()
+
+
+@tenancy.tenant_cache(max_entries=1)
+def load_usage_aggregates(tenant):
+    # Long-lived; sync() applies only the cells that changed
+    return usage_stats.UsageAggregates([sm.Status.ACCEPTED])
+
+
+@tenancy.tenant_cache(max_entries=1)
+def load_calendar_feeds(tenant):
+    # Long-lived; update() only regenerates feeds whose rows changed
+    return ical.CalendarFeeds(group=tenant.name)
+
+
+@tenancy.tenant_cache(max_entries=2)
+def load_schedule_search_index(tenant, version):
+    # Built once per schedule version
+    model = load_schedule_model(tenant)
+    return si.build_search_index(
+        model.names[role].astype(object).fillna("") for role in model.roles
+    )
+
+
+@tenancy.tenant_cache(max_entries=2)
+def load_participants_search_index(tenant, names):
+    return si.build_search_index([names])
+
+
+@tenancy.tenant_cache(max_entries=8)
+def schedule_css(tenant, version, rows, columns):
+    # Keyed by schedule version and visible rows, so unchanged tables reuse it
+    return fns.schedule_styles(load_schedule_model(tenant), list(rows), list(columns))
+
+
+@tenancy.tenant_cache(max_entries=8)
+def score_css(tenant, scores):
+    return fns.score_styles(scores)
+
+
+def snapshot_revalidated(kind):
+    # After a restart the first page is drawn from the local snapshot; when the
+    # background re-read finds newer data, drop what was cached from it
+    loaders = {
+        "schedule": [load_schedule_model],
+        "participants": [load_participants_data],
+        "materials": [load_materials_data],
+        "slides": [load_slides_data, load_all_slides],
+    }
+    for loader in loaders[kind]:
+        loader.clear(tenant)
+
+
+if getattr(store, "snapshot", False):
+    store.on_revalidated("main", snapshot_revalidated)
+
+if tenant.get("jobs", {}).get("in_app"):
+    # Reminders, auto-fill and escalation on their cron schedules (jobs.py)
+    jobs.get_scheduler(tenant).start()
+
+
 def refresh_main():
-    load_schedule_data.clear()
-    load_participants_data.clear()
+    load_schedule_model.clear(tenant)
+    load_participants_data.clear(tenant)
     st.rerun()
 
 
+def note_unfilled(filled_df):
+    # Slots nobody was eligible for stay EMPTY; say so after the rerun
+    left = assign.empty_slots(filled_df)
+    if left:
+        st.session_state["fill_notice"] = (
+            f"{left} slot(s) are still EMPTY: nobody eligible was free "
+            "(away, or presenting too recently)."
+        )
+
+
+def save_schedule(edit, current=None):
+    """Save `edit(schedule_df)`, re-applying it if someone else saved first."""
+    with event_log.acting_as("admin"):
+        return concurrency.retry_schedule_write(
+            store, lambda df: edit(sm.ScheduleModel(df).frame), current
+        )
+
+
 def refresh_detail():
-    load_schedule_data.clear()
-    load_materials_data.clear()
+    load_schedule_model.clear(tenant)
+    load_materials_data.clear(tenant)
+    load_schedule_history.clear(tenant)
     st.rerun()
 
 
@@ -109,8 +249,8 @@ params = st.query_params
 
 def redirect_to_schedule():
     with st.spinner("Redirecting back to the schedule..."):
-        time.sleep(3)
-        st.query_params.clear()
+        time.sleep(REDIRECT_SECONDS)
+        tenant.reset_query_params(st.query_params)
         st.rerun()
 
 
@@ -138,17 +278,16 @@ if "confirmation" in params:
     # check that the name in the date starts with [P], otherwise, say that the form has been used already and redirect to the schedule
     # Load the schedule DataFrame.
     with st.spinner("Loading data. Please wait..."):
-        df = gu.get_schedule_df()
-        row_indices = df.index[df["Date"] == meeting_date].tolist()
+        model = sm.ScheduleModel(store.get_schedule_df())
+        df = model.frame
+        row_indices = df.index[model.dates.dt.date == meeting_date].tolist()
         if not row_indices:
             st.error("No meeting scheduled for this date.")
             st.stop()
         row_idx = row_indices[0]
 
-    if not any(
-        df.at[row_idx, role].startswith("[P]")
-        for role in ["Presenter 1", "Presenter 2"]
-    ):
+    _, pending_person = sm.parse_cell(pending_name)
+    if role not in model.roles or model.status.at[row_idx, role] is not sm.Status.PENDING:
         st.error(
             "This form has already been used, please contact the organizer if you need to change your response."
         )
@@ -156,7 +295,7 @@ if "confirmation" in params:
 
     st.subheader("Schedule form 📝")
     st.write(
-        f"Dear **{''.join(pending_name.split()[1:])}**, you have been randomly scheduled to present for 20 minutes on **{meeting_date.strftime('%B %d, %Y')}** as **{role}**. If you either are unable to present on this date **or** would like to have 40 minutes instead, choose the 'Reschedule' option."
+        f"Dear **{pending_person}**, you have been randomly scheduled to present for 20 minutes on **{meeting_date.strftime('%B %d, %Y')}** as **{role}**. If you either are unable to present on this date **or** would like to have 40 minutes instead, choose the 'Reschedule' option."
     )
     st.write("**Please select one of the options below:**")
 
@@ -181,33 +320,40 @@ if "confirmation" in params:
     # Use a placeholder to display results/messages.
     response_placeholder = st.empty()
 
+    def answer(new_status):
+        # Answers arrive in bursts after a batch of emails, so they go through
+        # the shared coalescer: one batched save per window instead of per click
+        def update(cell):
+            # Re-checked against the latest schedule in case it changed meanwhile
+            status, name = sm.parse_cell(cell)
+            if status is not sm.Status.PENDING:
+                raise storage.ConflictError("This form has already been used.")
+            return sm.format_cell(new_status, name)
+
+        window = tenant.get("storage", {}).get("write_window_ms", 500) / 1000
+        coalescer = write_coalescer.get_coalescer(store, window)
+        try:
+            coalescer.submit(meeting_date, role, update).result(timeout=60)
+        except storage.ConflictError:
+            response_placeholder.error(
+                "This form has already been used, please contact the organizer if you need to change your response."
+            )
+            redirect_to_schedule()
+
     if clicked_option == "Confirm":
         # Confirm: remove the "[P]" marker.
-        current_value = df.at[row_idx, role]
-        if current_value.startswith("[P]"):
-            new_value = current_value.replace("[P]", "").strip()
-        else:
-            new_value = current_value
-        df.at[row_idx, role] = new_value
-        gu.save_schedule_df(df)
+        answer(sm.Status.ACCEPTED)
         response_placeholder.success("Thank you, your presentation has been confirmed!")
         redirect_to_schedule()
 
     elif clicked_option == "Reschedule":
-        current_value = df.at[row_idx, role]
-        if current_value.startswith("[P]"):
-            new_value = current_value.replace("[P]", "[R]")
-        else:
-            new_value = current_value
-        df.at[row_idx, role] = new_value
-        gu.save_schedule_df(df)
+        answer(sm.Status.RESCHEDULE)
         response_placeholder.success("Please contact us for rescheduling.")
         redirect_to_schedule()
 
     elif clicked_option == "Decline":
         # Don't want: use a form inside an expander to keep it visible after submission.
-        df.at[row_idx, role] = "EMPTY"
-        gu.save_schedule_df(df)
+        answer(sm.Status.EMPTY)
         response_placeholder.success("Your response has been recorded.")
         redirect_to_schedule()
 
@@ -223,28 +369,41 @@ elif "date" in params:
     # st.title("")
 
     try:
-        df = load_schedule_data()
+        # Independent reads: fetched concurrently rather than one after another
+        model, existing_slide, all_records = gu.gather(
+            (load_schedule_model, tenant),
+            (load_slides_data, tenant, selected_date_str),
+            (load_materials_data, tenant),
+        )
     except FileNotFoundError:
         st.error("Schedule not found!")
         st.stop()
 
-    df.fillna("", inplace=True)
-
-    # Convert date column properly
-    if "Date" in df.columns:
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df = df[df["Date"].notna()]
-        df["Date"] = df["Date"].dt.date
-    else:
+    if not model.has_dates:
         st.warning("No 'Date' column found in CSV.")
         st.stop()
+    df = model.frame[model.dates.notna()]
 
     # 3. Filter to this date’s row(s)
     day_df = df[df["Date"] == selected_date]
+    archived_day = False
+    if day_df.empty:
+        # Meetings past the archive horizon are only found in the archive
+        archived = load_archived_schedule(tenant)
+        if "Date" in archived.columns:
+            day_df = archived[archived["Date"] == selected_date]
+        archived_day = not day_df.empty
+        if archived_day:
+            all_records = load_archived_materials(tenant)
     if day_df.empty:
         st.warning("No entries found for this date.")
         st.stop()
 
+    # This date's PDFs not text-extracted yet (e.g. added before extraction existed)
+    tenant.pdf_text.backfill(
+        [r for r in all_records if str(r.get("Date")) == selected_date_str]
+    )
+
     # 4. Show info about presenters
     role_cols = ["Presenter 1", "Presenter 2"]
     role_cols = [col for col in role_cols if col in day_df.columns]
@@ -259,7 +418,6 @@ elif "date" in params:
                 ps.append(row[col])
                 st.write(f"##### 🚀 &nbsp; **{col}**: {row[col]}")
 
-    existing_slide = load_slides_data(selected_date_str)
     st.write(f" ")
 
     # col1, col2, _, _ = st.columns(4)
@@ -270,31 +428,44 @@ elif "date" in params:
             # st.markdown(f"##### [View Slides]({existing_slide['Presentation_Link']})")
             st.link_button("View Slides", existing_slide["Presentation_Link"])
         else:
+            pool = None
+            if SLIDES_POOL_SIZE > 0:
+                # Keep decks ready for the upcoming meetings that still need one
+                pool = slide_pool.get_pool(
+                    SLIDES_TEMPLATE_ID, MLATML_SLIDES_FOLDER_ID, SLIDES_POOL_SIZE
+                )
+                pool.ensure(slide_pool.decks_wanted(model, load_all_slides(tenant)))
             if st.button("Make Slides", key=f"main_slides_{idx}"):
-                try:
-                    from googleapiclient.errors import HttpError
-
-                    drive_service = gu.get_drive_service()
-                    file = (
-                        drive_service.files().get(fileId=SLIDES_TEMPLATE_ID).execute()
+                deck = pool.take(selected_date_str, ps[0], ps[1]) if pool else None
+                if deck is None:
+                    try:
+                        from googleapiclient.errors import HttpError
+
+                        drive_service = gu.get_drive_service()
+                        file = (
+                            drive_service.files()
+                            .get(fileId=SLIDES_TEMPLATE_ID)
+                            .execute()
+                        )
+                    except HttpError as e:
+                        st.error(f"Template file not found or access denied: {e}")
+
+                    deck = gu.generate_presentation(
+                        selected_date_str,
+                        ps[0],
+                        ps[1],
+                        SLIDES_TEMPLATE_ID,
+                        folder_id=MLATML_SLIDES_FOLDER_ID,
                     )
-                except HttpError as e:
-                    st.error(f"Template file not found or access denied: {e}")
-
-                presentation_id, presentation_link = gu.generate_presentation(
-                    selected_date_str,
-                    ps[0],
-                    ps[1],
-                    SLIDES_TEMPLATE_ID,
-                    folder_id=MLATML_SLIDES_FOLDER_ID,
-                )
+                presentation_id, presentation_link = deck
                 if presentation_id and presentation_link:
                     # Save slide entry using date, presentation ID, and link
-                    gu.add_slide_entry(
+                    store.add_slide_entry(
                         selected_date_str, presentation_id, presentation_link
                     )
                     st.success("Slides generated successfully.")
-                    load_slides_data.clear()
+                    load_slides_data.clear(tenant)
+                    load_all_slides.clear(tenant)
                     st.rerun()
 
     with col2:
@@ -304,9 +475,6 @@ elif "date" in params:
     st.write("---")
     st.subheader("Documents 📚")
 
-    ws = gu.get_sheet("Materials")
-    all_records = load_materials_data()
-
     target_rows = []  # list of tuples (row_index, material_record)
     for idx, record in enumerate(
         all_records, start=2
@@ -327,10 +495,15 @@ elif "date" in params:
                 drive_link = mat["PDF_Link"]
                 href = f'<a href="{drive_link}" target="_blank">View PDF</a>'
                 st.markdown(href, unsafe_allow_html=True)
-
-            # Remove button for this material
-            if st.button(f"Remove document", key=f"remove_{row_idx}"):
-                ws.delete_rows(row_idx)
+                document = tenant.pdf_text.index.get(drive_link)
+                if document and document["keywords"]:
+                    st.caption("Keywords: " + ", ".join(document["keywords"][:8]))
+
+            # Remove button for this material (archived ones are read-only)
+            if not archived_day and st.button(
+                f"Remove document", key=f"remove_{row_idx}"
+            ):
+                store.delete_material_row(row_idx)
                 refresh_detail()  # Rerun to refresh the list after deletion
                 st.success(f"Removed material: {mat['Title']}")
                 st.rerun()  # Rerun to refresh the list after deletion
@@ -363,9 +536,11 @@ elif "date" in params:
                         mime_type,
                         parent_folder_id=MLATML_FOLDER_ID,
                     )
+                    # Text for search is extracted in the background
+                    tenant.pdf_text.submit(drive_link, pdf_name, pdf_bytes)
 
                 # Pass the description to add_material
-                gu.add_material(
+                store.add_material(
                     selected_date_str,
                     new_title.strip(),
                     new_description.strip(),  # Pass the description here
@@ -377,10 +552,27 @@ elif "date" in params:
                 st.success("Material added successfully.")
                 st.rerun()
 
+    if getattr(store, "event_log", False):
+        # Who confirmed, declined or was assigned for this meeting, and when
+        with st.expander("History 🕓"):
+            history = [
+                e
+                for e in load_schedule_history(tenant)
+                if e["Date"] == selected_date_str and e["Role"] != event_log.SNAPSHOT
+            ]
+            if history:
+                st.dataframe(
+                    pd.DataFrame(history).drop(columns="Date"),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+            else:
+                st.info("No recorded changes for this meeting.")
+
     st.write("---")
     # "Back to Schedule" button
     if st.button("Back to Schedule"):
-        st.query_params.clear()
+        tenant.reset_query_params(st.query_params)
         st.rerun()
 
 
@@ -391,24 +583,34 @@ else:
     # For demonstration, let's have a simple 'admin' text input in the sidebar
     admin_mode = False
     admin_password = st.sidebar.text_input("Admin password:", type="password")
-    pw = st.secrets["admin_password"]
+    pw = tenant["admin_password"]
     if admin_password == pw:
         admin_mode = True
 
+    # How participation is counted, for the scores and for filling empty slots
+    window_label = st.sidebar.selectbox(
+        "Usage window:", list(usage_stats.WINDOW_OPTIONS), index=1
+    )
+    half_life_label = st.sidebar.selectbox(
+        "Usage decay half-life:", list(usage_stats.HALF_LIFE_OPTIONS)
+    )
+    window_days = usage_stats.WINDOW_OPTIONS[window_label]
+    half_life_days = usage_stats.HALF_LIFE_OPTIONS[half_life_label]
+
+    # Participants are needed further down; load them while the schedule loads
+    participants_future = gu.get_executor().submit(load_participants_data, tenant)
+
     # Load schedule CSV
     try:
-        df_full = load_schedule_data()
+        model = load_schedule_model(tenant)
     except FileNotFoundError:
         st.error("Schedule not found!")
         st.stop()
 
-    df_full.fillna("", inplace=True)
-    # Convert Date column if present
-    if "Date" in df_full.columns:
-        df_full["Date"] = pd.to_datetime(df_full["Date"], errors="coerce").dt.date
-    else:
+    if not model.has_dates:
         st.warning("No 'Date' column found in CSV.")
         st.stop()
+    df_full = model.frame
 
     st.title("Weekly Schedule :calendar:")
 
@@ -425,7 +627,7 @@ else:
         hide_past = st.checkbox("Hide past dates", value=True)
         today = datetime.date.today()
         if hide_past:
-            df = df[df["Date"] >= today]
+            df = df[model.dates >= pd.Timestamp(today)]
         else:
             df = df_full.copy()
 
@@ -441,10 +643,13 @@ else:
         role_cols = [c for c in role_cols if c in df.columns]
 
         if search_name.strip():
-            mask = False
-            for c in role_cols:
-                mask = mask | df[c].str.contains(search_name, case=False, na=False)
-            df = df[mask]
+            search_index = load_schedule_search_index(tenant, model.version)
+            matched = df_full.index[search_index.lookup(search_name)]
+            df = df[df.index.isin(matched)]
+
+        if "fill_notice" in st.session_state:
+            # Set before the rerun that follows a fill
+            st.warning(st.session_state.pop("fill_notice"))
 
         # Show a read-only or editable schedule
         if df.empty:
@@ -482,54 +687,53 @@ else:
                 with col1:
                     if st.button("Save Changes"):
 
-                        updated_df = df_full.copy()
+                        updated_df, _, _ = fns.merge_schedule_edits(
+                            df_full, edited_df
+                        )
+                        conflicts = []
 
-                        if "Date" in edited_df.columns:
-                            edited_df["Date"] = pd.to_datetime(
-                                edited_df["Date"], errors="coerce"
-                            ).dt.date
-                        updated_df["Date"] = pd.to_datetime(
-                            updated_df["Date"], errors="coerce"
-                        ).dt.date
+                        def apply_edits(current):
+                            # Our edits on top of whatever was saved since we loaded
+                            merged, conflicts[:] = concurrency.merge_schedule(
+                                df_full, updated_df, current
+                            )
+                            return merged
 
-                        for idx, row in edited_df.iterrows():
-                            mask = updated_df["Date"] == row["Date"]
-                            if not mask.any():
-                                updated_df.loc[len(updated_df)] = row
+                        try:
+                            save_schedule(apply_edits, df_full)
+                        except storage.ConflictError:
+                            message_placeholder.error(
+                                "The schedule keeps changing, please try again."
+                            )
+                        else:
+                            load_schedule_model.clear(tenant)
+                            if conflicts:
+                                cells = ", ".join(
+                                    f"{date} {col or 'row'}"
+                                    for date, col, _ in conflicts
+                                )
+                                message_placeholder.warning(
+                                    f"Saved, but someone else changed these first and their values were kept: {cells}"
+                                )
                             else:
-                                updated_df.loc[mask, updated_df.columns] = row.values
-
-                        gu.save_schedule_df(updated_df)
-                        message_placeholder.success("Schedule updated and saved!")
+                                message_placeholder.success(
+                                    "Schedule updated and saved!"
+                                )
 
                 with col2:
                     if st.button("Add Row"):
-                        # Use a copy of df_full for modification
-                        updated_df = df_full.copy()
-                        if not updated_df.empty and "Date" in updated_df.columns:
-                            last_date = updated_df["Date"].max()
-                        else:
-                            last_date = datetime.date.today()
-                        next_wed = fns.get_next_wednesday(last_date)
-
-                        # Create a new row with default values using updated_df's columns
-                        new_row = {}
-                        for col in updated_df.columns:
-                            if col == "Date":
-                                new_row[col] = next_wed
-                            elif "Presenter" in col:
-                                new_row[col] = "EMPTY"
-                            else:
-                                new_row[col] = ""
-                        new_row_df = pd.DataFrame([new_row])
 
-                        # Append the new row to our copy
-                        updated_df = pd.concat(
-                            [updated_df, new_row_df], ignore_index=True
-                        )
-                        if "Date" in updated_df.columns:
-                            updated_df["Date"] = updated_df["Date"].astype(str)
-                        gu.save_schedule_df(updated_df)
+                        def add_row(updated_df):
+                            # The next meeting after the last one, per [cadence]
+                            return cadence.append_meetings(
+                                updated_df,
+                                cadence.next_meeting_dates(
+                                    updated_df, 1, meeting_cadence
+                                ),
+                            )
+
+                        updated_df = save_schedule(add_row, df_full)
+                        next_wed = updated_df["Date"].iloc[-1]
                         refresh_main()
                         message_placeholder.success(
                             f"Added new row for date: {next_wed}"
@@ -538,14 +742,22 @@ else:
 
                 with col3:
                     if st.button("Send Confirmation Emails"):
-                        result = gu.send_confirmation_emails()
+                        result = ce.send_confirmation_emails(tenant)
                         # st.info(result)
                         message_placeholder.info(result)
 
                 with col4:
                     if st.button("Fill empty slots"): 
-                        filled_df = assign.fill_empty_slots(seed=0) 
-                        gu.save_schedule_df(filled_df)
+                        with event_log.acting_as("auto-fill"):
+                            filled_df = assign.fill_empty_slots(
+                                seed=0,
+                                store=store,
+                                save=True,
+                                window_days=window_days,
+                                half_life_days=half_life_days,
+                                archive=tenant.archive,
+                            )
+                        note_unfilled(filled_df)
                         refresh_main()
                         st.rerun()
 
@@ -569,13 +781,18 @@ else:
                     with col_del2:
                         if st.button("Delete"):
                             selected_index = row_dict[selected_label]
-                            # Work on a copy of the full schedule, preserving all rows
-                            updated_df = df_full.copy()
-                            # Remove the row using the original index
-                            updated_df = updated_df.drop(index=selected_index)
-                            if "Date" in updated_df.columns:
-                                updated_df["Date"] = updated_df["Date"].astype(str)
-                            gu.save_schedule_df(updated_df)
+                            selected_date = df_full.at[selected_index, "Date"]
+
+                            def delete_row(updated_df):
+                                # Match by date: row positions may have shifted
+                                updated_df = updated_df[
+                                    updated_df["Date"] != selected_date
+                                ].reset_index(drop=True)
+                                if "Date" in updated_df.columns:
+                                    updated_df["Date"] = updated_df["Date"].astype(str)
+                                return updated_df
+
+                            save_schedule(delete_row, df_full)
                             refresh_main()
                             message_placeholder.success(
                                 f"Deleted row at index {selected_index}."
@@ -587,17 +804,16 @@ else:
                 # st.dataframe(df, use_container_width=True)
 
                 # 1) Create a column with just the link (relative query param)
-                df["DetailsLink"] = df["Date"].apply(
-                    lambda d: f"?date={d.strftime('%Y-%m-%d')}"
+                df["DetailsLink"] = model.dates[df.index].dt.strftime(
+                    tenant.query(date="%Y-%m-%d")
                 )
 
-                # Apply styling to Presenter columns to highlight "EMPTY" cells
-                style_cols = [
-                    col for col in ["Presenter 1", "Presenter 2"] if col in df.columns
-                ]
-                styled_df = df.style.map(fns.highlight_empty, subset=style_cols).map(
-                    fns.highlight_random, subset=style_cols
+                # Highlight empty, pending and cancelled Presenter cells
+                css = schedule_css(
+                    tenant,
+                    model.version, tuple(df.index), tuple(df.columns)
                 )
+                styled_df = df.style.apply(lambda _: css, axis=None)
 
                 # 2) Show the DataFrame with LinkColumn
                 st.dataframe(
@@ -615,32 +831,125 @@ else:
                     use_container_width=True,
                 )
 
+        if admin_mode:
+            with st.expander("Add meetings 📆"):
+                with st.form("add_meetings"):
+                    count = st.number_input(
+                        "Number of meetings:", min_value=1, max_value=60, value=16
+                    )
+                    weekdays = st.multiselect(
+                        "Meeting days:",
+                        cadence.WEEKDAYS,
+                        default=[cadence.WEEKDAYS[d] for d in meeting_cadence.weekdays],
+                    )
+                    every_weeks = st.selectbox(
+                        "Every:",
+                        [1, 2, 3, 4],
+                        index=min(meeting_cadence.every_weeks, 4) - 1,
+                        format_func=lambda n: "week" if n == 1 else f"{n} weeks",
+                    )
+                    skip_text = st.text_input(
+                        "Skip the weeks of (YYYY-MM-DD, comma separated):"
+                    )
+                    fill_new = st.checkbox("Also fill the empty slots")
+                    submitted = st.form_submit_button("Add meetings")
+                if submitted:
+                    try:
+                        skip_weeks = [
+                            datetime.date.fromisoformat(d.strip())
+                            for d in skip_text.split(",")
+                            if d.strip()
+                        ]
+                    except ValueError:
+                        st.error("Skipped weeks must be dates like 2025-12-24.")
+                        st.stop()
+                    if not weekdays:
+                        st.error("Pick at least one meeting day.")
+                        st.stop()
+                    term_cadence = meeting_cadence._replace(
+                        weekdays=tuple(cadence.WEEKDAYS.index(d) for d in weekdays),
+                        every_weeks=every_weeks,
+                    )
+                    filler = (
+                        assign.make_filler(
+                            store, window_days, half_life_days, tenant.archive
+                        )
+                        if fill_new
+                        else None
+                    )
+
+                    def add_meetings(updated_df):
+                        # All rows (and optionally the fill) in one write
+                        dates = cadence.next_meeting_dates(
+                            updated_df, int(count), term_cadence, skip_weeks
+                        )
+                        updated_df = cadence.append_meetings(updated_df, dates)
+                        return filler(updated_df) if filler else updated_df
+
+                    with event_log.acting_as("auto-fill" if fill_new else "admin"):
+                        added_df = concurrency.retry_schedule_write(
+                            store,
+                            lambda df: add_meetings(sm.ScheduleModel(df).frame),
+                            df_full,
+                        )
+                    if fill_new:
+                        note_unfilled(added_df)
+                    refresh_main()
+
+            with st.expander("Background jobs ⏱"):
+                scheduler = jobs.get_scheduler(tenant)
+                if not scheduler.running:
+                    st.caption(
+                        "Not scheduled in this app ([jobs] in_app = true); "
+                        "a jobs.py sidecar keeps its own numbers."
+                    )
+                # Jobs run in the background; the table below reports how
+                # they did on a later rerun ("Refresh Data")
+                for col, name in zip(st.columns(len(jobs.JOBS)), jobs.JOBS):
+                    if col.button(f"Run {name} now", key=f"run_job_{name}"):
+                        if scheduler.run_now(name) is None:
+                            st.info(f"{name} is already running.")
+                        else:
+                            st.info(f"{name} started.")
+                st.dataframe(
+                    pd.DataFrame(scheduler.metrics()),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+
+        if not hide_past:
+            archived = load_archived_schedule(tenant)
+            if not archived.empty:
+                with st.expander(f"Archived meetings ({len(archived)})"):
+                    st.dataframe(
+                        archived,
+                        column_config={"Date": st.column_config.DateColumn("Date")},
+                        hide_index=True,
+                        use_container_width=True,
+                    )
+
     # ----- PARTICIPANT USAGE SCORES -----
     st.write("---")
     st.subheader("Participants :moyai:")
 
     try:
-        valid_participants = load_participants_data()
+        valid_participants = participants_future.result()
     except Exception as e:
         st.error(f"Error loading participants: {e}")
         st.stop()
 
-    participants_usage = {p["Name"]: {"presenter_count": 0} for p in valid_participants}
-
-    # Calculate cutoff date: 5 months ago from today (same as assign_roles)
-    today = datetime.date.today()
-    five_months_ago = today - datetime.timedelta(days=150)  # ~5 months (150 days)
-
-    for col in ["Presenter 1", "Presenter 2"]:
-        if col in df_full.columns:
-            for idx, row in df_full.iterrows():
-                presentation_date = row["Date"]
-                person = row[col].strip()
-                if not person or person not in participants_usage:
-                    continue
-                # Only count presentations within the last 5 months
-                if presentation_date >= five_months_ago:
-                    participants_usage[person]["presenter_count"] += 1
+    # Confirmed presentations in the selected window, from incremental counters
+    aggregates = load_usage_aggregates(tenant)
+    horizon = archive.horizon_days(tenant.storage_config())
+    if window_days is None or window_days > horizon:
+        aggregates.sync(load_full_schedule_model(tenant, model.version))
+    else:
+        aggregates.sync(model)
+    usage = aggregates.counts(window_days, half_life_days)
+    participants_usage = {
+        p["Name"]: {"presenter_count": usage.get(p["Name"], 0)}
+        for p in valid_participants
+    }
 
     records = []
     for participant in valid_participants:
@@ -670,31 +979,35 @@ else:
 
         df_scores["Score"] = df_scores["Points"].apply(calc_normalized_score).round(2)
 
-        def color_for_score(val):
-            if val < -0.5:
-                return "background-color: red"
-            elif val > 0.5:
-                return "background-color: green"
-            else:
-                return "background-color: yellow"
-
         df_scores.sort_values("Score", ascending=True, inplace=True)
 
         if search_name.strip():
+            # df_scores keeps the participant order as its index labels
+            names_index = load_participants_search_index(
+                tenant,
+                tuple(p["Name"] for p in valid_participants),
+            )
             df_scores = df_scores[
-                df_scores["Name"].str.contains(search_name, case=False, na=False)
+                df_scores.index.isin(names_index.lookup(search_name))
             ]
 
         df_scores.drop(columns=["Points", "Presentations"], inplace=True)
 
-        styled_df = df_scores.style.map(color_for_score, subset=["Score"]).format(
-            {"Score": "{:.2f}"}
-        )
+        styled_df = df_scores.style.apply(
+            lambda col: score_css(tenant, tuple(col)), subset=["Score"]
+        ).format({"Score": "{:.2f}"})
+
+        if window_days is None:
+            score_label = "Score (all time)"
+        else:
+            score_label = f"Score (over past {window_label})"
+        if half_life_days:
+            score_label += f", half-life {half_life_label}"
 
         if not df_scores.empty:
             column_config = {
                 "Name": st.column_config.TextColumn("Name", width="large"),  # Increase first column width
-                "Score": st.column_config.NumberColumn("Score (over past 5 months)", width="medium")  # Keep second column smaller
+                "Score": st.column_config.NumberColumn(score_label, width="medium")  # Keep second column smaller
             }
             st.dataframe(styled_df, use_container_width=True, column_config=column_config)
         else:
@@ -702,10 +1015,79 @@ else:
     else:
         st.info("No participants found in the schedule.")
 
+    with st.expander("Add to calendar 📅"):
+        feeds = load_calendar_feeds(tenant)
+        feeds.update(model, load_all_slides(tenant), tenant.config)
+        calendar_owner = st.selectbox(
+            "Calendar for:",
+            options=["Whole group"] + [p["Name"] for p in valid_participants],
+        )
+        feed_name = "" if calendar_owner == "Whole group" else calendar_owner
+        feed_body, _ = feeds.get(feed_name)
+        st.download_button(
+            "Download .ics",
+            feed_body,
+            file_name=f"mlatml{'-' + feed_name if feed_name else ''}.ics",
+            mime="text/calendar",
+        )
+        if tenant.get("calendar_url"):
+            # Base URL of ical_server.py, for subscribing instead of downloading
+            group_path = f"/{tenant.name}" if tenant.name else ""
+            feed_path = f"/calendar/{feed_name}.ics" if feed_name else "/calendar.ics"
+            st.code(f"{tenant['calendar_url']}{group_path}{feed_path}")
+
+    with st.expander("Away dates 🧳"):
+        st.caption("You won't be scheduled to present on meetings in these dates.")
+        with st.form("away_form", clear_on_submit=True):
+            away_name = st.selectbox(
+                "Name:", options=[p["Name"] for p in valid_participants]
+            )
+            away_dates = st.date_input(
+                "Away from / to:",
+                value=(datetime.date.today(), datetime.date.today()),
+            )
+            away_note = st.text_input("Note (optional):")
+            if st.form_submit_button("Save away dates") and away_name and away_dates:
+                away_start, away_end = away_dates[0], away_dates[-1]
+                store.add_unavailability(
+                    away_name,
+                    away_start.strftime("%Y-%m-%d"),
+                    away_end.strftime("%Y-%m-%d"),
+                    away_note,
+                )
+                load_unavailability.clear(tenant)
+                st.success(f"Saved: {away_name} is away {away_start} to {away_end}.")
+
+        # Rows keep their sheet row numbers (first record is row 2) for deletion
+        away_rows = [
+            (row_index, record)
+            for row_index, record in enumerate(load_unavailability(tenant), start=2)
+            if str(record.get("End") or record.get("Start")) >= str(datetime.date.today())
+        ]
+        if away_rows:
+            st.dataframe(
+                pd.DataFrame([record for _, record in away_rows]),
+                hide_index=True,
+                use_container_width=True,
+            )
+        if admin_mode and away_rows:
+            col1, col2 = st.columns([1, 0.2], vertical_alignment="bottom")
+            with col1:
+                away_labels = {
+                    f"{r['Name']}: {r['Start']} to {r['End']}": row_index
+                    for row_index, r in away_rows
+                }
+                away_label = st.selectbox("Remove away dates:", list(away_labels))
+            with col2:
+                if st.button("Remove", key="remove_away"):
+                    store.delete_unavailability_row(away_labels[away_label])
+                    load_unavailability.clear(tenant)
+                    st.rerun()
+
     if admin_mode:
         st.subheader("Manage Participants")
         try:
-            participants = load_participants_data()
+            participants = load_participants_data(tenant)
         except Exception as e:
             st.error(f"Error loading participants: {e}")
             st.stop()
@@ -726,10 +1108,20 @@ else:
             if st.button("Add"):
                 if new_participant and new_participant_email:
                     if not any(p["Name"] == new_participant for p in participants):
-                        participants.append(
-                            {"Name": new_participant, "Email": new_participant_email}
+                        new_entry = {
+                            "Name": new_participant,
+                            "Email": new_participant_email,
+                        }
+
+                        def add_participant(current):
+                            # Re-applied on the latest list if it changed meanwhile
+                            if any(p["Name"] == new_participant for p in current):
+                                return current
+                            return current + [new_entry]
+
+                        concurrency.retry_participants_write(
+                            store, add_participant, participants
                         )
-                        gu.save_participants_list(participants)
                         refresh_main()
                         st.rerun()
                     else:
@@ -752,10 +1144,13 @@ else:
                 )
             with col2:
                 if st.button("Remove"):
-                    participants = [
-                        p for p in participants if p["Name"] != remove_participant
-                    ]
-                    gu.save_participants_list(participants)
+                    concurrency.retry_participants_write(
+                        store,
+                        lambda current: [
+                            p for p in current if p["Name"] != remove_participant
+                        ],
+                        participants,
+                    )
                     refresh_main()
                     st.rerun()
         else:
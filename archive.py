@@ -0,0 +1,178 @@
+import collections
+import datetime
+import json
+import os
+import threading
+
+import pandas as pd
+
+import concurrency
+import event_log
+from storage import MATERIAL_COLUMNS, parse_schedule_frame
+
+###############################################################################
+# Archive
+###############################################################################
+# Meetings older than the horizon are moved out of the Schedule and Materials
+# worksheets, so the everyday reads only download the active part. Archived
+# rows stay readable for the history views (past dates, the detail page of an
+# old meeting, the Fairness page) and for usage counts over long windows.
+# The archive lives next to the data ("Schedule Archive" / "Materials Archive"
+# worksheets, or an archive table for sqlite/memory) or, with archive_path, in
+# local Parquet files. Run the job from cron:
+#   python schedule_cli.py archive store
+#   [storage]
+#   archive_days = 365          # horizon; keep it above the usage window
+#   archive_path = "archive"    # optional Parquet directory
+
+DEFAULT_HORIZON_DAYS = 365
+
+
+class BackendArchive:
+    """Archive kept by the storage backend itself."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def read(self, kind):
+        return self.store.get_archive_records(kind)
+
+    def append(self, kind, records):
+        if records:
+            self.store.append_archive_records(kind, records)
+
+
+class ParquetArchive:
+    """One Parquet file per kind under `path` (needs pyarrow)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _file(self, kind):
+        return os.path.join(self.path, f"{kind}.parquet")
+
+    def read(self, kind):
+        if not os.path.exists(self._file(kind)):
+            return []
+        df = pd.read_parquet(self._file(kind))
+        return df.fillna("").to_dict("records")
+
+    def append(self, kind, records):
+        if not records:
+            return
+        with self._lock:
+            df = pd.DataFrame(self.read(kind) + list(records)).fillna("")
+            os.makedirs(self.path, exist_ok=True)
+            # Write aside and rename, so readers never see a half-written file
+            tmp = self._file(kind) + ".tmp"
+            df.astype(str).to_parquet(tmp, index=False)
+            os.replace(tmp, self._file(kind))
+
+
+def get_archive(store, config):
+    """The archive configured in the [storage] section for `store`."""
+    if config.get("archive_path"):
+        return ParquetArchive(config["archive_path"])
+    return BackendArchive(store)
+
+
+def horizon_days(config):
+    return int(config.get("archive_days", DEFAULT_HORIZON_DAYS))
+
+
+def horizon_cutoff(config, today=None):
+    """First date still kept in the hot worksheets."""
+    days = horizon_days(config)
+    return (today or datetime.date.today()) - datetime.timedelta(days=days)
+
+
+def _record_key(record):
+    return json.dumps(record, sort_keys=True, default=str)
+
+
+def _append_new(archive, kind, records):
+    # Appending what is already there is a no-op, so an interrupted run
+    # (archived but not yet removed from the hot sheet) can simply be redone
+    seen = {_record_key(r) for r in archive.read(kind)}
+    archive.append(kind, [r for r in records if _record_key(r) not in seen])
+
+
+def _before(dates, cutoff):
+    dates = pd.to_datetime(pd.Series(dates, dtype=object), errors="coerce")
+    return (dates < pd.Timestamp(cutoff)).to_numpy()
+
+
+def archive_schedule(store, archive, cutoff, dry_run=False):
+    """Move schedule rows dated before `cutoff`; returns how many moved."""
+    moved = []
+
+    def edit(current):
+        if "Date" not in current.columns:
+            return current
+        old = _before(current["Date"], cutoff)
+        moved[:] = current[old].astype(str).to_dict("records")
+        if dry_run or not moved:
+            return current  # unchanged frames are not written
+        _append_new(archive, "schedule", moved)
+        return current[~old].reset_index(drop=True)
+
+    with event_log.acting_as("archive"):
+        concurrency.retry_schedule_write(store, edit)
+    return len(moved)
+
+
+def _material_row(record):
+    return {c: str(record.get(c, "")) for c in MATERIAL_COLUMNS}
+
+
+def _material_positions(records, rows):
+    """Sheet rows (the first record is row 2) holding `rows`, matched by content."""
+    wanted = collections.Counter(_record_key(r) for r in rows)
+    positions = []
+    for i, record in enumerate(records):
+        key = _record_key(_material_row(record))
+        if wanted[key]:
+            wanted[key] -= 1
+            positions.append(i + 2)
+    return positions
+
+
+def archive_materials(store, archive, cutoff, dry_run=False):
+    """Move materials of meetings before `cutoff`; returns how many moved."""
+    records = store.get_materials()
+    old = _before([r.get("Date") for r in records], cutoff)
+    rows = [_material_row(r) for r, is_old in zip(records, old) if is_old]
+    if rows and not dry_run:
+        _append_new(archive, "materials", rows)
+        # Materials carry no revision: someone may have added or removed one
+        # while archiving, so the rows are found again by content right
+        # before deleting (a row gone meanwhile is simply skipped)
+        positions = _material_positions(store.get_materials(), rows)
+        store.delete_material_rows(positions)
+    return len(rows)
+
+
+def run(store, archive, cutoff, dry_run=False):
+    """The archive job: {kind: rows moved}."""
+    return {
+        "schedule": archive_schedule(store, archive, cutoff, dry_run),
+        "materials": archive_materials(store, archive, cutoff, dry_run),
+    }
+
+
+def archived_schedule(archive):
+    """Archived schedule rows, shaped like get_schedule_df."""
+    return parse_schedule_frame(pd.DataFrame(archive.read("schedule")))
+
+
+def archived_materials(archive):
+    return archive.read("materials")
+
+
+def with_archive(df, archived):
+    """`df` with the archived rows in front (oldest first)."""
+    if archived.empty:
+        return df
+    full = pd.concat([archived, df], ignore_index=True).fillna("")
+    return parse_schedule_frame(full)
@@ -1,62 +1,105 @@
-import datetime
 import random
 import pandas as pd
 
-import google_utils as gu
+import availability
+import cadence
+import schedule_model as sm
+import usage_stats
 
 seed = 0
 random.seed(seed)
 
+# Parameters used for the production fill (app button and CLI)
+DEFAULT_MIN_PRESENTER_GAP = 7
+DEFAULT_PRESENTATION_WEIGHT = 1
+
 def get_next_n_wednesdays(start_date, n=16):
     """Return a list of the next n Wednesday dates starting from start_date."""
-    dates = []
-    current_date = start_date
-    # Move to the next Wednesday if not already Wednesday
-    while current_date.weekday() != 2:
-        current_date += datetime.timedelta(days=1)
-    # Collect the next n Wednesdays
-    for _ in range(n):
-        dates.append(current_date.strftime("%Y-%m-%d"))
-        current_date += datetime.timedelta(days=7)
-    return dates
+    dates = cadence.meeting_dates(start_date, n, cadence.Cadence(weekdays=(2,)))
+    return [d.strftime("%Y-%m-%d") for d in dates]
 
 def assign_roles(
     schedule_df,
     names,
     min_presenter_gap=4,
     presentation_weight=4,
+    window_days=usage_stats.DEFAULT_WINDOW_DAYS,
+    half_life_days=None,
+    unavailable=None,
+    prior_usage=None,
+):
+    # Usage counts presentations within `window_days` (None: all), optionally
+    # decayed with age by `half_life_days`; see usage_stats.usage_weights.
+    # `unavailable` are away periods (Name, Start, End) from the storage;
+    # `prior_usage` ({name: usage}) adds presentations not in `schedule_df`,
+    # e.g. archived ones
+    if isinstance(schedule_df, sm.ScheduleModel):
+        model = schedule_df
+    else:
+        model = sm.ScheduleModel(schedule_df)
+    schedule_df = model.frame.copy()  # the picks are written into it
+
+    # How much a presentation in each week counts towards usage
+    week_weights = usage_stats.usage_weights(
+        model.dates, window_days, half_life_days
+    )
+    picks = fill_slots(
+        model.status.to_numpy(),
+        model.names.astype(object).to_numpy(),
+        week_weights,
+        names,
+        min_presenter_gap,
+        presentation_weight,
+        availability.compile_unavailable(unavailable, model.dates),
+        prior_usage,
+    )
+    for week_index, role_index, additional_presenter in picks:
+        schedule_df.iat[
+            week_index, schedule_df.columns.get_loc(model.roles[role_index])
+        ] = sm.format_cell(sm.Status.PENDING, additional_presenter)
+
+    return schedule_df
+
+def fill_slots(
+    status,
+    presenter,
+    week_weights,
+    names,
+    min_presenter_gap,
+    presentation_weight,
+    unavailable=None,
+    prior_usage=None,
 ):
-    usage_count = {name: 0 for name in names}
+    """Core of assign_roles on plain (weeks x roles) arrays of Status and names.
+
+    `unavailable` maps names to week bitsets (see availability.py). Returns
+    the (week, role index, name) picked for each EMPTY cell, in order; cells
+    nobody is eligible for (everyone away or presenting too recently) are
+    left out and stay EMPTY.
+    """
+    prior_usage = prior_usage or {}
+    usage_count = {name: prior_usage.get(name, 0) for name in names}
     last_presented = {name: -min_presenter_gap for name in names}
-    n_weeks = len(schedule_df)
+    n_weeks, n_roles = status.shape
     future_assignments = {week: [] for week in range(n_weeks)}
-
-    schedule_df['Date'] = pd.to_datetime(schedule_df['Date'])
-    
-    # Calculate cutoff date: 5 months ago from today
-    today = datetime.date.today()
-    five_months_ago = today - datetime.timedelta(days=150)  # ~5 months (150 days)
+    picks = []
 
     # First pass: Prepopulate future assignments with existing presenters
-    for week_index, row in schedule_df.iterrows():
-        presentation_date = row['Date'].date()
-        presenters = [row['Presenter 1'], row['Presenter 2']]
-        for presenter in presenters:
-            presenter_clean = presenter.replace("[P] ", "")
-            if presenter_clean != 'EMPTY':
+    for week_index in range(n_weeks):
+        for role in range(n_roles):
+            if status[week_index, role] in sm.PRESENTING:
                 # Update future assignments to avoid collisions
                 for future_week in range(
                     week_index + 1, min(week_index + min_presenter_gap, n_weeks)
                 ):
-                    future_assignments[future_week].append(presenter_clean)
+                    future_assignments[future_week].append(presenter[week_index, role])
 
     # Second pass: Fill empty slots considering future assignments
-    for week_index, row in schedule_df.iterrows():
-        presentation_date = row['Date'].date()
-        presenters = [row['Presenter 1'], row['Presenter 2']]
+    for week_index in range(n_weeks):
+        weight = week_weights[week_index]
 
-        for i in range(2):
-            if presenters[i] == 'EMPTY':
+        for role in range(n_roles):
+            if status[week_index, role] is sm.Status.EMPTY:
                 additional_presenter = pick_presenters(
                     names,
                     usage_count,
@@ -67,12 +110,15 @@ def assign_roles(
                     presentation_weight,
                     n_weeks,
                     number=1,
-                )[0]
-                presenters[i] = f"[P] {additional_presenter}"
+                    unavailable=unavailable,
+                )
+                if not additional_presenter:
+                    continue  # nobody eligible: the slot stays EMPTY
+                additional_presenter = additional_presenter[0]
+                picks.append((week_index, role, additional_presenter))
 
-                # Update usage metrics only if within date range
-                if presentation_date >= five_months_ago:
-                    usage_count[additional_presenter] += 1
+                # Update usage metrics (zero weight outside the window)
+                usage_count[additional_presenter] += weight
                 last_presented[additional_presenter] = week_index
 
                 # Update future assignments for the newly picked presenter
@@ -80,19 +126,14 @@ def assign_roles(
                     week_index + 1, min(week_index + min_presenter_gap, n_weeks)
                 ):
                     future_assignments[future_week].append(additional_presenter)
-            else:
-                presenter_clean = presenters[i].replace("[P] ", "")
-                if presenter_clean in names:
-                    # Update usage metrics only if within date range
-                    if presentation_date >= five_months_ago:
-                        usage_count[presenter_clean] += 1
+            elif status[week_index, role] in sm.PRESENTING:
+                presenter_clean = presenter[week_index, role]
+                if presenter_clean in usage_count:
+                    # Update usage metrics (zero weight outside the window)
+                    usage_count[presenter_clean] += weight
                     last_presented[presenter_clean] = week_index
 
-        # Update the DataFrame
-        schedule_df.at[week_index, 'Presenter 1'] = presenters[0]
-        schedule_df.at[week_index, 'Presenter 2'] = presenters[1]
-
-    return schedule_df
+    return picks
 
 def pick_presenters(
     names,
@@ -104,8 +145,12 @@ def pick_presenters(
     presentation_weight,
     n_weeks,
     number=2,
+    unavailable=None,
 ):
     candidates = []
+    unavailable = unavailable or {}
+    # People away this week are never candidates
+    names = [n for n in names if not unavailable.get(n, 0) >> current_week & 1]
 
     for name in names:
         # Check both recent and upcoming presentations explicitly
@@ -130,29 +175,81 @@ def pick_presenters(
     random.shuffle(candidates)
     candidates.sort(key=lambda x: x[1] * presentation_weight)
 
+    # Fewer than `number` (possibly none) when not enough people are eligible
     selected_presenters = [candidate[0] for candidate in candidates[:number]]
 
     return selected_presenters
 
-def fill_empty_slots(seed=None):
+def empty_slots(schedule_df):
+    """How many EMPTY presenter slots `schedule_df` has, e.g. left by a fill."""
+    model = sm.ScheduleModel(schedule_df)
+    return int(model.role_mask([sm.Status.EMPTY]).to_numpy().sum())
+
+def archived_usage(archive, window_days, half_life_days=None):
+    """{name: usage} of the presentations moved to `archive` (see archive.py)."""
+    from archive import archived_schedule
+
+    aggregates = usage_stats.UsageAggregates()
+    aggregates.sync(sm.ScheduleModel(archived_schedule(archive)))
+    return aggregates.counts(window_days, half_life_days)
+
+def make_filler(
+    store,
+    window_days=usage_stats.DEFAULT_WINDOW_DAYS,
+    half_life_days=None,
+    archive=None,
+):
+    """`fill(schedule_df)` filling EMPTY slots with the production parameters.
+
+    Participants and away dates are read from `store` once, up front, and so
+    is the usage of the presentations already moved to `archive`, if given.
+    """
+    names = [n["Name"] for n in store.get_participants_list()]
+    unavailable = store.get_unavailability()
+    prior_usage = None
+    if archive is not None:
+        prior_usage = archived_usage(archive, window_days, half_life_days)
+
+    def fill(schedule_df):
+        return assign_roles(
+            schedule_df,
+            names,
+            min_presenter_gap=DEFAULT_MIN_PRESENTER_GAP,
+            presentation_weight=DEFAULT_PRESENTATION_WEIGHT,
+            window_days=window_days,
+            half_life_days=half_life_days,
+            unavailable=unavailable,
+            prior_usage=prior_usage,
+        )
+
+    return fill
+
+def fill_empty_slots(
+    seed=None,
+    store=None,
+    save=False,
+    window_days=usage_stats.DEFAULT_WINDOW_DAYS,
+    half_life_days=None,
+    archive=None,
+):
+    # With save=True the filled schedule is written back, re-filling on top of
+    # the latest schedule if someone else saved in the meantime; presentations
+    # moved to `archive` still count towards usage
     if seed is not None:
         random.seed(seed)
 
-    # Retrieve participants and schedule from Google Sheets
-    names_dict = gu.get_participants_list()
-    names = [n["Name"] for n in names_dict]
+    # Retrieve participants and schedule from the configured storage backend
+    if store is None:
+        import storage
 
-    schedule_df = gu.get_schedule_df()
+        store = storage.get_storage()
+    fill = make_filler(store, window_days, half_life_days, archive)
 
-    # Fill empty slots in the schedule
-    updated_schedule_df = assign_roles(
-        schedule_df,
-        names,
-        min_presenter_gap=7,
-        presentation_weight=1,  # 1 presentation = 4 usage points
-    )
+    if save:
+        import concurrency
 
-    return updated_schedule_df
+        return concurrency.retry_schedule_write(store, fill)
+    return fill(store.get_schedule_df())
 
 if __name__ == "__main__":
     seed = 0
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+###############################################################################
+# Availability
+###############################################################################
+# Away periods (Name, Start, End; dates inclusive) are compiled against the
+# schedule's meeting dates into one integer bitset per participant: bit i is
+# set when that person is away on the date of row i. Checking a candidate for
+# a slot is then a single shift-and-mask.
+
+
+def compile_unavailable(records, dates):
+    """{name: bitset} of the schedule rows (`dates`) each person is away for."""
+    days = pd.to_datetime(pd.Series(dates), errors="coerce").to_numpy()
+    if not records or not len(days):
+        return {}
+    periods = pd.DataFrame(records, columns=["Name", "Start", "End"])
+    periods["Start"] = pd.to_datetime(periods["Start"], errors="coerce")
+    periods["End"] = pd.to_datetime(periods["End"], errors="coerce").fillna(
+        periods["Start"]
+    )
+    periods = periods.dropna(subset=["Name", "Start"])
+    # (periods x rows) overlap matrix, OR-ed per person
+    away = (days >= periods["Start"].to_numpy()[:, None]) & (
+        days <= periods["End"].to_numpy()[:, None]
+    )
+    bitsets = {}
+    for name, rows in pd.DataFrame(away).groupby(periods["Name"].to_numpy()):
+        mask = rows.to_numpy().any(axis=0)
+        bits = np.packbits(mask, bitorder="little").tobytes()
+        value = int.from_bytes(bits, "little")
+        if value:
+            bitsets[name] = value
+    return bitsets
+
+
+def is_away(bitsets, name, row):
+    return bool(bitsets.get(name, 0) >> row & 1)
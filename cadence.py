@@ -0,0 +1,116 @@
+import collections
+import datetime
+
+import numpy as np
+import pandas as pd
+
+###############################################################################
+# Meeting Cadence
+###############################################################################
+# Which days the group meets, used to add future meetings to the schedule:
+#   [cadence]
+#   weekdays = ["Wed"]                          # several: ["Mon", "Thu"]
+#   every_weeks = 1                             # 2 = biweekly
+#   holidays = ["2025-12-24"]                   # single days off
+#   blackouts = [["2025-12-20", "2026-01-06"]]  # inclusive ranges off
+# Biweekly cadences count weeks from the last meeting already scheduled, so a
+# new batch continues the existing rhythm. Skipped weeks (any date in them)
+# can be given per batch on top of the configured holidays.
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+Cadence = collections.namedtuple(
+    "Cadence",
+    ["weekdays", "every_weeks", "holidays", "blackouts"],
+    defaults=[(2,), 1, (), ()],
+)
+
+
+def _weekday(value):
+    if isinstance(value, int):
+        return value
+    return WEEKDAYS.index(str(value)[:3].title())
+
+
+def cadence_from_config(config):
+    """Cadence from a [cadence] section (a dict); Wednesdays by default."""
+    return Cadence(
+        weekdays=tuple(_weekday(d) for d in config.get("weekdays", ["Wed"])),
+        every_weeks=int(config.get("every_weeks", 1)),
+        holidays=tuple(config.get("holidays", ())),
+        blackouts=tuple(tuple(b) for b in config.get("blackouts", ())),
+    )
+
+
+def _days(values):
+    return np.array(pd.to_datetime(list(values)).to_numpy(), dtype="datetime64[D]")
+
+
+def _weekday_of(days):
+    # 0 = Monday; day 0 of datetime64 (1970-01-01) was a Thursday
+    return (days.astype("int64") + 3) % 7
+
+
+def _monday(days):
+    return days - _weekday_of(days).astype("timedelta64[D]")
+
+
+def meeting_dates(start, n, cadence=Cadence(), skip_weeks=(), anchor=None):
+    """The first `n` meeting dates on or after `start` (datetime.date list).
+
+    All candidate days of a span are generated and masked in one pass; the
+    span only grows if holidays ate too many of them. `anchor` is a meeting
+    the biweekly rhythm is counted from (default: the first candidate week).
+    """
+    if n <= 0:
+        return []
+    start = np.datetime64(start, "D")
+    weekdays = np.array(sorted(set(cadence.weekdays)))
+    every = max(int(cadence.every_weeks), 1)
+    off = _days(cadence.holidays)
+    blackouts = [(_days([a])[0], _days([b])[0]) for a, b in cadence.blackouts]
+    skipped = _monday(_days(skip_weeks))
+    first_week = _monday(np.datetime64(anchor or start, "D"))
+
+    span = 7 * every * (-(-n // len(weekdays)) + 1)
+    while True:
+        days = start + np.arange(span)
+        monday = _monday(days)
+        keep = np.isin(_weekday_of(days), weekdays)
+        keep &= ((monday - first_week).astype("int64") // 7) % every == 0
+        keep &= ~np.isin(days, off) & ~np.isin(monday, skipped)
+        for first, last in blackouts:
+            keep &= (days < first) | (days > last)
+        found = days[keep]
+        if len(found) >= n or span > 7 * 366 * 10:
+            return found[:n].astype(object).tolist()
+        span *= 2
+
+
+def next_meeting_dates(df, n, cadence=Cadence(), skip_weeks=()):
+    """The `n` meetings following the last one in the schedule `df`."""
+    dates = pd.to_datetime(df["Date"], errors="coerce") if "Date" in df else None
+    if dates is None or dates.isna().all():
+        return meeting_dates(datetime.date.today(), n, cadence, skip_weeks)
+    last = dates.max().date()
+    return meeting_dates(
+        last + datetime.timedelta(days=1), n, cadence, skip_weeks, anchor=last
+    )
+
+
+def append_meetings(df, dates):
+    """`df` with one row per date appended: EMPTY presenters, other cells blank."""
+    rows = pd.DataFrame(
+        {
+            col: (
+                list(dates)
+                if col == "Date"
+                else ["EMPTY" if "Presenter" in col else ""] * len(dates)
+            )
+            for col in df.columns
+        }
+    )
+    new = pd.concat([df, rows], ignore_index=True)
+    if "Date" in new.columns:
+        new["Date"] = new["Date"].astype(str)
+    return new
@@ -0,0 +1,217 @@
+import pandas as pd
+
+from storage import ConflictError, records_revision
+
+###############################################################################
+# Merge-or-Retry Writes
+###############################################################################
+# Writers describe their change as a function of the data they start from.
+# The write is stamped with the revision that data was read at; if someone
+# else saved in between, the storage raises ConflictError carrying the fresh
+# data and the change is simply re-applied on top of it. No global lock is
+# needed and nothing is silently overwritten.
+
+MAX_ATTEMPTS = 3
+
+
+def _changed_positions(current, new):
+    """(updated, inserted) row positions if `new` only edits/appends, else None."""
+    if list(new.columns) != list(current.columns) or len(new) < len(current):
+        return None
+    head = new.iloc[: len(current)]
+    if "Date" in new.columns and not (
+        head["Date"].astype(str).to_numpy() == current["Date"].astype(str).to_numpy()
+    ).all():
+        return None
+    changed = (head.astype(str).to_numpy() != current.astype(str).to_numpy()).any(
+        axis=1
+    )
+    return changed.nonzero()[0].tolist(), list(range(len(current), len(new)))
+
+
+def _deleted_keys(current, new, key):
+    """Keys of the rows `new` dropped from `current` if that is all it did, else None."""
+    if (
+        key not in current.columns
+        or list(new.columns) != list(current.columns)
+        or len(new) >= len(current)
+        or current[key].astype(str).duplicated().any()
+    ):
+        return None
+    current_keys = current[key].astype(str)
+    kept = current_keys.isin(new[key].astype(str)).to_numpy()
+    if kept.sum() != len(new):
+        return None
+    same = current[kept].astype(str).to_numpy() == new.astype(str).to_numpy()
+    if not same.all():
+        return None
+    return current_keys[~kept].tolist()
+
+
+def write_schedule(store, current, new):
+    # Only touch the rows that differ when possible, the whole sheet otherwise
+    revision = current.attrs.get("revision")
+    positions = _changed_positions(current, new)
+    deleted = None if positions is not None else _deleted_keys(current, new, "Date")
+    if deleted:
+        store.delete_schedule_rows(deleted, expected_revision=revision)
+    elif positions is None:
+        store.save_schedule_df(new, expected_revision=revision)
+    elif positions[0] or positions[1]:
+        store.update_schedule_rows(new, *positions, expected_revision=revision)
+
+
+def write_participants(store, current, new):
+    # Append or delete single rows when that is all that changed
+    revision = records_revision(current)
+    names = [p["Name"] for p in current]
+    new_names = [p["Name"] for p in new]
+    if len(set(names)) == len(names):
+        if new[: len(current)] == current and len(new) > len(current):
+            store.add_participants(new[len(current) :], expected_revision=revision)
+            return
+        kept = [p for p in current if p["Name"] in set(new_names)]
+        if kept == new and len(new) < len(current):
+            removed = [n for n in names if n not in set(new_names)]
+            store.delete_participants(removed, expected_revision=revision)
+            return
+    store.save_participants_list(new, expected_revision=revision)
+
+
+def retry_schedule_write(store, edit, current=None, attempts=MAX_ATTEMPTS):
+    """Apply `edit(current_df) -> new_df` and save it, re-applying on conflict.
+
+    `current` is the frame the caller already read (it must carry
+    attrs["revision"]); it is fetched when omitted. `edit` may raise to give
+    up, e.g. when the cell it meant to change is no longer in the expected
+    state. Returns the frame that was written.
+    """
+    if current is None:
+        current = store.get_schedule_df()
+    for attempt in range(attempts):
+        new = edit(current)
+        try:
+            write_schedule(store, current, new)
+            return new
+        except ConflictError as e:
+            if attempt == attempts - 1:
+                raise
+            current = e.current
+
+
+def retry_participants_write(store, edit, current=None, attempts=MAX_ATTEMPTS):
+    """Same as retry_schedule_write for the participants list."""
+    if current is None:
+        current = store.get_participants_list()
+    for attempt in range(attempts):
+        new = edit([dict(p) for p in current])
+        try:
+            write_participants(store, current, new)
+            return new
+        except ConflictError as e:
+            if attempt == attempts - 1:
+                raise
+            current = e.current
+
+
+def occurrence_keys(df, key="Date"):
+    """Row keys unique even when rows share `key`: "2026-11-04", "2026-11-04#1", ...
+
+    The n-th row with a given key (counting from 0) gets "#n" appended, the
+    way funcs.merge_schedule_edits matches rows sharing a date in order.
+    """
+    values = df[key].astype(str)
+    counts = values.groupby(values, sort=False).cumcount()
+    return pd.Index(
+        [v if n == 0 else f"{v}#{n}" for v, n in zip(values, counts)], dtype=object
+    )
+
+
+def split_occurrence_key(k):
+    """(key, n) from an occurrence key, the inverse of occurrence_keys."""
+    value, sep, n = str(k).rpartition("#")
+    if sep and n.isdigit():
+        return value, int(n)
+    return str(k), 0
+
+
+def schedule_cell_changes(base, ours, key="Date"):
+    """Cells (key, column, old, new) that differ between `base` and `ours`.
+
+    Rows are matched by their occurrence key (see occurrence_keys), which is
+    the key returned; rows only in `ours` count as inserted (old is None) and
+    rows only in `base` as deleted (new is None). Deleted rows sharing a key
+    come last first, so deleting them in order leaves the keys of the others
+    unchanged.
+    """
+    base_rows = base.set_axis(occurrence_keys(base, key)).astype(str)
+    our_rows = ours.set_axis(occurrence_keys(ours, key)).astype(str)
+    columns = [c for c in our_rows.columns if c in base_rows.columns]
+    common = our_rows.index.intersection(base_rows.index, sort=False)
+
+    before = base_rows.loc[common, columns]
+    after = our_rows.loc[common, columns]
+    diff = (before != after).to_numpy()
+    rows, cols = diff.nonzero()
+    changes = [
+        (common[r], columns[c], before.iat[r, c], after.iat[r, c])
+        for r, c in zip(rows, cols)
+    ]
+    for k in our_rows.index.difference(base_rows.index, sort=False):
+        changes += [(k, c, None, our_rows.at[k, c]) for c in our_rows.columns]
+    deleted = base_rows.index.difference(our_rows.index, sort=False)
+    for k in reversed(deleted):
+        changes.append((k, None, None, None))
+    return changes
+
+
+def merge_schedule(base, ours, theirs, key="Date"):
+    """Three-way merge of our edits (base -> ours) onto `theirs`.
+
+    Our change to a cell wins unless they changed the same cell to something
+    else; those cells keep their value and are returned as conflicts. Rows
+    are matched by occurrence key, so rows sharing a date pair up in order.
+    """
+    merged = theirs.copy()
+    merged.attrs = dict(theirs.attrs)
+    base_keys = occurrence_keys(base, key)
+    our_keys = occurrence_keys(ours, key)
+    their_pos = pd.Series(range(len(theirs)), index=occurrence_keys(theirs, key))
+    conflicts, new_rows, dropped = [], set(), []
+
+    for k, column, old, new in schedule_cell_changes(base, ours, key):
+        pos = their_pos.get(k)
+        if column is None:  # we deleted the row
+            if pos is None:
+                continue
+            their_row = theirs.iloc[pos].astype(str)
+            base_row = base.iloc[base_keys.get_loc(k)].astype(str)
+            if (their_row.to_numpy() == base_row.to_numpy()).all():
+                dropped.append(pos)
+            else:
+                conflicts.append((k, None, "row changed by someone else"))
+            continue
+        if pos is None:
+            if old is None:  # we inserted the row
+                new_rows.add(k)
+            else:
+                conflicts.append((k, column, "row deleted by someone else"))
+            continue
+        col = merged.columns.get_loc(column)
+        theirs_value = str(theirs.iat[pos, col])
+        if theirs_value == new:
+            continue
+        if old is None or theirs_value != old:
+            # Both sides changed (or both inserted) this cell: keep theirs
+            conflicts.append((k, column, theirs_value))
+            continue
+        merged.iat[pos, col] = ours[column].iloc[our_keys.get_loc(k)]
+
+    if dropped:
+        merged = merged.drop(index=merged.index[dropped])
+    if new_rows:
+        inserted = ours[our_keys.isin(list(new_rows))]
+        merged = pd.concat([merged, inserted[merged.columns]], ignore_index=True)
+    merged = merged.reset_index(drop=True)
+    merged.attrs = dict(theirs.attrs)
+    return merged, conflicts
@@ -0,0 +1,122 @@
+import time
+
+import streamlit as st
+
+import google_utils as gu
+import tenancy
+from email_messages import (
+    CONFIRMATION_SUBJECT,
+    confirmation_text,
+    confirmation_url,
+    participant_emails,
+    pending_entries,
+)
+from schedule_model import ScheduleModel
+
+###############################################################################
+# Confirmation Email Dialog
+###############################################################################
+
+
+@st.dialog("Send Confirmation Emails")
+def recipients_dialog(
+    pending_options,
+    pending_mapping,
+    participant_emails,
+    confirmation_url,
+    organizer,
+    sender,
+    email_subject,
+):
+    # Show all pending recipients as a multiselect (all checked by default)
+    selected = st.multiselect(
+        "Select recipients to send emails to:",
+        options=pending_options,
+        default=pending_options,
+        key="selected_recipients",
+    )
+    if st.button("Confirm Selection"):
+        confirmations_sent = 0
+        error_msgs = []
+        try:
+            smtp_conn = gu.get_smtp_connection()  # Open SMTP connection inside the dialog
+        except Exception as e:
+            st.error(f"Error initializing SMTP connection: {e}")
+            return
+
+        # Loop over each selected recipient.
+        for option in selected:
+            entry = pending_mapping[option]
+            to_email = participant_emails.get(entry["clean_name"], "")
+            if not to_email:
+                error_msgs.append(f"No email found for {entry['clean_name']}.")
+                continue
+
+            email_message_text = confirmation_text(entry, confirmation_url, organizer)
+            try:
+                gu.send_email_via_smtp(
+                    smtp_conn, sender, to_email, email_subject, email_message_text
+                )
+                confirmations_sent += 1
+            except Exception as e:
+                error_msgs.append(f"Error sending email to {to_email}: {e}")
+
+        try:
+            smtp_conn.quit()
+        except Exception:
+            pass
+
+        st.success(f"Confirmation emails sent to {confirmations_sent} recipients.")
+        if error_msgs:
+            st.write("Errors encountered:")
+            for err in error_msgs:
+                st.write(err)
+
+        with st.spinner("Redirecting to the dashboard..."):
+            time.sleep(3)
+            st.rerun()
+
+
+def send_confirmation_emails(tenant=None):
+    tenant = tenant or tenancy.get_tenants()[""]
+    store = tenant.storage
+    model = ScheduleModel(store.get_schedule_df())
+    participants = store.get_participants_list()
+
+    emails = participant_emails(participants)
+
+    # Identify pending entries (cells with status "[P]").
+    entries = pending_entries(model)
+
+    if not entries:
+        st.info("No pending confirmation entries found.")
+        return
+
+    # Prepare mapping for display options.
+    pending_mapping = {}
+    pending_options = []
+    for entry in entries:
+        to_email = emails.get(entry["clean_name"], "No Email")
+        display = f"{entry['clean_name']} ({to_email}) on {entry['date']}"
+        pending_options.append(display)
+        pending_mapping[display] = entry
+
+    # Save these in session state so the dialog function can access them.
+    st.session_state.pending_mapping = pending_mapping
+    st.session_state.pending_options = pending_options
+
+    # Email sending details.
+    sender = tenant["sender_email"]
+    organizer = tenant["organizer_name"]
+    email_subject = CONFIRMATION_SUBJECT
+
+    recipients_dialog(
+        pending_options,
+        pending_mapping,
+        emails,
+        confirmation_url(tenant),
+        organizer,
+        sender,
+        email_subject,
+    )
+    st.stop()
@@ -0,0 +1,70 @@
+import datetime as dt
+
+import pandas as pd
+
+from funcs import encrypt_name
+from schedule_model import Status, format_cell
+
+###############################################################################
+# Email Messages
+###############################################################################
+# Who to email and what to send, without Streamlit: shared by the admin
+# dialog (confirmation_emails.py) and the background jobs (jobs.py).
+
+CONFIRMATION_SUBJECT = "[Confirmation Required] ML Subgroup"
+
+
+def format_date(date_str):
+    try:
+        return dt.datetime.strptime(date_str, "%Y-%m-%d").strftime("%B %d, %Y")
+    except Exception:
+        return date_str
+
+
+def confirmation_text(entry, confirmation_url, organizer):
+    """Body of the confirmation email for a pending entry (see pending_entries)."""
+    encrypted_name = encrypt_name(entry["pending_name"])
+    confirmation_link = (
+        f"{confirmation_url}"
+        f"&date={entry['date']}"
+        f"&role={entry['role'].replace(' ', '_')}"
+        f"&name={encrypted_name}"
+    )
+    with open("email_template.txt", "r") as template_file:
+        email_template = template_file.read()
+    return email_template.format(
+        name_presenter=entry["clean_name"],
+        date=format_date(entry["date"]),
+        confirmation_link=confirmation_link,
+        name_organizer=organizer,
+    )
+
+
+def confirmation_url(tenant):
+    return f"{tenant['app_url']}/{tenant.query(confirmation=1)}"
+
+
+def participant_emails(participants):
+    emails = {}
+    for p in participants:
+        name = p["Name"].strip()
+        email = p.get("Email", "").strip()
+        if email:
+            emails[name] = email
+    return emails
+
+
+def pending_entries(model, statuses=(Status.PENDING,)):
+    """One dict per presenter cell with one of `statuses`."""
+    return [
+        {
+            "date": (
+                cell.date.strftime("%Y-%m-%d") if pd.notna(cell.date) else ""
+            ),
+            "role": cell.role,
+            "status": cell.status,
+            "pending_name": format_cell(Status.PENDING, cell.name),  # "[P] Abdul"
+            "clean_name": cell.name,  # e.g. "Abdul"
+        }
+        for cell in model.cells(list(statuses)).itertuples()
+    ]
@@ -0,0 +1,185 @@
+import contextlib
+import contextvars
+import datetime
+import threading
+
+import pandas as pd
+
+from concurrency import schedule_cell_changes, split_occurrence_key
+from storage import EVENT_COLUMNS, check_revision, parse_schedule_frame
+
+###############################################################################
+# Schedule Event Log
+###############################################################################
+# With event_log = true in [storage], schedule writes no longer rewrite the
+# Schedule sheet. Each changed cell is appended to an "Events" log as
+#   Timestamp | Actor | Date | Role | Old | New
+# (Role "+row"/"-row" for added/deleted meeting rows). Rows sharing a date
+# are told apart by their order: the second one is "2026-11-04#1" in the
+# Date column, as in concurrency.occurrence_keys. The Schedule sheet
+# becomes a snapshot: reads replay the events appended since the last
+# snapshot marker, fetching only the log from the last marker seen on, and
+# every `compact_every` events the replayed schedule is written back and a
+# marker appended. Events set absolute values, so
+# replaying a few already-compacted ones again is harmless. The full log is
+# kept as an audit trail and can be replayed to any point in time.
+#   [storage]
+#   event_log = true
+#   compact_every = 50
+
+ROW_ADDED = "+row"
+ROW_DELETED = "-row"
+SNAPSHOT = "snapshot"  # Role of the compaction markers
+
+_actor = contextvars.ContextVar("schedule_actor", default="app")
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+@contextlib.contextmanager
+def acting_as(actor):
+    """Attribute the schedule writes made inside the block to `actor`."""
+    token = _actor.set(actor)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def schedule_events(before, after, actor=None, timestamp=None):
+    """Events turning `before` into `after` (rows matched by occurrence key)."""
+    actor = actor or _actor.get()
+    timestamp = timestamp or _now()
+    if "Date" not in before.columns:
+        before = after.iloc[:0]  # nothing saved yet
+    events = []
+    added = set()
+    for date, column, old, new in schedule_cell_changes(before, after):
+        date = str(date)
+        if column is None:
+            events.append([timestamp, actor, date, ROW_DELETED, "", ""])
+            continue
+        if old is None and date not in added:
+            added.add(date)
+            events.append([timestamp, actor, date, ROW_ADDED, "", ""])
+        events.append([timestamp, actor, date, column, old or "", new])
+    return [dict(zip(EVENT_COLUMNS, e)) for e in events]
+
+
+def replay(base, events):
+    """Apply `events` in order on top of the schedule frame `base`."""
+    columns, rows = ["Date"], []
+    if len(base.columns):
+        df = base.astype(str)
+        columns = list(df.columns)
+        rows = df.to_dict("records")
+    by_date = {}  # Date -> its rows, in schedule order
+    for row in rows:
+        by_date.setdefault(row["Date"], []).append(row)
+    for event in events:
+        role = event["Role"]
+        if role == SNAPSHOT:
+            continue
+        date, n = split_occurrence_key(event["Date"])
+        same_date = by_date.setdefault(date, [])
+        if role == ROW_DELETED:
+            if n < len(same_date):
+                rows.remove(same_date.pop(n))
+            continue
+        if role not in columns and role != ROW_ADDED:
+            columns.append(role)
+        if n >= len(same_date):
+            same_date.append({"Date": date})
+            rows.append(same_date[-1])
+        if role != ROW_ADDED:
+            same_date[n][role] = str(event["New"])
+    return pd.DataFrame(rows, columns=columns).fillna("")
+
+
+def schedule_at(store, timestamp):
+    """The schedule as it was at `timestamp` (ISO string), from the full log."""
+    events = [
+        e for e in store.get_schedule_events() if str(e["Timestamp"]) <= timestamp
+    ]
+    return parse_schedule_frame(replay(pd.DataFrame(), events))
+
+
+class EventLogStorage:
+    """Wraps a backend so schedule writes become appended events."""
+
+    event_log = True
+
+    def __init__(self, inner, compact_every=50):
+        self.inner = inner
+        self.name = inner.name
+        self.compact_every = compact_every
+        self._marker = 0  # index in the log of the last snapshot marker seen
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        # Everything but the schedule goes straight to the wrapped backend
+        return getattr(self.inner, attr)
+
+    def _read(self):
+        snapshot = self.inner.get_schedule_df()
+        # The log only grows, so reading from the last marker seen is enough
+        start = self._marker
+        events = self.inner.get_schedule_events(start)
+        markers = [i for i, e in enumerate(events) if e["Role"] == SNAPSHOT]
+        if markers:
+            self._marker = start + markers[-1]
+        pending = events[markers[-1] + 1 :] if markers else events
+        if not markers and not events:
+            return snapshot, [], True
+        if not markers:
+            # The log started on an existing sheet: its first events are the
+            # import of that sheet, so the sheet itself is the snapshot
+            pending = [e for e in events if e["Actor"] != "import"]
+        return parse_schedule_frame(replay(snapshot, pending)), pending, False
+
+    def get_schedule_df(self):
+        return self._read()[0]
+
+    def _write(self, edit, expected_revision):
+        with self._lock:
+            current, pending, empty_log = self._read()
+            check_revision(
+                expected_revision, current, current.attrs["revision"], "schedule"
+            )
+            df = edit(current)
+            events = schedule_events(current, df)
+            imported = []
+            if empty_log and len(current):
+                # First write: record what was already there as the log's start
+                imported = schedule_events(current.iloc[:0], current, "import")
+            removed = set(current.columns) - set(df.columns)
+            if events:
+                self.inner.append_schedule_events(imported + events)
+            if removed or len(pending) + len(events) >= self.compact_every:
+                self.compact(df)
+
+    def compact(self, df=None):
+        """Write the replayed schedule as the new snapshot and mark the log."""
+        df = self.get_schedule_df() if df is None else df
+        self.inner.save_schedule_df(df)
+        marker = [_now(), _actor.get(), "", SNAPSHOT, "", ""]
+        marker = dict(zip(EVENT_COLUMNS, marker))
+        self.inner.append_schedule_events([marker])
+
+    def save_schedule_df(self, df, expected_revision=None):
+        self._write(lambda current: df, expected_revision)
+
+    def update_schedule_rows(
+        self, df, updated_positions=(), inserted_positions=(), expected_revision=None
+    ):
+        # The diff against the current schedule already finds the changed cells
+        self._write(lambda current: df, expected_revision)
+
+    def delete_schedule_rows(self, dates, expected_revision=None):
+        dates = {str(d) for d in dates}
+        self._write(
+            lambda current: current[~current["Date"].astype(str).isin(dates)],
+            expected_revision,
+        )
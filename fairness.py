@@ -0,0 +1,94 @@
+import collections
+import datetime
+
+import numpy as np
+import pandas as pd
+
+import schedule_model as sm
+
+###############################################################################
+# Fairness Analytics
+###############################################################################
+# Load and reliability metrics over the whole history, computed once per
+# schedule version (callers cache the report by model.version):
+#   load      presentations per quarter and participant (pending included)
+#   gini      Gini coefficient of that load per quarter, over the roster
+#   rates     per person: assigned slots, reschedule and cancellation rates
+#   waits     per person: days between consecutive presentations
+# Declined invitations become EMPTY cells and lose the name, so they cannot
+# be attributed to anyone and are not part of the rates.
+
+FairnessReport = collections.namedtuple(
+    "FairnessReport", ["version", "load", "gini", "rates", "waits"]
+)
+
+ASSIGNED = [
+    sm.Status.ACCEPTED,
+    sm.Status.PENDING,
+    sm.Status.RESCHEDULE,
+    sm.Status.CANCELLED,
+]
+
+
+def gini(matrix):
+    """Gini coefficient of each row (0 = equal load; NaN for all-zero rows)."""
+    values = np.sort(np.asarray(matrix, dtype=float), axis=1)
+    n = values.shape[1]
+    totals = values.sum(axis=1)
+    ranks = np.arange(1, n + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        g = (2 * (values * ranks).sum(axis=1)) / (n * totals) - (n + 1) / n
+    return np.where(totals > 0, g, np.nan)
+
+
+def build_report(model, roster=(), today=None):
+    today = pd.Timestamp(today or datetime.date.today())
+    cells = model.cells(ASSIGNED)
+    cells = cells[cells["date"].notna()].copy()
+    cells["name"] = cells["name"].astype(str)
+    names = list(dict.fromkeys([*roster, *cells["name"]]))
+    cells["quarter"] = cells["date"].dt.to_period("Q").astype(str)
+
+    presenting = cells[cells["status"].isin(sm.PRESENTING)]
+    load = (
+        presenting.groupby(["quarter", "name"])
+        .size()
+        .unstack(fill_value=0)
+        .reindex(columns=names, fill_value=0)
+        .sort_index()
+    )
+    gini_by_quarter = pd.Series(gini(load.to_numpy()), index=load.index, name="Gini")
+
+    counts = (
+        cells.groupby(["name", cells["status"].map(lambda s: s.name)])
+        .size()
+        .unstack(fill_value=0)
+        .reindex(index=names, columns=[s.name for s in ASSIGNED], fill_value=0)
+    )
+    rates = pd.DataFrame(
+        {
+            "Assigned": counts.sum(axis=1),
+            "Accepted": counts["ACCEPTED"],
+            "Rescheduled": counts["RESCHEDULE"],
+            "Cancelled": counts["CANCELLED"],
+        }
+    )
+    assigned = rates["Assigned"].where(rates["Assigned"] > 0)
+    rates["Reschedule rate"] = (rates["Rescheduled"] / assigned).round(2)
+    rates["Cancel rate"] = (rates["Cancelled"] / assigned).round(2)
+
+    ordered = presenting.sort_values(["name", "date"])
+    gaps = ordered.groupby("name")["date"].diff().dt.days
+    past = presenting[presenting["date"] <= today]
+    waits = pd.DataFrame(
+        {
+            "Presentations": presenting.groupby("name").size(),
+            "Mean wait (days)": gaps.groupby(ordered["name"]).mean().round(1),
+            "Median wait (days)": gaps.groupby(ordered["name"]).median(),
+            "Longest wait (days)": gaps.groupby(ordered["name"]).max(),
+            "Days since last": (today - past.groupby("name")["date"].max()).dt.days,
+        }
+    ).reindex(names)
+    waits["Presentations"] = waits["Presentations"].fillna(0).astype(int)
+
+    return FairnessReport(model.version, load, gini_by_quarter, rates, waits)
@@ -5,32 +5,89 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.backends import default_backend
 from cryptography.fernet import Fernet
 import base64
-import streamlit as st
+import numpy as np
+import pandas as pd
+
+import cadence
+from schedule_model import Status
+from settings import get_secrets
 
 
 def get_next_wednesday(after_date):
-    # Wednesday is weekday() == 2
-    days_ahead = 2 - after_date.weekday()
-    if days_ahead <= 0:  # Target day already passed this week
-        days_ahead += 7
-    return after_date + datetime.timedelta(days=days_ahead)
+    # First Wednesday strictly after `after_date`
+    start = after_date + datetime.timedelta(days=1)
+    return cadence.meeting_dates(start, 1, cadence.Cadence(weekdays=(2,)))[0]
+
+
+def merge_schedule_edits(full_df, edited_df, key="Date"):
+    """Align edited rows onto the full schedule by `key` in one pass.
+
+    Rows whose key already exists overwrite the matching schedule row (rows
+    sharing a key are matched in order: the second edited one overwrites the
+    second schedule row with that key), rows with a new key are appended.
+    Returns the merged frame together with the positions of the updated and
+    inserted rows (untouched rows are in neither list).
+    """
+    edited_df = edited_df[full_df.columns]
+
+    def occurrences(df):
+        counts = df.groupby(key, dropna=False, sort=False).cumcount()
+        return pd.MultiIndex.from_arrays([df[key], counts])
+
+    positions = pd.Series(np.arange(len(full_df)), index=occurrences(full_df))
+    target = positions.reindex(occurrences(edited_df)).to_numpy()
+
+    is_new = np.isnan(target)
+    existing = edited_df[~is_new]
+    existing_pos = target[~is_new].astype(int)
 
+    # Sheets stores everything as text, so compare the text representation
+    before = full_df.iloc[existing_pos].astype(str).to_numpy()
+    after = existing.astype(str).to_numpy()
+    changed = (before != after).any(axis=1)
 
-def highlight_empty(val):
-    return "background-color: goldenrod" if val in ["EMPTY", "", " "] else ""
+    merged = full_df.copy()
+    updated_pos = existing_pos[changed]
+    merged.iloc[updated_pos] = existing[changed].to_numpy()
 
+    inserted = edited_df[is_new]
+    merged = pd.concat([merged, inserted], ignore_index=True)
+    inserted_pos = np.arange(len(full_df), len(merged))
+    return merged, updated_pos.tolist(), inserted_pos.tolist()
 
-def highlight_random(val):
-    # make light blue if val starts with [P]
-    color = "background-color: darkblue" if val.startswith("[P]") else ""
-    color = "background-color: darkred" if val.startswith("[C]") else color
-    color = "background-color: darkblue" if val.startswith("[R]") else color
-    return color
+
+STATUS_CSS = {
+    Status.EMPTY: "background-color: goldenrod",
+    Status.PENDING: "background-color: darkblue",
+    Status.RESCHEDULE: "background-color: darkblue",
+    Status.CANCELLED: "background-color: darkred",
+}
+
+
+def schedule_styles(model, rows, columns):
+    # Whole-column CSS for the visible schedule rows, straight from the parsed
+    # status columns (no per-cell Python calls)
+    css = pd.DataFrame("", index=rows, columns=columns)
+    for role in model.roles:
+        if role in css.columns:
+            status = model.status[role].loc[rows]
+            css[role] = status.map(STATUS_CSS).astype(object).fillna("").to_numpy()
+    return css
+
+
+def score_styles(scores):
+    # Red / yellow / green by normalized activity score
+    scores = np.asarray(scores, dtype=float)
+    return np.select(
+        [scores < -0.5, scores > 0.5],
+        ["background-color: red", "background-color: green"],
+        default="background-color: yellow",
+    )
 
 
 def get_fernet():
     # Retrieve the encryption key string from secrets.toml
-    encryption_key_str = st.secrets["encryption_key"]["value"]
+    encryption_key_str = get_secrets()["encryption_key"]["value"]
     encryption_key_bytes = encryption_key_str.encode("utf-8")
     # Use a constant salt (must be the same for encryption and decryption)
     salt = b"mlatml_salt"
@@ -1,16 +1,22 @@
-import streamlit as st
-import datetime as dt
 from datetime import datetime
 import gspread
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaInMemoryUpload
+import asyncio
 import base64
+import concurrent.futures
+import functools
 from email.mime.text import MIMEText
 import smtplib
+import logging
+import re
+import threading
 import time
 
-from funcs import encrypt_name
+from settings import get_secrets, in_streamlit
+
+logger = logging.getLogger(__name__)
 
 SCOPES = [
     "https://www.googleapis.com/auth/drive",
@@ -23,40 +29,187 @@ SCOPES = [
 ###############################################################################
 
 
+def _report_error(message):
+    # Show errors in the app when running under Streamlit, log them otherwise
+    if in_streamlit():
+        import streamlit as st
+
+        st.error(message)
+    else:
+        logger.error(message)
+
+
+class RateLimiter:
+    """Token bucket: `rate_per_minute` requests on average, bursts up to `burst`."""
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst or max(1, rate_per_minute // 6)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Reserve a token now and sleep off any deficit outside the lock
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+# One credential set, gspread client and limiter per process, shared by every
+# session and every tenant (the quota is per service account, not per group).
+_pool_lock = threading.RLock()
+_credentials = None
+_gspread_client = None
+_spreadsheets = {}
+_limiter = None
+
+
+def get_credentials():
+    global _credentials
+    with _pool_lock:
+        if _credentials is None:
+            _credentials = Credentials.from_service_account_info(
+                get_secrets()["gcp_service_account"], scopes=SCOPES
+            )
+        return _credentials
+
+
+def get_limiter():
+    global _limiter
+    with _pool_lock:
+        if _limiter is None:
+            google_config = get_secrets().get("google", {})
+            _limiter = RateLimiter(int(google_config.get("requests_per_minute", 60)))
+        return _limiter
+
+
 def get_gspread_client():
-    service_account_info = st.secrets["gcp_service_account"]
-    credentials = Credentials.from_service_account_info(
-        service_account_info, scopes=SCOPES
+    global _gspread_client
+    with _pool_lock:
+        if _gspread_client is None:
+            _gspread_client = gspread.authorize(get_credentials())
+        return _gspread_client
+
+
+def get_spreadsheet(spreadsheet_id=None):
+    spreadsheet_id = spreadsheet_id or get_secrets()["google_sheets"]["spreadsheet_id"]
+    with _pool_lock:
+        if spreadsheet_id not in _spreadsheets:
+            get_limiter().acquire()
+            _spreadsheets[spreadsheet_id] = get_gspread_client().open_by_key(
+                spreadsheet_id
+            )
+        return _spreadsheets[spreadsheet_id]
+
+
+def get_sheet(sheet_name, spreadsheet_id=None):
+    spreadsheet = get_spreadsheet(spreadsheet_id)
+    get_limiter().acquire()
+    return spreadsheet.worksheet(sheet_name)
+
+
+###############################################################################
+# Concurrent Requests
+###############################################################################
+# Independent Sheets, Drive and Slides calls run on one bounded thread pool
+# ([google] max_concurrent_requests, default 8) so a page waits for its slowest
+# call instead of the sum of them; the limiter still meters every request.
+# The synchronous helpers below stay as they are and are what gets submitted.
+# Service objects are not thread-safe, which is why get_drive_service and
+# get_slides_service build a new one per call. Tasks must not gather() in turn.
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            google_config = get_secrets().get("google", {})
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=int(google_config.get("max_concurrent_requests", 8)),
+                thread_name_prefix="google",
+            )
+        return _executor
+
+
+def gather(*calls):
+    """Run `(func, *args)` calls concurrently and return their results in order.
+
+    The first call runs in the calling thread; the first exception is re-raised
+    once every call has finished.
+    """
+    futures = [get_executor().submit(*call) for call in calls[1:]]
+    try:
+        first = [calls[0][0](*calls[0][1:])] if calls else []
+    finally:
+        concurrent.futures.wait(futures)
+    return first + [f.result() for f in futures]
+
+
+async def run_async(func, *args, **kwargs):
+    """Await a synchronous helper on the shared pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
     )
-    return gspread.authorize(credentials)
 
 
-def get_sheet(sheet_name):
-    client = get_gspread_client()
-    spreadsheet_id = st.secrets["google_sheets"]["spreadsheet_id"]
-    return client.open_by_key(spreadsheet_id).worksheet(sheet_name)
+async def gather_async(*calls):
+    return list(await asyncio.gather(*(run_async(*call) for call in calls)))
 
 
-def get_schedule_df():
-    ws = get_sheet("Schedule")
+def get_schedule_df(spreadsheet_id=None):
     import pandas as pd
 
+    ws = get_sheet("Schedule", spreadsheet_id)
     data = ws.get_all_records()
     df = pd.DataFrame(data)
     if "Date" in df.columns:
+        # The read doubles as a fresh row index for RowEdits
+        set_row_keys("Schedule", "Date", [r["Date"] for r in data], spreadsheet_id)
         df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dt.date
     return df
 
 
-def save_schedule_df(df):
-    ws = get_sheet("Schedule")
+def save_schedule_df(df, spreadsheet_id=None):
+    ws = get_sheet("Schedule", spreadsheet_id)
+    invalidate_row_keys("Schedule", spreadsheet_id)
     ws.clear()
     ws.update([df.columns.values.tolist()] + df.astype(str).values.tolist())
 
 
-def get_participants_list():
-    ws = get_sheet("Participants")
+def update_schedule_rows(
+    df, updated_positions=(), inserted_positions=(), spreadsheet_id=None
+):
+    # Write only the given rows of `df`; sheet rows follow the frame's order
+    # below the header row, so position i lives on sheet row i + 2.
+    ws = get_sheet("Schedule", spreadsheet_id)
+    last_col = gspread.utils.rowcol_to_a1(1, len(df.columns)).rstrip("1")
+    values = df.astype(str).values.tolist()
+    data = [
+        {"range": f"A{pos + 2}:{last_col}{pos + 2}", "values": [values[pos]]}
+        for pos in updated_positions
+    ]
+    if data:
+        ws.batch_update(data)
+    if inserted_positions:
+        invalidate_row_keys("Schedule", spreadsheet_id)
+        ws.append_rows([values[pos] for pos in inserted_positions])
+
+
+def get_participants_list(spreadsheet_id=None):
+    ws = get_sheet("Participants", spreadsheet_id)
     data = ws.get_all_records()
+    set_row_keys("Participants", "Name", [r.get("Name", "") for r in data], spreadsheet_id)
     return [
         {"Name": row.get("Name"), "Email": row.get("Email", "")}
         for row in data
@@ -64,19 +217,206 @@ def get_participants_list():
     ]
 
 
-def save_participants_list(participants):
-    ws = get_sheet("Participants")
+def save_participants_list(participants, spreadsheet_id=None):
+    ws = get_sheet("Participants", spreadsheet_id)
     data = [["Name", "Email"]] + [[p["Name"], p.get("Email", "")] for p in participants]
+    invalidate_row_keys("Participants", spreadsheet_id)
     ws.clear()
     ws.update(data)
 
 
+###############################################################################
+# Row-Level Edits
+###############################################################################
+# Adding or deleting a meeting or a participant should not re-send the whole
+# worksheet. RowEdits finds rows by key (Date in Schedule, Name in
+# Participants) through a cached key -> row index and sends any number of
+# appends, inserts and deletes as one batchUpdate. The index is built from the
+# key column alone (or handed in by a caller that just read the sheet), kept
+# up to date by the edits made through it, and dropped by full rewrites.
+# Another replica may have moved rows since, so deletes never trust it: they
+# re-read the key column right before sending unless handed fresh keys.
+
+_row_keys = {}  # (spreadsheet_id, sheet name) -> [key of each data row]
+_row_keys_lock = threading.Lock()
+
+
+def _normalize_key(key_column, value):
+    if key_column == "Date":
+        import pandas as pd
+
+        date = pd.to_datetime(str(value), errors="coerce")
+        if not pd.isna(date):
+            return date.date().isoformat()
+    return str(value).strip()
+
+
+def get_row_keys(sheet_name, key_column, spreadsheet_id=None, fresh=False):
+    """Keys of the data rows, in sheet order (row i + 2 holds key i).
+
+    With fresh=True the key column is read from the sheet, not the cache.
+    """
+    cache_key = (spreadsheet_id, sheet_name)
+    with _row_keys_lock:
+        if cache_key in _row_keys and not fresh:
+            return list(_row_keys[cache_key])
+    ws = get_sheet(sheet_name, spreadsheet_id)
+    get_limiter().acquire()
+    header = ws.row_values(1)
+    get_limiter().acquire()
+    column = ws.col_values(header.index(key_column) + 1)[1:]
+    # Trailing empty cells are not returned; the sheet may still have rows there
+    keys = [_normalize_key(key_column, v) for v in column]
+    with _row_keys_lock:
+        _row_keys[cache_key] = keys
+    return list(keys)
+
+
+def set_row_keys(sheet_name, key_column, keys, spreadsheet_id=None):
+    with _row_keys_lock:
+        _row_keys[(spreadsheet_id, sheet_name)] = [
+            _normalize_key(key_column, k) for k in keys
+        ]
+
+
+def invalidate_row_keys(sheet_name, spreadsheet_id=None):
+    with _row_keys_lock:
+        _row_keys.pop((spreadsheet_id, sheet_name), None)
+
+
+def _row_data(values):
+    return {
+        "values": [{"userEnteredValue": {"stringValue": str(v)}} for v in values]
+    }
+
+
+class RowEdits:
+    """Structural edits to one worksheet, sent together by commit().
+
+        edits = RowEdits("Schedule", "Date")
+        edits.delete("2025-03-05")
+        edits.append(["2025-06-04", "EMPTY", "EMPTY"])
+        edits.commit()
+
+    `keys` may pass the current key column when the caller has just read it.
+    Unknown keys raise KeyError before anything is sent.
+    """
+
+    def __init__(self, sheet_name, key_column, spreadsheet_id=None, keys=None):
+        self.sheet_name = sheet_name
+        self.key_column = key_column
+        self.spreadsheet_id = spreadsheet_id
+        if keys is None:
+            keys = get_row_keys(sheet_name, key_column, spreadsheet_id)
+        self._keys = [_normalize_key(key_column, k) for k in keys]
+        self._ops = []  # ("delete", position) / ("insert", position, values) / ("append", values)
+
+    def _position(self, key):
+        try:
+            return self._keys.index(_normalize_key(self.key_column, key))
+        except ValueError:
+            raise KeyError(f"No {self.sheet_name} row with {self.key_column} {key}")
+
+    def delete(self, key):
+        pos = self._position(key)
+        del self._keys[pos]
+        self._ops.append(("delete", pos))
+
+    def insert(self, values, before):
+        """Insert `values` (first cell is the key) above the row keyed `before`."""
+        pos = self._position(before)
+        self._keys.insert(pos, _normalize_key(self.key_column, values[0]))
+        self._ops.append(("insert", pos, values))
+
+    def append(self, values):
+        self._keys.append(_normalize_key(self.key_column, values[0]))
+        self._ops.append(("append", values))
+
+    def commit(self):
+        # Positions were resolved against the sheet as it is after the previous
+        # edits, which is the order the batchUpdate applies them in
+        if not self._ops:
+            return
+        ws = get_sheet(self.sheet_name, self.spreadsheet_id)
+        requests = []
+        for op in self._ops:
+            if op[0] == "append":
+                requests.append(
+                    {
+                        "appendCells": {
+                            "sheetId": ws.id,
+                            "rows": [_row_data(op[1])],
+                            "fields": "userEnteredValue",
+                        }
+                    }
+                )
+                continue
+            rows = {
+                "sheetId": ws.id,
+                "dimension": "ROWS",
+                "startIndex": op[1] + 1,  # below the header
+                "endIndex": op[1] + 2,
+            }
+            if op[0] == "delete":
+                requests.append({"deleteDimension": {"range": rows}})
+                continue
+            requests.append(
+                {"insertDimension": {"range": rows, "inheritFromBefore": False}}
+            )
+            requests.append(
+                {
+                    "updateCells": {
+                        "start": {
+                            "sheetId": ws.id,
+                            "rowIndex": op[1] + 1,
+                            "columnIndex": 0,
+                        },
+                        "rows": [_row_data(op[2])],
+                        "fields": "userEnteredValue",
+                    }
+                }
+            )
+        get_limiter().acquire()
+        try:
+            ws.spreadsheet.batch_update({"requests": requests})
+        except Exception:
+            invalidate_row_keys(self.sheet_name, self.spreadsheet_id)
+            raise
+        with _row_keys_lock:
+            _row_keys[(self.spreadsheet_id, self.sheet_name)] = list(self._keys)
+        self._ops = []
+
+
+def delete_schedule_rows(dates, spreadsheet_id=None, keys=None):
+    if keys is None:
+        keys = get_row_keys("Schedule", "Date", spreadsheet_id, fresh=True)
+    edits = RowEdits("Schedule", "Date", spreadsheet_id, keys)
+    for date in dates:
+        edits.delete(date)
+    edits.commit()
+
+
+def add_participants(participants, spreadsheet_id=None):
+    edits = RowEdits("Participants", "Name", spreadsheet_id)
+    for p in participants:
+        edits.append([p["Name"], p.get("Email", "")])
+    edits.commit()
+
+
+def delete_participants(names, spreadsheet_id=None, keys=None):
+    if keys is None:
+        keys = get_row_keys("Participants", "Name", spreadsheet_id, fresh=True)
+    edits = RowEdits("Participants", "Name", spreadsheet_id, keys)
+    for name in names:
+        edits.delete(name)
+    edits.commit()
+
+
 def get_drive_service():
-    service_account_info = st.secrets["gcp_service_account"]
-    credentials = Credentials.from_service_account_info(
-        service_account_info, scopes=SCOPES
-    )
-    return build("drive", "v3", credentials=credentials)
+    # Service objects are not thread-safe, so build one per use on the
+    # shared credentials
+    get_limiter().acquire()
+    return build("drive", "v3", credentials=get_credentials())
 
 
 def upload_file_to_drive(file_name, file_bytes, mime_type, parent_folder_id=None):
@@ -93,17 +433,62 @@ def upload_file_to_drive(file_name, file_bytes, mime_type, parent_folder_id=None
     return uploaded_file.get("id"), uploaded_file.get("webViewLink")
 
 
-def add_material(date_str, title, description="", pdf_name="", pdf_link=""):
-    ws = get_sheet("Materials")
+def drive_file_id(link):
+    # ".../file/d/<id>/view?..." (webViewLink) or "...?id=<id>"
+    match = re.search(r"/d/([\w-]+)|[?&]id=([\w-]+)", str(link))
+    if match is None:
+        return None
+    return match.group(1) or match.group(2)
+
+
+def download_file(file_id, max_bytes=None):
+    # Refuse files over max_bytes before any of their content is fetched
+    if max_bytes is not None:
+        meta = get_drive_service().files().get(fileId=file_id, fields="size").execute()
+        if int(meta.get("size", 0)) > max_bytes:
+            raise ValueError(f"{file_id} is larger than {max_bytes} bytes")
+    return get_drive_service().files().get_media(fileId=file_id).execute()
+
+
+def get_materials_records(spreadsheet_id=None):
+    ws = get_sheet("Materials", spreadsheet_id)
+    return ws.get_all_records()
+
+
+def add_material(
+    date_str, title, description="", pdf_name="", pdf_link="", spreadsheet_id=None
+):
+    ws = get_sheet("Materials", spreadsheet_id)
     new_row = [date_str, title, description, pdf_name, pdf_link]
     ws.append_row(new_row)
 
 
-def delete_material_row(row_index):
-    ws = get_sheet("Materials")
+def delete_material_row(row_index, spreadsheet_id=None):
+    ws = get_sheet("Materials", spreadsheet_id)
     ws.delete_rows(row_index)
 
 
+def delete_material_rows(row_indices, spreadsheet_id=None):
+    # One batchUpdate for all rows, bottom-up so the indices stay valid
+    ws = get_sheet("Materials", spreadsheet_id)
+    requests = [
+        {
+            "deleteDimension": {
+                "range": {
+                    "sheetId": ws.id,
+                    "dimension": "ROWS",
+                    "startIndex": row_index - 1,
+                    "endIndex": row_index,
+                }
+            }
+        }
+        for row_index in sorted(set(row_indices), reverse=True)
+    ]
+    if requests:
+        get_limiter().acquire()
+        ws.spreadsheet.batch_update({"requests": requests})
+
+
 def get_all_materials():
     ws = get_sheet("Materials")
     records = ws.get_all_records()
@@ -122,49 +507,213 @@ def get_all_materials():
     return materials_by_date
 
 
+###############################################################################
+# Availability Utilities
+###############################################################################
+# "Unavailable" worksheet: Name | Start | End | Note, one row per away period
+# (dates inclusive). A missing worksheet just means nobody is away.
+
+
+def get_unavailable_records(spreadsheet_id=None):
+    try:
+        ws = get_sheet("Unavailable", spreadsheet_id)
+    except gspread.exceptions.WorksheetNotFound:
+        return []
+    return ws.get_all_records()
+
+
+def add_unavailable(name, start_str, end_str, note="", spreadsheet_id=None):
+    spreadsheet = get_spreadsheet(spreadsheet_id)
+    get_limiter().acquire()
+    try:
+        ws = spreadsheet.worksheet("Unavailable")
+    except gspread.exceptions.WorksheetNotFound:
+        ws = spreadsheet.add_worksheet("Unavailable", rows=100, cols=4)
+        ws.append_row(["Name", "Start", "End", "Note"])
+    ws.append_row([name, start_str, end_str, note])
+
+
+def delete_unavailable_row(row_index, spreadsheet_id=None):
+    ws = get_sheet("Unavailable", spreadsheet_id)
+    ws.delete_rows(row_index)
+
+
+###############################################################################
+# Schedule Event Log Utilities
+###############################################################################
+
+
+def get_schedule_event_records(spreadsheet_id=None, start=0):
+    try:
+        ws = get_sheet("Events", spreadsheet_id)
+    except gspread.exceptions.WorksheetNotFound:
+        return []
+    if not start:
+        return ws.get_all_records()
+    # Only the rows from the `start`-th event on (the header is row 1)
+    get_limiter().acquire()
+    header = ["Timestamp", "Actor", "Date", "Role", "Old", "New"]
+    return [
+        dict(zip(header, row + [""] * (len(header) - len(row))))
+        for row in ws.get(f"A{start + 2}:F")
+    ]
+
+
+def append_schedule_event_rows(rows, spreadsheet_id=None):
+    spreadsheet = get_spreadsheet(spreadsheet_id)
+    get_limiter().acquire()
+    try:
+        ws = spreadsheet.worksheet("Events")
+    except gspread.exceptions.WorksheetNotFound:
+        ws = spreadsheet.add_worksheet("Events", rows=1000, cols=6)
+        ws.append_row(["Timestamp", "Actor", "Date", "Role", "Old", "New"])
+    get_limiter().acquire()
+    # RAW keeps values such as "2025-01-01" from being turned into dates
+    ws.append_rows(rows, value_input_option="RAW")
+
+
+###############################################################################
+# Archive Utilities
+###############################################################################
+# Rows moved out by archive.py go to "Schedule Archive" / "Materials Archive",
+# created on first use. New columns are added to the header as they appear.
+
+ARCHIVE_SHEETS = {"schedule": "Schedule Archive", "materials": "Materials Archive"}
+
+
+def get_archive_records(kind, spreadsheet_id=None):
+    try:
+        ws = get_sheet(ARCHIVE_SHEETS[kind], spreadsheet_id)
+    except gspread.exceptions.WorksheetNotFound:
+        return []
+    return ws.get_all_records()
+
+
+def append_archive_records(kind, records, spreadsheet_id=None):
+    spreadsheet = get_spreadsheet(spreadsheet_id)
+    get_limiter().acquire()
+    try:
+        ws = spreadsheet.worksheet(ARCHIVE_SHEETS[kind])
+        get_limiter().acquire()
+        header = ws.row_values(1)
+    except gspread.exceptions.WorksheetNotFound:
+        ws = spreadsheet.add_worksheet(ARCHIVE_SHEETS[kind], rows=1000, cols=10)
+        header = []
+    columns = header + [c for r in records for c in r if c not in header]
+    columns = list(dict.fromkeys(columns))
+    if columns != header:
+        get_limiter().acquire()
+        ws.update([columns], "A1")
+    get_limiter().acquire()
+    ws.append_rows(
+        [[str(r.get(c, "")) for c in columns] for r in records],
+        value_input_option="RAW",
+    )
+
+
+###############################################################################
+# Job Claims
+###############################################################################
+# "Jobs" worksheet (Key | Owner | Claimed), created on first use. Sheets has no
+# insert-if-absent, so every replica appends its claim and the first row with
+# the key wins; appends are applied in order, so all replicas agree on it.
+# Only the rows up to the new claim are read back. Claims from before
+# `expired_before` are deleted by one replica a day (it claims the right to),
+# so rows are never deleted twice and the sheet stays short.
+
+
+def _jobs_sheet(spreadsheet_id):
+    spreadsheet = get_spreadsheet(spreadsheet_id)
+    get_limiter().acquire()
+    try:
+        return spreadsheet.worksheet("Jobs")
+    except gspread.exceptions.WorksheetNotFound:
+        ws = spreadsheet.add_worksheet("Jobs", rows=1000, cols=3)
+        ws.append_row(["Key", "Owner", "Claimed"])
+        return ws
+
+
+def _append_claim(ws, key, owner, claimed_at):
+    """The claims up to and including the appended one."""
+    get_limiter().acquire()
+    response = ws.append_row([key, owner, claimed_at], value_input_option="RAW")
+    updated = response.get("updates", {}).get("updatedRange", "")
+    match = re.search(r"(\d+)$", updated)
+    get_limiter().acquire()
+    return ws.get(f"A2:C{match.group(1)}" if match else "A2:C")
+
+
+def _first_claim(rows, key, owner):
+    for row in rows:
+        if row and row[0] == key:
+            return len(row) > 1 and row[1] == owner
+    return False
+
+
+def _expired_claims(rows, expired_before):
+    # Claims are appended in time order, so the expired ones lead the sheet
+    count = 0
+    for row in rows:
+        if len(row) < 3 or row[2] >= expired_before:
+            break
+        count += 1
+    return count
+
+
+def claim_job(key, owner, claimed_at, expired_before, spreadsheet_id=None):
+    ws = _jobs_sheet(spreadsheet_id)
+    rows = _append_claim(ws, key, owner, claimed_at)
+    if _expired_claims(rows, expired_before):
+        prune_key, prune_owner = f"prune@{claimed_at[:10]}", f"{owner}/prune"
+        pruning = _append_claim(ws, prune_key, prune_owner, claimed_at)
+        if _first_claim(pruning, prune_key, prune_owner):
+            get_limiter().acquire()
+            expired = _expired_claims(ws.get("A2:C"), expired_before)
+            if expired:
+                get_limiter().acquire()
+                ws.delete_rows(2, expired + 1)
+    return _first_claim(rows, key, owner)
+
+
 ###############################################################################
 # Slides Utilities
 ###############################################################################
 
 
 def get_slides_service():
-    credentials = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"], scopes=SCOPES
-    )
-    return build("slides", "v1", credentials=credentials)
+    get_limiter().acquire()
+    return build("slides", "v1", credentials=get_credentials())
 
 
-def generate_presentation(date, presenter1, presenter2, template_id, folder_id=None):
-    drive_service = get_drive_service()
-    slides_service = get_slides_service()
+def presentation_name(date):
+    return f"{date} ML Subgroup Meeting"
+
 
-    # Copy the template presentation
-    copy_body = {"name": f"{date} ML Subgroup Meeting"}
+def presentation_url(presentation_id):
+    return f"https://docs.google.com/presentation/d/{presentation_id}/edit"
+
+
+def copy_template(template_id, name, folder_id=None, app_properties=None):
+    # Copy the template presentation, straight into the folder if one is given
+    copy_body = {"name": name}
+    if folder_id:
+        copy_body["parents"] = [folder_id]
+    if app_properties:
+        copy_body["appProperties"] = app_properties
     copied_file = (
-        drive_service.files().copy(fileId=template_id, body=copy_body).execute()
+        get_drive_service().files().copy(fileId=template_id, body=copy_body).execute()
     )
-    presentation_id = copied_file.get("id")
+    return copied_file.get("id")
 
-    # Optionally move the copied file to a specific folder
-    if folder_id:
-        file = (
-            drive_service.files()
-            .get(fileId=presentation_id, fields="parents")
-            .execute()
-        )
-        previous_parents = ",".join(file.get("parents"))
-        drive_service.files().update(
-            fileId=presentation_id,
-            addParents=folder_id,
-            removeParents=previous_parents,
-            fields="id, parents",
-        ).execute()
 
+def share_presentation(presentation_id):
     permission_body = {"type": "anyone", "role": "writer"}
-    drive_service.permissions().create(
+    get_drive_service().permissions().create(
         fileId=presentation_id, body=permission_body
     ).execute()
 
+
+def fill_placeholders(presentation_id, date, presenter1, presenter2):
     requests = [
         {
             "replaceAllText": {
@@ -181,48 +730,87 @@ def generate_presentation(date, presenter1, presenter2, template_id, folder_id=N
         {
             "replaceAllText": {
                 "containsText": {"text": "{{DATE}}", "matchCase": True},
-                "replaceText": datetime.strptime(date, "%Y-%m-%d").strftime("%b %d %Y"),
+                "replaceText": datetime.strptime(date, "%Y-%m-%d").strftime(
+                    "%b %d %Y"
+                ),
             }
         },
         # Add additional requests here for other placeholders if needed.
     ]
-
     body = {"requests": requests}
-    response = (
-        slides_service.presentations()
-        .batchUpdate(presentationId=presentation_id, body=body)
+    get_slides_service().presentations().batchUpdate(
+        presentationId=presentation_id, body=body
+    ).execute()
+
+
+def generate_presentation(date, presenter1, presenter2, template_id, folder_id=None):
+    presentation_id = copy_template(template_id, presentation_name(date), folder_id)
+    # Sharing and filling in the placeholders only need the copy to exist
+    gather(
+        (share_presentation, presentation_id),
+        (fill_placeholders, presentation_id, date, presenter1, presenter2),
+    )
+    return presentation_id, presentation_url(presentation_id)
+
+
+def list_files(query, fields="id, name, createdTime, appProperties"):
+    # Every page of a Drive search
+    files, page_token = [], None
+    while True:
+        response = (
+            get_drive_service()
+            .files()
+            .list(q=query, fields=f"nextPageToken, files({fields})", pageToken=page_token)
+            .execute()
+        )
+        files += response.get("files", [])
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return files
+
+
+def update_file(file_id, body, fields=None):
+    # `fields` picks what the returned file resource includes, e.g. "trashed"
+    extra = {"fields": fields} if fields else {}
+    return (
+        get_drive_service()
+        .files()
+        .update(fileId=file_id, body=body, **extra)
         .execute()
     )
 
-    presentation_url = f"https://docs.google.com/presentation/d/{presentation_id}/edit"
-    return presentation_id, presentation_url
+
+def trash_file(file_id):
+    update_file(file_id, {"trashed": True})
 
 
-def get_all_slides():
+def get_all_slides(spreadsheet_id=None):
     try:
-        ws = get_sheet("Slides")
+        ws = get_sheet("Slides", spreadsheet_id)
         records = ws.get_all_records()
         return records
     except Exception as e:
-        st.error(f"Error fetching slides data: {e}")
+        _report_error(f"Error fetching slides data: {e}")
         return []
 
 
-def find_slide(date_str):
-    slides_data = get_all_slides()
+def find_slide(date_str, spreadsheet_id=None):
+    slides_data = get_all_slides(spreadsheet_id)
     for slide in slides_data:
         if slide.get("Date") == date_str:
             return slide
     return None
 
 
-def add_slide_entry(date_str, presentation_id, presentation_link):
+def add_slide_entry(
+    date_str, presentation_id, presentation_link, spreadsheet_id=None
+):
     try:
-        ws = get_sheet("Slides")
+        ws = get_sheet("Slides", spreadsheet_id)
         new_row = [date_str, presentation_id, presentation_link]
         ws.append_row(new_row)
     except Exception as e:
-        st.error(f"Error adding slide entry: {e}")
+        _report_error(f"Error adding slide entry: {e}")
 
 
 ###############################################################################
@@ -231,10 +819,10 @@ def add_slide_entry(date_str, presentation_id, presentation_link):
 
 
 def get_smtp_connection():
-    smtp_server = st.secrets["smtp_server"]  # e.g. "smtp.cs.toronto.edu"
-    smtp_port = st.secrets.get("smtp_port", 587)  # default to 587 for TLS
-    sender_email = st.secrets["sender_email"]  # your UofT email address
-    smtp_password = st.secrets["smtp_password"]  # your email password
+    smtp_server = get_secrets()["smtp_server"]  # e.g. "smtp.cs.toronto.edu"
+    smtp_port = get_secrets().get("smtp_port", 587)  # default to 587 for TLS
+    sender_email = get_secrets()["sender_email"]  # your UofT email address
+    smtp_password = get_secrets()["smtp_password"]  # your email password
     server = smtplib.SMTP(smtp_server, smtp_port)
     server.starttls()  # secure the connection using TLS
     server.login(sender_email, smtp_password)
@@ -249,152 +837,3 @@ def send_email_via_smtp(smtp_conn, sender, to, subject, message_text):
     message["Subject"] = subject
     # Send the email using the SMTP connection
     smtp_conn.sendmail(sender, to, message.as_string())
-
-
-@st.dialog("Send Confirmation Emails")
-def recipients_dialog(
-    pending_options,
-    pending_mapping,
-    participant_emails,
-    app_url,
-    organizer,
-    sender,
-    email_subject,
-):
-    # Show all pending recipients as a multiselect (all checked by default)
-    selected = st.multiselect(
-        "Select recipients to send emails to:",
-        options=pending_options,
-        default=pending_options,
-        key="selected_recipients",
-    )
-    if st.button("Confirm Selection"):
-        confirmations_sent = 0
-        error_msgs = []
-        try:
-            smtp_conn = get_smtp_connection()  # Open SMTP connection inside the dialog
-        except Exception as e:
-            st.error(f"Error initializing SMTP connection: {e}")
-            return
-
-        # Loop over each selected recipient.
-        for option in selected:
-            entry = pending_mapping[option]
-            to_email = participant_emails.get(entry["clean_name"], "")
-            if not to_email:
-                error_msgs.append(f"No email found for {entry['clean_name']}.")
-                continue
-
-            encrypted_name = encrypt_name(entry["pending_name"])
-            confirmation_link = (
-                f"{app_url}/?confirmation=1"
-                f"&date={entry['date']}"
-                f"&role={entry['role'].replace(' ', '_')}"
-                f"&name={encrypted_name}"
-            )
-            try:
-                formatted_date = dt.datetime.strptime(
-                    entry["date"], "%Y-%m-%d"
-                ).strftime("%B %d, %Y")
-            except Exception:
-                formatted_date = entry["date"]
-
-            with open("email_template.txt", "r") as template_file:
-                email_template = template_file.read()
-            email_message_text = email_template.format(
-                name_presenter=entry["clean_name"],
-                date=formatted_date,
-                confirmation_link=confirmation_link,
-                name_organizer=organizer,
-            )
-            try:
-                send_email_via_smtp(
-                    smtp_conn, sender, to_email, email_subject, email_message_text
-                )
-                confirmations_sent += 1
-            except Exception as e:
-                error_msgs.append(f"Error sending email to {to_email}: {e}")
-
-        try:
-            smtp_conn.quit()
-        except Exception:
-            pass
-
-        st.success(f"Confirmation emails sent to {confirmations_sent} recipients.")
-        if error_msgs:
-            st.write("Errors encountered:")
-            for err in error_msgs:
-                st.write(err)
-
-        with st.spinner("Redirecting to the dashboard..."):
-            time.sleep(3)
-            st.rerun()
-
-
-def send_confirmation_emails():
-    df = get_schedule_df()
-    participants = get_participants_list()
-
-    participant_emails = {}
-    for p in participants:
-        name = p["Name"].strip()
-        email = p.get("Email", "").strip()
-        if email:
-            participant_emails[name] = email
-
-    # Identify pending entries (cells starting with "[P]").
-    pending_entries = []
-    for idx, row in df.iterrows():
-        meeting_date = row.get("Date")
-        meeting_date_str = (
-            meeting_date.strftime("%Y-%m-%d")
-            if isinstance(meeting_date, dt.date)
-            else str(meeting_date)
-        )
-        for role in ["Presenter 1", "Presenter 2"]:
-            cell_val = row.get(role, "")
-            if isinstance(cell_val, str) and cell_val.strip().startswith("[P]"):
-                pending_entries.append(
-                    {
-                        "date": meeting_date_str,
-                        "role": role,
-                        "pending_name": cell_val.strip(),  # e.g. "[P] Abdul"
-                        "clean_name": cell_val.replace(
-                            "[P]", ""
-                        ).strip(),  # e.g. "Abdul"
-                    }
-                )
-
-    if not pending_entries:
-        st.info("No pending confirmation entries found.")
-        return
-
-    # Prepare mapping for display options.
-    pending_mapping = {}
-    pending_options = []
-    for entry in pending_entries:
-        to_email = participant_emails.get(entry["clean_name"], "No Email")
-        display = f"{entry['clean_name']} ({to_email}) on {entry['date']}"
-        pending_options.append(display)
-        pending_mapping[display] = entry
-
-    # Save these in session state so the dialog function can access them.
-    st.session_state.pending_mapping = pending_mapping
-    st.session_state.pending_options = pending_options
-
-    # Email sending details.
-    sender = st.secrets["sender_email"]
-    app_url = st.secrets["app_url"]
-    organizer = st.secrets["organizer_name"]
-    email_subject = "[Confirmation Required] ML Subgroup"
-
-    recipients_dialog(
-        pending_options,
-        pending_mapping,
-        participant_emails,
-        app_url,
-        organizer,
-        sender,
-        email_subject,
-    )
-    st.stop()
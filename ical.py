@@ -0,0 +1,235 @@
+import datetime
+import hashlib
+import threading
+import zoneinfo
+
+import pandas as pd
+
+import schedule_model as sm
+
+###############################################################################
+# iCalendar Feeds
+###############################################################################
+# One feed per participant plus a group-wide feed, generated from the parsed
+# schedule, the Slides sheet and the Zoom link. Feeds are regenerated only for
+# participants whose rows changed and carry an ETag so pollers can get a 304.
+# Optional config (top level or per tenant):
+#   meeting_time = "14:00"            # local start time; all-day events if unset
+#   meeting_duration_minutes = 60
+#   meeting_timezone = "America/Toronto"
+# With a timezone, times are converted to UTC ("...Z"), so no VTIMEZONE is
+# needed; without one they are floating (local to each client).
+
+PRODID = "-//ML@ML//Schedule//EN"
+GROUP_FEED = ""  # key of the group-wide feed
+
+# Pending and confirmed presentations go into feeds; pending ones are TENTATIVE
+FEED_STATUSES = {sm.Status.ACCEPTED: "CONFIRMED", sm.Status.PENDING: "TENTATIVE"}
+
+
+def escape_text(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line):
+    # RFC 5545: lines longer than 75 octets continue on lines starting with a space
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line
+    parts, start = [], 0
+    while start < len(raw):
+        end = min(start + (75 if not parts else 74), len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1  # never split a UTF-8 sequence
+        parts.append(raw[start:end].decode("utf-8"))
+        start = end
+    return "\r\n ".join(parts)
+
+
+def event_times(date, config):
+    meeting_time = config.get("meeting_time")
+    if not meeting_time:
+        day = date.strftime("%Y%m%d")
+        next_day = (date + datetime.timedelta(days=1)).strftime("%Y%m%d")
+        return [f"DTSTART;VALUE=DATE:{day}", f"DTEND;VALUE=DATE:{next_day}"]
+    hour, minute = (int(x) for x in meeting_time.split(":"))
+    start = datetime.datetime.combine(date, datetime.time(hour, minute))
+    end = start + datetime.timedelta(
+        minutes=int(config.get("meeting_duration_minutes") or 60)
+    )
+    tz = config.get("meeting_timezone")
+    time_format = "%Y%m%dT%H%M%S"
+    if tz:
+        # The local wall-clock time in `tz`, DST included, as UTC
+        zone = zoneinfo.ZoneInfo(tz)
+        start, end = (
+            t.replace(tzinfo=zone).astimezone(datetime.timezone.utc)
+            for t in (start, end)
+        )
+        time_format += "Z"
+    return [
+        f"DTSTART:{start.strftime(time_format)}",
+        f"DTEND:{end.strftime(time_format)}",
+    ]
+
+
+def render_event(uid, date, summary, description, status, config, stamp):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        *event_times(date, config),
+        f"SUMMARY:{escape_text(summary)}",
+        f"DESCRIPTION:{escape_text(description)}",
+        f"STATUS:{status}",
+    ]
+    if config.get("zoom_link"):
+        lines.append(f"LOCATION:{escape_text(config['zoom_link'])}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def render_calendar(name, event_lines):
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape_text(name)}",
+        *event_lines,
+        "END:VCALENDAR",
+    ]
+    return "\r\n".join(fold_line(line) for line in lines) + "\r\n"
+
+
+def feed_rows(model, slides):
+    """One row per presenting cell: date, role, status, name, slides link."""
+    cells = model.cells(list(FEED_STATUSES))
+    cells = cells[cells["date"].notna()].copy()
+    links = {str(s.get("Date")): s.get("Presentation_Link", "") for s in slides}
+    cells["day"] = cells["date"].dt.strftime("%Y-%m-%d")
+    cells["slides"] = cells["day"].map(links).fillna("")
+    return cells
+
+
+def fingerprint(*parts):
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+class CalendarFeeds:
+    """Per-participant and group feeds, regenerated incrementally."""
+
+    def __init__(self, calendar_name="ML@ML", group=""):
+        self.calendar_name = calendar_name
+        # Event UIDs are namespaced by group, so a client subscribed to two
+        # groups' feeds never merges their events
+        self.uid_domain = f"{group}.mlatml" if group else "mlatml"
+        self._lock = threading.Lock()
+        self._source_key = None
+        self._fingerprints = {}
+        self._feeds = {}  # name -> (body, etag)
+
+    def update(self, model, slides, config):
+        """Bring the feeds up to date; returns the names that were regenerated."""
+        config = {
+            k: config.get(k)
+            for k in (
+                "zoom_link",
+                "meeting_time",
+                "meeting_duration_minutes",
+                "meeting_timezone",
+            )
+        }
+        source_key = fingerprint(model.version, slides, sorted(config.items()))
+        with self._lock:
+            if source_key == self._source_key:
+                return []
+            rows = feed_rows(model, slides)
+            stamp = datetime.datetime.now(datetime.timezone.utc).strftime(
+                "%Y%m%dT%H%M%SZ"
+            )
+            groups = {GROUP_FEED: rows}
+            groups.update(dict(tuple(rows.groupby("name", observed=True))))
+
+            changed = []
+            for name, person_rows in groups.items():
+                key = fingerprint(
+                    person_rows[["day", "role", "status", "name", "slides"]]
+                    .astype(str)
+                    .values.tolist(),
+                    sorted(config.items()),
+                )
+                if self._fingerprints.get(name) == key:
+                    continue
+                body = self._render(name, person_rows, config, stamp)
+                self._fingerprints[name] = key
+                self._feeds[name] = (body, f'"{key}"')
+                changed.append(name)
+            for name in set(self._feeds) - set(groups):
+                self._fingerprints.pop(name, None)
+                self._feeds.pop(name, None)
+            self._source_key = source_key
+            return changed
+
+    def _render(self, name, rows, config, stamp):
+        events = []
+        if name == GROUP_FEED:
+            title = self.calendar_name
+            for day, day_rows in rows.groupby("day"):
+                presenters = ", ".join(day_rows["name"])
+                description = f"Presenters: {presenters}"
+                if day_rows["slides"].iloc[0]:
+                    description += f"\nSlides: {day_rows['slides'].iloc[0]}"
+                tentative = (day_rows["status"] == sm.Status.PENDING).any()
+                events += render_event(
+                    f"{day}@{self.uid_domain}",
+                    day_rows["date"].iloc[0].date(),
+                    f"{self.calendar_name} meeting",
+                    description,
+                    "TENTATIVE" if tentative else "CONFIRMED",
+                    config,
+                    stamp,
+                )
+        else:
+            title = f"{self.calendar_name} - {name}"
+            for row in rows.itertuples():
+                description = f"You are {row.role} at the {self.calendar_name} meeting."
+                if row.slides:
+                    description += f"\nSlides: {row.slides}"
+                events += render_event(
+                    f"{row.day}-{row.role.replace(' ', '').lower()}"
+                    f"@{self.uid_domain}",
+                    row.date.date(),
+                    f"{self.calendar_name}: presenting ({row.role})",
+                    description,
+                    FEED_STATUSES[row.status],
+                    config,
+                    stamp,
+                )
+        return render_calendar(title, events)
+
+    def get(self, name=GROUP_FEED):
+        """(body, etag) of a feed; participants without presentations get an empty one."""
+        with self._lock:
+            feed = self._feeds.get(name)
+        if feed is None:
+            body = render_calendar(f"{self.calendar_name} - {name}", [])
+            feed = (body, f'"{fingerprint(body)}"')
+        return feed
+
+    def names(self):
+        with self._lock:
+            return sorted(n for n in self._feeds if n != GROUP_FEED)
+
+
+def not_modified(etag, if_none_match):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -0,0 +1,108 @@
+"""Serve the cached iCalendar feeds over HTTP.
+
+    python ical_server.py --port 8502
+
+GET /calendar.ics                       group-wide feed
+GET /calendar/<participant>.ics         one participant's presentations
+GET /<group>/calendar[/<participant>].ics  the same for another reading group
+
+Responses carry an ETag; pollers sending If-None-Match get 304 Not Modified.
+"""
+
+import argparse
+import collections
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import ical
+import schedule_model as sm
+import settings
+import tenancy
+
+_feeds = {}  # tenant name -> (CalendarFeeds, last refresh)
+_locks = collections.defaultdict(threading.Lock)
+_locks_lock = threading.Lock()
+
+
+def tenant_feeds(tenant, ttl):
+    """The tenant's feeds, refreshed from storage at most every `ttl` seconds."""
+    with _locks_lock:
+        lock = _locks[tenant.name]
+    # One lock per group so a slow read for one group never blocks another
+    with lock:
+        feeds, refreshed = _feeds.get(tenant.name, (None, 0.0))
+        if feeds is None:
+            feeds = ical.CalendarFeeds(group=tenant.name)
+        if time.monotonic() - refreshed >= ttl:
+            store = tenant.storage
+            model = sm.ScheduleModel(store.get_schedule_df())
+            feeds.update(model, store.get_slides(), tenant.config)
+            refreshed = time.monotonic()
+        _feeds[tenant.name] = (feeds, refreshed)
+        return feeds
+
+
+def parse_path(path):
+    """(group, participant) for a feed path, or None; participant "" = group feed."""
+    parts = [unquote(p) for p in path.split("?", 1)[0].strip("/").split("/")]
+    group = ""
+    if parts and parts[0] not in ("calendar.ics", "calendar"):
+        group, parts = parts[0], parts[1:]
+    if parts == ["calendar.ics"]:
+        return group, ical.GROUP_FEED
+    if len(parts) == 2 and parts[0] == "calendar" and parts[1].endswith(".ics"):
+        return group, parts[1][: -len(".ics")]
+    return None
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    ttl = 300
+
+    def do_GET(self):
+        parsed = parse_path(self.path)
+        tenant = tenancy.get_tenants().get(parsed[0]) if parsed else None
+        if tenant is None:
+            self.send_error(404)
+            return
+        try:
+            feeds = tenant_feeds(tenant, self.ttl)
+        except Exception as e:
+            self.send_error(503, f"Schedule unavailable: {e}")
+            return
+        body, etag = feeds.get(parsed[1])
+        if ical.not_modified(etag, self.headers.get("If-None-Match")):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/calendar; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", f"public, max-age={self.ttl}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", help="TOML config (default: MLATML_CONFIG)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument(
+        "--ttl", type=int, default=300, help="seconds between schedule reads"
+    )
+    args = parser.parse_args(argv)
+    if args.config:
+        settings.load_config(args.config)
+    FeedHandler.ttl = args.ttl
+    server = ThreadingHTTPServer((args.host, args.port), FeedHandler)
+    print(f"Serving calendar feeds on http://{args.host}:{args.port}/calendar.ics")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
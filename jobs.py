@@ -0,0 +1,509 @@
+"""Run the scheduled jobs (reminders, auto-fill, escalation) next to the app.
+
+    python jobs.py                   every group, until interrupted
+    python jobs.py --group quantum   only this group ("" is the default one)
+    python jobs.py --once remind     run one job now and exit
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import html
+import logging
+import threading
+import time
+import uuid
+
+import assign_schedule as assign
+import concurrency
+import email_messages as em
+import event_log
+import google_utils as gu
+import schedule_model as sm
+import settings
+import tenancy
+
+###############################################################################
+# Background Jobs
+###############################################################################
+# Chores the organizer used to click through in the admin panel, run on a
+# cron-like schedule instead:
+#   remind    email the presenters of the meetings in the next remind_days
+#             days: a reminder if they accepted, the confirmation link again
+#             if their slot is still pending
+#   fill      fill the EMPTY slots, like the "Fill empty slots" button
+#   escalate  tell the organizers about slots still pending escalate_days
+#             before the meeting; with escalate_reopen they are also turned
+#             back into EMPTY slots for the next fill
+# Each job takes a 5-field cron expression (minute hour day month weekday,
+# server local time); "" turns it off:
+#   [jobs]
+#   in_app = true            # run the scheduler inside the Streamlit process
+#   remind = "0 9 * * *"
+#   remind_days = 2
+#   fill = "0 8 * * 1"
+#   escalate = "0 10 * * *"
+#   escalate_days = 3
+#   escalate_to = ["organizer@example.com"]  # default: sender_email
+#   escalate_reopen = false
+# Without in_app, run `python jobs.py` as a sidecar. Every replica may run a
+# scheduler: before a job runs for a given minute, the minute is claimed in
+# the storage backend (claim_job) and only the replica that wins runs it.
+# Emails are claimed one by one as well, so a presenter never gets the same
+# reminder twice, even from "Run now". Claims are taken before sending: an
+# SMTP failure loses that email rather than risking a duplicate.
+
+DEFAULT_SCHEDULES = {
+    "remind": "0 9 * * *",
+    "fill": "0 8 * * 1",
+    "escalate": "0 10 * * *",
+}
+DEFAULT_REMIND_DAYS = 2
+DEFAULT_ESCALATE_DAYS = 3
+MAX_CATCHUP_MINUTES = 5  # minutes re-checked after the ticker was held up
+REMINDER_SUBJECT = "[Reminder] ML Subgroup presentation"
+ESCALATION_SUBJECT = "[Unconfirmed] ML Subgroup presentations"
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+_owner = uuid.uuid4().hex  # this process
+
+logger = logging.getLogger(__name__)
+
+
+def _cron_field(text, low, high):
+    values = set()
+    for part in text.split(","):
+        spec, _, step = part.partition("/")
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start, end = (int(v) for v in spec.split("-", 1))
+        else:
+            start = int(spec)
+            end = high if step else start  # "5/15" = from 5 on, every 15
+        step = int(step) if step else 1
+        if not low <= start <= end <= high or step < 1:
+            raise ValueError(f"Bad cron field: {text!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Cron:
+    """A cron expression (minute hour day month weekday) or an @alias."""
+
+    def __init__(self, expr):
+        self.expr = expr
+        fields = CRON_ALIASES.get(expr.strip(), expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"A cron expression has 5 fields: {expr!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _cron_field(field, *limits) for field, limits in zip(fields, CRON_RANGES)
+        )
+        self.weekdays = {d % 7 for d in weekdays}  # 0 and 7 are both Sunday
+        # As in cron, when both day fields are restricted either one may match
+        restricted = [not field.startswith("*") for field in fields]
+        self._either_day = restricted[2] and restricted[4]
+
+    def matches(self, when):
+        """Whether the minute of datetime `when` is due."""
+        if (
+            when.minute not in self.minutes
+            or when.hour not in self.hours
+            or when.month not in self.months
+        ):
+            return False
+        day = when.day in self.days
+        weekday = (when.weekday() + 1) % 7 in self.weekdays
+        return (day or weekday) if self._either_day else (day and weekday)
+
+
+###############################################################################
+# Jobs
+###############################################################################
+# Each job is `job(tenant, today) -> result` (a count, shown in the metrics).
+
+
+def _jobs_config(tenant):
+    return tenant.get("jobs", {})
+
+
+def _claim(store, kind, entry):
+    # A fresh owner per attempt: a repeated claim from this process must lose too
+    key = f"{kind}:{entry['date']}:{entry['role']}:{entry['clean_name']}"
+    return store.claim_job(key, f"{_owner}/{uuid.uuid4().hex[:8]}")
+
+
+def _upcoming(model, statuses, today, days):
+    """Entries (see email_messages.pending_entries) from today to today + days."""
+    last = today + datetime.timedelta(days=days)
+    return [
+        entry
+        for entry in em.pending_entries(model, statuses)
+        if entry["date"]
+        and today <= datetime.date.fromisoformat(entry["date"]) <= last
+    ]
+
+
+def _send(tenant, messages):
+    """Send (to, subject, html) messages over one connection; returns how many went."""
+    if not messages:
+        return 0
+    sent = 0
+    smtp_conn = gu.get_smtp_connection()
+    try:
+        for to, subject, text in messages:
+            try:
+                gu.send_email_via_smtp(
+                    smtp_conn, tenant["sender_email"], to, subject, text
+                )
+                sent += 1
+            except Exception as e:
+                logger.warning(f"Could not email {to}: {e}")
+    finally:
+        try:
+            smtp_conn.quit()
+        except Exception:
+            pass
+    return sent
+
+
+def reminder_text(tenant, entry):
+    with open("reminder_template.txt", "r") as template_file:
+        template = template_file.read()
+    return template.format(
+        name_presenter=entry["clean_name"],
+        role=entry["role"],
+        date=em.format_date(entry["date"]),
+        detail_link=f"{tenant['app_url']}/{tenant.query(date=entry['date'])}",
+        zoom_link=tenant["zoom_link"],
+        name_organizer=tenant["organizer_name"],
+    )
+
+
+def remind(tenant, today):
+    """Email the presenters of the next remind_days days; returns emails sent."""
+    days = int(_jobs_config(tenant).get("remind_days", DEFAULT_REMIND_DAYS))
+    store = tenant.storage
+    model = sm.ScheduleModel(store.get_schedule_df())
+    emails = em.participant_emails(store.get_participants_list())
+    messages = []
+    for entry in _upcoming(model, sm.PRESENTING, today, days):
+        to = emails.get(entry["clean_name"])
+        if not to or not _claim(store, "remind", entry):
+            continue
+        if entry["status"] is sm.Status.PENDING:
+            text = em.confirmation_text(
+                entry, em.confirmation_url(tenant), tenant["organizer_name"]
+            )
+            messages.append((to, em.CONFIRMATION_SUBJECT, text))
+        else:
+            messages.append((to, REMINDER_SUBJECT, reminder_text(tenant, entry)))
+    return _send(tenant, messages)
+
+
+def fill(tenant, today):
+    """Fill the EMPTY slots; returns how many were filled."""
+    store = tenant.storage
+    # Archived presentations still count towards fairness
+    filler = assign.make_filler(store, archive=tenant.archive)
+    filled = []
+
+    def edit(current):
+        new = filler(current)
+        filled[:] = [assign.empty_slots(current), assign.empty_slots(new)]
+        return new
+
+    with event_log.acting_as("auto-fill"):
+        concurrency.retry_schedule_write(store, edit)
+    before, left = filled
+    if left:
+        logger.warning(
+            f"fill ({tenant.name or 'default'}): nobody eligible for {left} slot(s)"
+        )
+    return before - left
+
+
+def _reopen(store, entries):
+    def apply(current):
+        model = sm.ScheduleModel(current)
+        new = model.frame.copy()
+        dates = model.dates.dt.strftime("%Y-%m-%d")
+        for entry in entries:
+            rows = new.index[dates == entry["date"]]
+            if rows.empty:
+                continue
+            # Only while the same person is still pending
+            cell = new.at[rows[0], entry["role"]]
+            if sm.parse_cell(cell) == (sm.Status.PENDING, entry["clean_name"]):
+                new.at[rows[0], entry["role"]] = sm.format_cell(sm.Status.EMPTY)
+        return new
+
+    with event_log.acting_as("escalation"):
+        concurrency.retry_schedule_write(store, apply)
+
+
+def escalation_text(tenant, entries, reopened):
+    items = "".join(
+        f"<li>{em.format_date(e['date'])}, {html.escape(e['role'])}: "
+        f"{html.escape(e['clean_name'])}</li>"
+        for e in entries
+    )
+    action = (
+        "These slots are now EMPTY and will be filled again."
+        if reopened
+        else "Please follow up or reassign these slots."
+    )
+    return (
+        "<html><body><p>These presentations are still pending confirmation:</p>"
+        f"<ul>{items}</ul><p>{action}</p>"
+        f'<p><a href="{tenant["app_url"]}/{tenant.query()}">Open the schedule</a></p>'
+        "</body></html>"
+    )
+
+
+def escalate(tenant, today):
+    """Report slots still pending escalate_days before the meeting; returns how many."""
+    config = _jobs_config(tenant)
+    days = int(config.get("escalate_days", DEFAULT_ESCALATE_DAYS))
+    store = tenant.storage
+    model = sm.ScheduleModel(store.get_schedule_df())
+    entries = [
+        entry
+        for entry in _upcoming(model, [sm.Status.PENDING], today, days)
+        if _claim(store, "escalate", entry)
+    ]
+    if not entries:
+        return 0
+    reopened = bool(config.get("escalate_reopen", False))
+    if reopened:
+        _reopen(store, entries)
+    to = config.get("escalate_to") or [tenant["sender_email"]]
+    if isinstance(to, str):
+        to = [to]
+    text = escalation_text(tenant, entries, reopened)
+    _send(tenant, [(address, ESCALATION_SUBJECT, text) for address in to])
+    return len(entries)
+
+
+JOBS = {"remind": remind, "fill": fill, "escalate": escalate}
+
+
+###############################################################################
+# Scheduler
+###############################################################################
+
+
+class JobStats:
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0  # due minutes claimed by another replica, or overlapping
+        self.last_run = None
+        self.last_seconds = None
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_result = None
+        self.last_error = None
+
+    def record(self, started, seconds, result=None, error=None):
+        self.runs += 1
+        self.last_run = started
+        self.last_seconds = seconds
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if error is None:
+            self.last_result, self.last_error = result, None
+        else:
+            self.failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+
+    def as_dict(self):
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_run": self.last_run,
+            "last_s": self.last_seconds,
+            "avg_s": self.total_seconds / self.runs if self.runs else None,
+            "max_s": self.max_seconds if self.runs else None,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+class JobScheduler:
+    """Runs one tenant's jobs on their cron schedules, from a ticker thread."""
+
+    def __init__(self, tenant):
+        self.tenant = tenant
+        config = _jobs_config(tenant)
+        self.schedules = {
+            name: Cron(config.get(name, DEFAULT_SCHEDULES[name]))
+            for name in JOBS
+            if config.get(name, DEFAULT_SCHEDULES[name])
+        }
+        self.stats = {name: JobStats() for name in JOBS}
+        self._running = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(JOBS), thread_name_prefix="jobs"
+        )
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._loop, name="job-scheduler", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self):
+        one_minute = datetime.timedelta(minutes=1)
+        checked = _minute(datetime.datetime.now()) - one_minute
+        while not self._stop.is_set():
+            now = _minute(datetime.datetime.now())
+            minute = max(checked + one_minute, now - MAX_CATCHUP_MINUTES * one_minute)
+            while minute <= now:
+                self.tick(minute)
+                minute += one_minute
+            checked = now
+            self._stop.wait(60.5 - time.time() % 60)
+
+    def tick(self, minute):
+        """Start the jobs due at `minute` whose claim this process wins."""
+        futures = {}
+        for name, cron in self.schedules.items():
+            if cron.matches(minute):
+                key = f"{name}@{minute:%Y-%m-%dT%H:%M}"
+                future = self._start(name, minute.date(), key)
+                if future is not None:
+                    futures[name] = future
+        return futures
+
+    def run_now(self, name, today=None):
+        """Run `name` right away (no minute claim); None if it is already running."""
+        return self._start(name, today or datetime.date.today())
+
+    def _start(self, name, today, key=None):
+        with self._lock:
+            if name in self._running:
+                self.stats[name].skipped += 1
+                return None
+            self._running.add(name)
+        try:
+            won = key is None or self.tenant.storage.claim_job(
+                key, f"{_owner}/{uuid.uuid4().hex[:8]}"
+            )
+        except Exception as e:
+            logger.warning(f"Could not claim job {key}: {e}")
+            won = False
+        if not won:
+            with self._lock:
+                self._running.discard(name)
+                self.stats[name].skipped += 1
+            return None
+        return self._executor.submit(self._run, name, today)
+
+    def _run(self, name, today):
+        started = datetime.datetime.now()
+        clock = time.perf_counter()
+        try:
+            result = JOBS[name](self.tenant, today)
+        except Exception as e:
+            logger.exception(f"Job {name} failed")
+            with self._lock:
+                self.stats[name].record(started, time.perf_counter() - clock, error=e)
+            raise
+        else:
+            with self._lock:
+                self.stats[name].record(started, time.perf_counter() - clock, result)
+            return result
+        finally:
+            with self._lock:
+                self._running.discard(name)
+
+    def metrics(self):
+        """One row per job: schedule, runs, failures, skips and timings (seconds)."""
+        with self._lock:
+            return [
+                {
+                    "job": name,
+                    "schedule": self.schedules[name].expr
+                    if name in self.schedules
+                    else "off",
+                    "running": name in self._running,
+                    **self.stats[name].as_dict(),
+                }
+                for name in JOBS
+            ]
+
+
+def _minute(when):
+    return when.replace(second=0, microsecond=0)
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(tenant):
+    """The shared scheduler of `tenant` in this process (not started)."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(tenant.name)
+        if scheduler is None:
+            scheduler = _schedulers[tenant.name] = JobScheduler(tenant)
+        return scheduler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", help="TOML config (default: MLATML_CONFIG)")
+    parser.add_argument(
+        "--group", action="append", help="reading group to run (default: all)"
+    )
+    parser.add_argument("--once", choices=sorted(JOBS), help="run this job and exit")
+    args = parser.parse_args(argv)
+    if args.config:
+        settings.load_config(args.config)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    tenants = tenancy.get_tenants()
+    names = args.group if args.group is not None else list(tenants)
+    unknown = [name for name in names if name not in tenants]
+    if unknown:
+        parser.error(f"Unknown group(s): {', '.join(map(repr, unknown))}")
+    schedulers = [get_scheduler(tenants[name]) for name in names]
+    if args.once:
+        for scheduler in schedulers:
+            result = scheduler.run_now(args.once).result()
+            print(f"{scheduler.tenant.name or 'default'}: {args.once} -> {result}")
+        return
+    for scheduler in schedulers:
+        scheduler.start()
+    print(f"Running jobs for {len(schedulers)} group(s); Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""Load test of the Streamlit app: concurrent scripted sessions, no network.
+
+    python load_test.py --sessions 20 --runs 5 --latency-ms 150
+    python load_test.py --scenarios main confirm --latency-ms 300 --jitter-ms 100 --json
+
+Main.py is served by a Streamlit server started inside this process on a
+local port, and every session is a websocket client speaking the browser's
+protocol, so page scripts run on the server's own threads with the shared
+caches, write coalescer and backend, as in production. The backend is the
+memory store seeded with a synthetic group (--participants, --weeks of past
+and future meetings, every future slot pending), so nothing leaves the
+machine; --latency-ms and --jitter-ms stand in for Sheets round trips.
+Each scenario runs `sessions` concurrent sessions of `runs` scripted runs:
+  main     open the schedule page
+  detail   open a meeting's detail page
+  confirm  open a confirmation link and click Confirm (a new pending slot per
+           run while they last, then the "already used" path)
+  admin    log in as admin and click "Add Row" (one schedule write)
+Reported per scenario: runs, errors, throughput (runs/s over the scenario's
+wall time), p50/p95/p99 latency of a run (every page render it takes, until
+the last script run finishes) and backend calls (per run, and the most
+frequent ones). Caches start empty for every scenario; --cold empties them
+before every run. The pause before a confirmation page redirects is set to 0.
+Other keys of --config (e.g. [storage] write_window_ms) apply as usual.
+"""
+
+import argparse
+import asyncio
+import collections
+import datetime
+import itertools
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+import schedule_model as sm
+import storage
+
+SCENARIOS = ["main", "detail", "confirm", "admin"]
+ADMIN_PASSWORD = "load-test"
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Main.py")
+
+
+###############################################################################
+# Synthetic group
+###############################################################################
+
+
+def seed_store(path, participants=40, weeks=52, seed=0):
+    """A SQLite file with `weeks` past and `weeks` future weekly meetings.
+
+    Past slots are accepted, future ones pending; every other past meeting
+    has a document.
+    """
+    rng = random.Random(seed)
+    names = [f"Participant {i:02d}" for i in range(participants)]
+    today = datetime.date.today()
+    rows = []
+    for week in range(-weeks, weeks):
+        status = sm.Status.ACCEPTED if week < 0 else sm.Status.PENDING
+        pair = rng.sample(names, len(sm.ROLE_COLS))
+        rows.append(
+            {
+                "Date": str(today + datetime.timedelta(weeks=week)),
+                **{
+                    role: sm.format_cell(status, name)
+                    for role, name in zip(sm.ROLE_COLS, pair)
+                },
+            }
+        )
+    store = storage.SQLiteStorage(path)
+    store.save_schedule_df(pd.DataFrame(rows))
+    store.save_participants_list(
+        [{"Name": n, "Email": f"{i}@example.org"} for i, n in enumerate(names)]
+    )
+    for row in rows[:weeks:2]:
+        store.add_material(row["Date"], f"Paper on topic {rng.randrange(100)}")
+    return pd.DataFrame(rows)
+
+
+def app_config(args, tmp, seed_path):
+    """The secrets the served app runs with: --config on the seeded memory store."""
+    import settings
+
+    config = settings.load_config(args.config) if args.config else {}
+    config.pop("tenants", None)
+    config.setdefault("mlatml_folder_id", "")
+    config.setdefault("mlatml_slides_folder_id", "")
+    config.setdefault("slides_template_id", "")
+    config.setdefault("zoom_link", "https://example.org/zoom")
+    config.setdefault("encryption_key", {"value": "load-test"})
+    config["admin_password"] = ADMIN_PASSWORD
+    config["slides_pool_size"] = 0  # no Drive copies
+    config["redirect_seconds"] = 0
+    storage_config = {
+        k: v
+        for k, v in config.get("storage", {}).items()
+        if k not in ("snapshot_dir", "archive_path")
+    }
+    storage_config.update(
+        backend="memory",
+        seed=seed_path,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        pdf_index=os.path.join(tmp, "pdf_text.sqlite"),
+    )
+    config["storage"] = storage_config
+    return config
+
+
+def _toml_value(value):
+    # JSON strings, numbers, booleans and arrays are valid TOML
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+def write_toml(config, path):
+    lines, tables = [], []
+    for key, value in config.items():
+        if isinstance(value, dict):
+            tables.append((key, value))
+        else:
+            lines.append(f"{key} = {_toml_value(value)}")
+    while tables:
+        name, table = tables.pop(0)
+        lines.append(f"\n[{name}]")
+        for key, value in table.items():
+            if isinstance(value, dict):
+                tables.append((f"{name}.{key}", value))
+            else:
+                lines.append(f"{key} = {_toml_value(value)}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+###############################################################################
+# Server
+###############################################################################
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(secrets_path):
+    """Serve Main.py on a background thread; returns the websocket URL."""
+    from streamlit.web import bootstrap
+    from streamlit.web.server import Server
+
+    port = _free_port()
+    bootstrap.load_config_options(
+        {
+            "server_address": "127.0.0.1",
+            "server_port": port,
+            "server_headless": True,
+            "server_fileWatcherType": "none",
+            "secrets_files": [secrets_path],
+            "browser_gatherUsageStats": False,
+            "logger_level": "error",
+        }
+    )
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(Server(MAIN_SCRIPT, is_hello=False).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, name="load-test-server", daemon=True).start()
+    ready.wait()
+    return f"ws://127.0.0.1:{port}/_stcore/stream"
+
+
+###############################################################################
+# Sessions
+###############################################################################
+
+
+class ScriptError(Exception):
+    pass
+
+
+class Session:
+    """One browser tab: a websocket to the server and the widgets last drawn."""
+
+    def __init__(self, url):
+        self.url = url
+        self.widgets = {}  # label -> widget id
+        self._ws = None
+
+    async def __aenter__(self):
+        import websockets
+
+        self._ws = await websockets.connect(
+            self.url, subprotocols=["streamlit"], max_size=None
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._ws.close()
+
+    async def rerun(self, query="", **widget_values):
+        """Run the page with these widget values; True for a button click.
+
+        Returns once the script (and any st.rerun it asked for) finished.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.query_string = query
+        for label, value in widget_values.items():
+            state = message.rerun_script.widget_states.widgets.add()
+            state.id = self.widgets[label]
+            if value is True:
+                state.trigger_value = True
+            else:
+                state.string_value = value
+        await self._ws.send(message.SerializeToString())
+        errors = []
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self._ws.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                widget = element.WhichOneof("type")
+                if widget == "exception":
+                    errors.append(element.exception.message)
+                elif widget in ("button", "text_input"):
+                    widget = getattr(element, widget)
+                    self.widgets[widget.label] = widget.id
+            elif kind == "script_finished":
+                status = forward.script_finished
+                if status == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR or errors:
+                    raise ScriptError(errors[0] if errors else "compile error")
+                return
+
+
+class Scripts:
+    """The scripted runs; hands out the dates and pending slots they use."""
+
+    def __init__(self, schedule):
+        import funcs as fns
+
+        self._dates = itertools.cycle(list(schedule["Date"]))
+        today = str(datetime.date.today())
+        self._pending = itertools.cycle(
+            [
+                (row["Date"], role, fns.encrypt_name(row[role]))
+                for _, row in schedule.iterrows()
+                if row["Date"] >= today
+                for role in sm.ROLE_COLS
+            ]
+        )
+
+    async def main(self, session):
+        await session.rerun()
+
+    async def detail(self, session):
+        await session.rerun(f"date={next(self._dates)}")
+
+    async def confirm(self, session):
+        date, role, name = next(self._pending)
+        query = urllib.parse.urlencode(
+            {
+                "confirmation": "1",
+                "date": date,
+                "role": role.replace(" ", "_"),
+                "name": name,
+            }
+        )
+        await session.rerun(query)
+        await session.rerun(query, **{"Confirm ✅": True})
+
+    async def admin(self, session):
+        await session.rerun()
+        password = {"Admin password:": ADMIN_PASSWORD}
+        await session.rerun(**password)
+        await session.rerun(**password, **{"Add Row": True})
+
+
+async def run_sessions(url, script, sessions, runs, cold):
+    """(latencies, errors) of `sessions` concurrent sessions x `runs` runs."""
+    import tenancy
+
+    latencies, errors = [], collections.Counter()
+
+    async def one_session():
+        async with Session(url) as session:
+            for _ in range(runs):
+                if cold:
+                    tenancy.clear_caches()
+                started = time.perf_counter()
+                try:
+                    await script(session)
+                except Exception as e:
+                    errors[f"{type(e).__name__}: {e}"] += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one_session() for _ in range(sessions)))
+    return latencies, errors
+
+
+def run_scenario(name, url, scripts, store, sessions, runs, cold=False):
+    """{scenario, runs, errors, ...} for `sessions` x `runs` runs of `name`."""
+    import tenancy
+
+    tenancy.clear_caches()
+    calls_before = collections.Counter(store.calls)
+    started = time.perf_counter()
+    latencies, errors = asyncio.run(
+        run_sessions(url, getattr(scripts, name), sessions, runs, cold)
+    )
+    elapsed = time.perf_counter() - started
+    calls = collections.Counter(store.calls)
+    calls.subtract(calls_before)
+    calls = +calls  # drop the zero counts
+
+    total = sessions * runs
+    result = {
+        "scenario": name,
+        "runs": total,
+        "errors": sum(errors.values()),
+        "throughput": round(len(latencies) / elapsed, 2),
+        "backend_calls_per_run": round(sum(calls.values()) / total, 2),
+        "backend_calls": dict(calls.most_common()),
+        "error_messages": dict(errors.most_common(3)),
+    }
+    if latencies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        result.update(p50_ms=round(p50, 1), p95_ms=round(p95, 1), p99_ms=round(p99, 1))
+    return result
+
+
+def print_text(results):
+    columns = [
+        "runs",
+        "errors",
+        "throughput",
+        "p50_ms",
+        "p95_ms",
+        "p99_ms",
+        "backend_calls_per_run",
+    ]
+    table = pd.DataFrame(results).set_index("scenario")
+    print(table.reindex(columns=columns).to_string())
+    for result in results:
+        top = ", ".join(f"{k} {v}" for k, v in list(result["backend_calls"].items())[:5])
+        print(f"{result['scenario']}: {top or 'no backend calls'}")
+        for message, count in result["error_messages"].items():
+            print(f"  {count}x {message}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", help="TOML config to start from (optional)")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS
+    )
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent sessions")
+    parser.add_argument("--runs", type=int, default=3, help="runs per session")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--participants", type=int, default=40)
+    parser.add_argument(
+        "--weeks", type=int, default=52, help="past (and future) weeks of meetings"
+    )
+    parser.add_argument("--cold", action="store_true", help="no cache between runs")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="mlatml-load-") as tmp:
+        seed_path = os.path.join(tmp, "seed.sqlite")
+        schedule = seed_store(seed_path, args.participants, args.weeks, args.seed)
+        secrets_path = os.path.join(tmp, "secrets.toml")
+        write_toml(app_config(args, tmp, seed_path), secrets_path)
+        url = start_server(secrets_path)
+
+        import tenancy
+
+        # This process now runs the server, so the config below is the app's
+        # secrets and the store is the very one its sessions use
+        store = tenancy.resolve_tenant({}).storage
+        scripts = Scripts(schedule)
+        results = [
+            run_scenario(name, url, scripts, store, args.sessions, args.runs, args.cold)
+            for name in args.scenarios
+        ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_text(results)
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
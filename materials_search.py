@@ -0,0 +1,230 @@
+import bisect
+import collections
+import math
+import threading
+
+from pdf_text import STOPWORDS
+from search_index import TOKEN_RE, fold_text
+from storage import MATERIAL_COLUMNS
+
+###############################################################################
+# Materials Search
+###############################################################################
+# An inverted index over the materials of every meeting: title, description,
+# PDF name and the keywords extracted from the PDF (pdf_text.py), weighted in
+# that order. The index lives in memory next to the store and follows it:
+# add_material and delete_material_row(s) made through SearchableStorage
+# update it on the spot, and each get_materials() read reconciles it with
+# what the backend returned (changes by other replicas), touching only the
+# rows that differ. Archived materials and PDF keywords are synced the same
+# way by the search page. A query is answered from memory: every word must
+# match (as a word prefix), results are ranked by tf-idf and then by date.
+
+FIELD_WEIGHTS = {"Title": 3.0, "PDF_Name": 2.0, "Description": 1.5, "pdf": 1.0}
+DEFAULT_LIMIT = 50
+
+
+def terms(text):
+    """Folded words of `text` worth indexing."""
+    return [
+        token
+        for token in TOKEN_RE.findall(fold_text(text))
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def _record_key(record):
+    return tuple(str(record.get(c, "")) for c in MATERIAL_COLUMNS)
+
+
+class MaterialsIndex:
+    def __init__(self):
+        self.loaded = False  # set by the first sync()
+        self._docs = {}  # id -> material record
+        self._weights = {}  # id -> {token: weight}
+        self._postings = collections.defaultdict(dict)  # token -> {id: weight}
+        self._tokens = []  # sorted, for prefix lookups
+        self._rows = []  # ids of the store's materials, in row order
+        self._archived = []  # ids of archived materials
+        self._pdf_keywords = {}  # PDF link -> keywords
+        self._pdf_synced = 0.0
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    # Documents
+
+    def _doc_weights(self, record):
+        weights = collections.Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            if field == "pdf":
+                words = self._pdf_keywords.get(record.get("PDF_Link"), ())
+            else:
+                words = terms(record.get(field, ""))
+            for token in words:
+                weights[token] += weight
+        return weights
+
+    def _index(self, doc_id):
+        weights = self._doc_weights(self._docs[doc_id])
+        self._weights[doc_id] = weights
+        for token, weight in weights.items():
+            if token not in self._postings:
+                bisect.insort(self._tokens, token)
+            self._postings[token][doc_id] = weight
+
+    def _unindex(self, doc_id):
+        for token in self._weights.pop(doc_id, {}):
+            postings = self._postings[token]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect.bisect_left(self._tokens, token)]
+
+    def _add(self, record):
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = {c: str(record.get(c, "")) for c in MATERIAL_COLUMNS}
+        self._index(doc_id)
+        return doc_id
+
+    def _remove(self, doc_id):
+        self._unindex(doc_id)
+        del self._docs[doc_id]
+
+    # Changes made through the store
+
+    def add(self, record):
+        with self._lock:
+            self._rows.append(self._add(record))
+
+    def remove_rows(self, row_indices):
+        """Drop the materials at these sheet rows (the first record is row 2)."""
+        with self._lock:
+            positions = {row_index - 2 for row_index in row_indices}
+            for position in positions:
+                if 0 <= position < len(self._rows):
+                    self._remove(self._rows[position])
+            self._rows = [
+                doc_id for i, doc_id in enumerate(self._rows) if i not in positions
+            ]
+
+    # Reconciling with reads
+
+    def _sync(self, ids, records):
+        # Keep the ids whose record is unchanged, index only the difference
+        by_key = collections.defaultdict(list)
+        for doc_id in ids:
+            by_key[_record_key(self._docs[doc_id])].append(doc_id)
+        synced = []
+        for record in records:
+            same = by_key.get(_record_key(record))
+            synced.append(same.pop() if same else self._add(record))
+        for stale in by_key.values():
+            for doc_id in stale:
+                self._remove(doc_id)
+        return synced
+
+    def sync(self, records):
+        """Match the index to the store's materials `records`."""
+        with self._lock:
+            self._rows = self._sync(self._rows, records)
+            self.loaded = True
+
+    def sync_archived(self, records):
+        with self._lock:
+            self._archived = self._sync(self._archived, records)
+
+    def sync_pdf_keywords(self, pdf_index):
+        """Add keywords of PDFs extracted since the last call (a pdf_text index)."""
+        with self._lock:
+            changed = pdf_index.keywords_since(self._pdf_synced)
+            if not changed:
+                return
+            for link, (words, extracted) in changed.items():
+                self._pdf_keywords[link] = words
+                self._pdf_synced = max(self._pdf_synced, extracted)
+            for doc_id, record in self._docs.items():
+                if record["PDF_Link"] in changed:
+                    self._unindex(doc_id)
+                    self._index(doc_id)
+
+    # Queries
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """[(score, record)] best first; records carry "Archived" (bool)."""
+        words = set(terms(query))
+        if not words:
+            return []
+        with self._lock:
+            n_docs = max(len(self._docs), 1)
+            scores = None
+            for word in words:
+                position = bisect.bisect_left(self._tokens, word)
+                word_scores = collections.Counter()
+                while position < len(self._tokens):
+                    token = self._tokens[position]
+                    if not token.startswith(word):
+                        break
+                    position += 1
+                    postings = self._postings[token]
+                    idf = math.log(1 + n_docs / len(postings))
+                    for doc_id, weight in postings.items():
+                        word_scores[doc_id] += weight * idf
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {
+                        doc_id: score + word_scores[doc_id]
+                        for doc_id, score in scores.items()
+                        if doc_id in word_scores
+                    }
+                if not scores:
+                    return []
+            archived = set(self._archived)
+            # Best score first, the newest meeting first among equal scores
+            ranked = sorted(
+                scores.items(),
+                key=lambda item: self._docs[item[0]]["Date"],
+                reverse=True,
+            )
+            ranked.sort(key=lambda item: -item[1])
+            return [
+                (score, {**self._docs[doc_id], "Archived": doc_id in archived})
+                for doc_id, score in ranked[:limit]
+            ]
+
+
+class SearchableStorage:
+    """Wraps a backend so its materials index follows every add and delete."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+        self.materials_index = MaterialsIndex()
+
+    def __getattr__(self, attr):
+        return getattr(self.inner, attr)
+
+    def get_materials(self):
+        records = self.inner.get_materials()
+        self.materials_index.sync(records)
+        return records
+
+    def add_material(self, date_str, title, description="", pdf_name="", pdf_link=""):
+        self.inner.add_material(date_str, title, description, pdf_name, pdf_link)
+        if self.materials_index.loaded:
+            values = [date_str, title, description, pdf_name, pdf_link]
+            self.materials_index.add(dict(zip(MATERIAL_COLUMNS, values)))
+
+    def delete_material_row(self, row_index):
+        self.inner.delete_material_row(row_index)
+        if self.materials_index.loaded:
+            self.materials_index.remove_rows([row_index])
+
+    def delete_material_rows(self, row_indices):
+        self.inner.delete_material_rows(row_indices)
+        if self.materials_index.loaded:
+            self.materials_index.remove_rows(row_indices)
@@ -0,0 +1,93 @@
+import streamlit as st
+import altair as alt
+
+import archive
+import fairness
+import google_utils as gu
+import schedule_model as sm
+import tenancy
+
+
+tenant = tenancy.resolve_tenant(st.query_params)
+if tenant is None:
+    st.error("Unknown group.")
+    st.stop()
+
+
+# The report is rebuilt only when the schedule version changes; it covers the
+# archived meetings too
+@tenancy.tenant_cache(ttl=300, max_entries=1)
+def load_fairness_model(tenant):
+    df, archived = gu.gather(
+        (tenant.storage.get_schedule_df,),
+        (archive.archived_schedule, tenant.archive),
+    )
+    return sm.ScheduleModel(archive.with_archive(df, archived))
+
+
+@tenancy.tenant_cache(ttl=300, max_entries=1)
+def load_fairness_roster(tenant):
+    return tuple(p["Name"] for p in tenant.storage.get_participants_list())
+
+
+@tenancy.tenant_cache(max_entries=2)
+def fairness_report(tenant, version, roster):
+    return fairness.build_report(load_fairness_model(tenant), roster)
+
+
+@tenancy.tenant_cache(max_entries=2)
+def fairness_charts(tenant, version, roster):
+    report = fairness_report(tenant, version, roster)
+    load = report.load.reset_index().melt(
+        "quarter", var_name="Name", value_name="Presentations"
+    )
+    load_chart = (
+        alt.Chart(load)
+        .mark_line(point=True)
+        .encode(x="quarter:O", y="Presentations:Q", color="Name:N")
+    )
+    gini_chart = (
+        alt.Chart(report.gini.reset_index())
+        .mark_bar()
+        .encode(x="quarter:O", y=alt.Y("Gini:Q", scale=alt.Scale(domain=[0, 1])))
+    )
+    return load_chart, gini_chart
+
+
+st.set_page_config(page_title="ML@ML - Fairness", page_icon="logo.png")
+
+admin_password = st.sidebar.text_input("Admin password:", type="password")
+if admin_password != tenant["admin_password"]:
+    st.info("Enter the admin password in the sidebar to see the analytics.")
+    st.stop()
+
+st.title("Fairness 📊")
+
+with st.spinner("Loading data. Please wait..."):
+    model = load_fairness_model(tenant)
+    roster = load_fairness_roster(tenant)
+    report = fairness_report(tenant, model.version, roster)
+    load_chart, gini_chart = fairness_charts(tenant, model.version, roster)
+
+if report.load.empty:
+    st.info("No presentations in the schedule yet.")
+    st.stop()
+
+st.subheader("Presentations per quarter")
+st.altair_chart(load_chart, use_container_width=True)
+
+st.subheader("Load spread (Gini per quarter)")
+st.caption("0 means everyone presented equally often; 1 means one person did it all.")
+st.altair_chart(gini_chart, use_container_width=True)
+
+st.subheader("Reschedules and cancellations")
+st.caption("Declined invitations are cleared from the schedule and not counted.")
+st.dataframe(report.rates, use_container_width=True)
+
+st.subheader("Time between presentations")
+st.dataframe(report.waits, use_container_width=True)
+
+if st.button("Refresh Data"):
+    load_fairness_model.clear(tenant)
+    load_fairness_roster.clear(tenant)
+    st.rerun()
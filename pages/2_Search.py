@@ -0,0 +1,71 @@
+import html
+import time
+
+import streamlit as st
+
+import archive
+import tenancy
+
+
+tenant = tenancy.resolve_tenant(st.query_params)
+if tenant is None:
+    st.error("Unknown group.")
+    st.stop()
+
+
+# The archive only changes when the archive job runs
+@tenancy.tenant_cache(ttl=3600, max_entries=1)
+def sync_archived_materials(tenant):
+    records = archive.archived_materials(tenant.archive)
+    tenant.storage.materials_index.sync_archived(records)
+    return len(records)
+
+
+def load_materials_index(tenant):
+    # The index follows the store's own adds and deletes (see
+    # materials_search.py); the Materials sheet is read only to build it
+    store = tenant.storage
+    index = store.materials_index
+    if not index.loaded:
+        store.get_materials()
+    sync_archived_materials(tenant)
+    index.sync_pdf_keywords(tenant.pdf_text.index)
+    return index
+
+
+st.set_page_config(page_title="ML@ML - Search", page_icon="logo.png")
+
+st.title("Search documents 🔎")
+
+query = st.text_input(
+    "Titles, descriptions and PDFs of every meeting:", value=st.query_params.get("q", "")
+)
+if not query.strip():
+    st.stop()
+
+with st.spinner("Loading data. Please wait..."):
+    index = load_materials_index(tenant)
+started = time.perf_counter()
+results = index.search(query)
+elapsed_ms = (time.perf_counter() - started) * 1000
+
+st.caption(f"{len(results)} result(s) in {elapsed_ms:.1f} ms")
+if not results:
+    st.info("No documents match all of these words.")
+
+for score, record in results:
+    label = f"{record['Date']} · {record['Title']}"
+    if record["Archived"]:
+        label += " (archived)"
+    # Relative to this page, so the link lands on the main page's detail view
+    link = html.escape(f"./{tenant.query(date=record['Date'])}", quote=True)
+    href = f'<a href="{link}" target="_self">'
+    st.markdown(f"##### {href}{html.escape(label)}</a>", unsafe_allow_html=True)
+    if record["Description"]:
+        st.caption(record["Description"])
+    if record["PDF_Link"]:
+        # Both come from the uploader, so neither may carry markup
+        name = html.escape(record["PDF_Name"] or "View PDF", quote=True)
+        link = html.escape(record["PDF_Link"], quote=True)
+        href = f'<a href="{link}" target="_blank">{name}</a>'
+        st.markdown(href, unsafe_allow_html=True)
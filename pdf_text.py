@@ -0,0 +1,277 @@
+import collections
+import concurrent.futures
+import contextlib
+import io
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+from search_index import TOKEN_RE, fold_text
+
+###############################################################################
+# PDF Text Extraction
+###############################################################################
+# Text of the PDFs attached to materials, so they can be searched. Uploads are
+# handed to a small pool of worker threads together with their bytes; PDFs
+# that only exist as Drive links (older materials, or an upload that was
+# dropped) are found by backfill() and downloaded by the workers. The page
+# never waits for either. Per document the index keeps the first
+# MAX_TEXT_CHARS characters (zlib-compressed) and its top keywords, in a local
+# SQLite file:
+#   [storage]
+#   pdf_index = "mlatml_pdf_text.sqlite"
+#   pdf_workers = 2
+# Memory stays bounded: at most `workers` PDFs are parsed at once, at most
+# MAX_PENDING wait in the queue (further submissions are dropped and picked
+# up by a later backfill), Drive files over MAX_PDF_BYTES are skipped without
+# being downloaded, and only the first MAX_PAGES pages are read.
+# Needs pypdf. Failed documents are recorded and retried after RETRY_SECONDS.
+
+DEFAULT_INDEX_PATH = "mlatml_pdf_text.sqlite"
+DEFAULT_WORKERS = 2
+MAX_PENDING = 8
+MAX_PDF_BYTES = 25 * 1024 * 1024
+MAX_PAGES = 200
+MAX_TEXT_CHARS = 50_000
+N_KEYWORDS = 20
+RETRY_SECONDS = 24 * 3600
+
+STOPWORDS = frozenset(
+    """
+    about above after again against also among and any are because been
+    before being below between both but can could did does doing down during
+    each either else etc few for from further had has have having her here
+    hers him his how however into its itself just let more most much must
+    not now off once only other our ours out over own same she should since
+    some such than that the their theirs them then there these they this
+    those through thus too under until upon very via was were what when
+    where which while who whom why will with within without would yet you
+    your yours
+    """.split()
+)
+
+logger = logging.getLogger(__name__)
+
+
+def extract_text(data, max_pages=MAX_PAGES, max_chars=MAX_TEXT_CHARS):
+    """(text, pages) of a PDF given as bytes; text is whitespace-collapsed."""
+    import pypdf
+
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    parts, size, pages = [], 0, 0
+    for page in reader.pages:
+        if pages >= max_pages or size >= max_chars:
+            break
+        pages += 1
+        text = " ".join((page.extract_text() or "").split())
+        parts.append(text)
+        size += len(text) + 1
+    return " ".join(parts)[:max_chars], pages
+
+
+def keywords(text, n=N_KEYWORDS):
+    """The `n` most frequent words of `text` (folded, stopwords dropped)."""
+    counts = collections.Counter(
+        token
+        for token in TOKEN_RE.findall(fold_text(text))
+        if len(token) > 2 and not token.isdigit() and token not in STOPWORDS
+    )
+    return [token for token, _ in counts.most_common(n)]
+
+
+###############################################################################
+# Index
+###############################################################################
+
+
+class PdfTextIndex:
+    """Extracted text per PDF link, in a local SQLite file."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents (link TEXT PRIMARY KEY, "
+                "pdf_name TEXT, status TEXT, pages INTEGER, keywords TEXT, "
+                "text BLOB, extracted REAL)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One connection per call, so worker threads never share one
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commits, or rolls back on error
+                yield conn
+        finally:
+            conn.close()  # the sqlite3 context manager alone leaves it open
+
+    def put(self, link, pdf_name, status, text="", pages=0, words=()):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    link,
+                    pdf_name,
+                    status,
+                    pages,
+                    json.dumps(list(words)),
+                    zlib.compress(text.encode("utf-8")),
+                    time.time(),
+                ),
+            )
+
+    def delete(self, link):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM documents WHERE link = ?", (link,))
+
+    def get(self, link):
+        """{link, pdf_name, status, pages, keywords, text, extracted} or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT link, pdf_name, status, pages, keywords, text, extracted "
+                "FROM documents WHERE link = ?",
+                (link,),
+            ).fetchone()
+        return None if row is None else self._document(row)
+
+    @staticmethod
+    def _document(row):
+        link, pdf_name, status, pages, words, text, extracted = row
+        return {
+            "link": link,
+            "pdf_name": pdf_name,
+            "status": status,
+            "pages": pages,
+            "keywords": json.loads(words),
+            "text": zlib.decompress(text).decode("utf-8"),
+            "extracted": extracted,
+        }
+
+    def documents(self):
+        """Every extracted document (status "ok")."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT link, pdf_name, status, pages, keywords, text, extracted "
+                "FROM documents WHERE status = 'ok'"
+            ).fetchall()
+        return [self._document(row) for row in rows]
+
+    def keywords_since(self, since):
+        """{link: (keywords, extracted)} of documents extracted after `since`."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT link, keywords, extracted FROM documents "
+                "WHERE status = 'ok' AND extracted > ?",
+                (since,),
+            ).fetchall()
+        return {link: (json.loads(words), extracted) for link, words, extracted in rows}
+
+    def settled_links(self, retry_seconds=RETRY_SECONDS):
+        """Links that need no (new) attempt: extracted, or failed recently."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT link FROM documents WHERE status != 'error' OR extracted > ?",
+                (time.time() - retry_seconds,),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def counts(self):
+        """{status: number of documents}."""
+        with self._connect() as conn:
+            return dict(
+                conn.execute("SELECT status, COUNT(*) FROM documents GROUP BY status")
+            )
+
+
+###############################################################################
+# Workers
+###############################################################################
+
+
+class TextExtractor:
+    def __init__(self, index, workers=DEFAULT_WORKERS, max_pending=MAX_PENDING):
+        self.index = index
+        self.extracted = 0
+        self.failed = 0
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="pdf-text"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._queued = set()
+        self._lock = threading.Lock()
+
+    def submit(self, link, pdf_name, data=None):
+        """Extract the PDF at `link` in the background; `data` saves a download.
+
+        Returns the Future, or None if the link is already queued or the
+        queue is full.
+        """
+        if not link:
+            return None
+        with self._lock:
+            if link in self._queued or not self._slots.acquire(blocking=False):
+                return None
+            self._queued.add(link)
+        return self._executor.submit(self._run, link, pdf_name, data)
+
+    def backfill(self, materials):
+        """Queue the PDFs of `materials` records not in the index yet."""
+        settled = self.index.settled_links()
+        return [
+            future
+            for future in (
+                self.submit(m["PDF_Link"], m.get("PDF_Name", ""))
+                for m in materials
+                if m.get("PDF_Link") and m["PDF_Link"] not in settled
+            )
+            if future is not None
+        ]
+
+    def _run(self, link, pdf_name, data):
+        try:
+            if data is None:
+                import google_utils as gu
+
+                file_id = gu.drive_file_id(link)
+                if file_id is None:
+                    raise ValueError(f"Not a Drive link: {link}")
+                data = gu.download_file(file_id, max_bytes=MAX_PDF_BYTES)
+            text, pages = extract_text(data)
+            self.index.put(
+                link, pdf_name, "ok" if text else "empty", text, pages, keywords(text)
+            )
+            with self._lock:
+                self.extracted += 1
+        except Exception as e:
+            logger.warning(f"Could not extract text from {pdf_name or link}: {e}")
+            self.index.put(link, pdf_name, "error")
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._queued.discard(link)
+                self._slots.release()
+
+
+_extractors = {}
+_extractors_lock = threading.Lock()
+
+
+def index_path(config):
+    return config.get("pdf_index", DEFAULT_INDEX_PATH)
+
+
+def get_extractor(config):
+    """The shared extractor for the index configured in [storage]."""
+    path = index_path(config)
+    with _extractors_lock:
+        extractor = _extractors.get(path)
+        if extractor is None:
+            extractor = _extractors[path] = TextExtractor(
+                PdfTextIndex(path), int(config.get("pdf_workers", DEFAULT_WORKERS))
+            )
+        return extractor
@@ -0,0 +1,225 @@
+"""Monte Carlo comparison of fill policies (min_presenter_gap x presentation_weight).
+
+    python policy_sim.py --terms 2000 --min-gap 4 7 10
+    python policy_sim.py --roster store --decline 0.2 --json
+
+Each simulated term starts from an empty schedule and runs a few invitation
+rounds: assign_roles fills the empty slots, every pending invitation is
+accepted, rescheduled or declined at random, declined slots are refilled next
+round, and participants may leave (their upcoming slots reopen) and be
+replaced. Some weeks are dropped as holidays. Reported per policy:
+coverage (share of slots confirmed at the end), fairness of the confirmed
+load over the final roster (Gini, max - min), and the share of terms the
+policy could not fill at all (no eligible presenter for some slot).
+
+presentation_weight scales every candidate's usage alike, so the production
+fill (and this simulation of it) ranks candidates the same for any positive
+weight; --weight is kept to confirm that, and warns when given several.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+import assign_schedule as assign
+import schedule_model as sm
+from fairness import gini
+
+OUTCOMES = np.array(
+    [sm.Status.ACCEPTED, sm.Status.RESCHEDULE, sm.Status.EMPTY], dtype=object
+)
+
+
+def simulate_term(policy, params, seed):
+    """(coverage, gini, spread) of one simulated term under `policy`.
+
+    The term is kept as (weeks x roles) arrays and filled with
+    assign_schedule.fill_slots, the same core assign_roles runs; all NaN when
+    the policy cannot fill the term (nobody eligible for a slot).
+    """
+    min_gap, weight = policy
+    rng = np.random.default_rng(seed)
+    random.seed(seed)  # assign_roles breaks ties with `random`
+
+    # Holiday weeks have no meeting, so they simply are not rows
+    n_weeks = int((rng.random(params["weeks"]) >= params["holidays"]).sum())
+    if not n_weeks:
+        return np.nan, np.nan, np.nan
+    shape = (n_weeks, len(sm.ROLE_COLS))
+    status = np.full(shape, sm.Status.EMPTY, dtype=object)
+    presenter = np.full(shape, "", dtype=object)
+    week_weights = np.ones(n_weeks)  # the whole term is inside the usage window
+    roster = list(params["roster"])
+    next_id = len(roster)
+    outcome_p = [
+        1 - params["decline"] - params["reschedule"],
+        params["reschedule"],
+        params["decline"],
+    ]
+
+    for round_index in range(params["rounds"]):
+        picks = assign.fill_slots(
+            status, presenter, week_weights, roster, min_gap, weight
+        )
+        if len(picks) < (status == sm.Status.EMPTY).sum():
+            return np.nan, np.nan, np.nan  # a slot nobody was eligible for
+        if picks:
+            # Every invitation of the round is answered at once
+            weeks, roles, names = (np.array(x, dtype=object) for x in zip(*picks))
+            weeks, roles = weeks.astype(int), roles.astype(int)
+            answers = OUTCOMES[
+                rng.choice(len(OUTCOMES), size=len(picks), p=outcome_p)
+            ]
+            status[weeks, roles] = answers
+            presenter[weeks, roles] = np.where(
+                answers == sm.Status.EMPTY, "", names
+            )
+
+        # Churn: leavers give up their slots from this round's share of the term on
+        leaving = [n for n in roster if rng.random() < params["churn"]]
+        if leaving:
+            cutoff = n_weeks * (round_index + 1) // params["rounds"]
+            later = (np.arange(n_weeks) >= cutoff)[:, None]
+            gone = np.isin(presenter, leaving) & later
+            status[gone] = sm.Status.EMPTY
+            presenter[gone] = ""
+            roster = [n for n in roster if n not in leaving]
+            for _ in leaving:
+                roster.append(f"New {next_id}")
+                next_id += 1
+
+    accepted = status == sm.Status.ACCEPTED
+    names, counts = np.unique(presenter[accepted].astype(str), return_counts=True)
+    per_name = dict(zip(names, counts))
+    load = np.array([[per_name.get(n, 0) for n in roster]])
+    return accepted.mean(), gini(load)[0], load.max() - load.min()
+
+
+def simulate_chunk(policy, params, seeds):
+    return np.array([simulate_term(policy, params, s) for s in seeds], dtype=float)
+
+
+def simulate(policies, params, terms=1000, seed=0, workers=None):
+    """{policy: array (terms x [coverage, gini, spread])}, parallel across processes."""
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).generate_state(terms)
+    chunks = np.array_split(seeds, max(1, min(terms, workers * 4)))
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            (policy, i): pool.submit(simulate_chunk, policy, params, chunk.tolist())
+            for policy in policies
+            for i, chunk in enumerate(chunks)
+        }
+        for policy in policies:
+            results[policy] = np.vstack(
+                [futures[(policy, i)].result() for i in range(len(chunks))]
+            )
+    return results
+
+
+def summarize(results):
+    rows = []
+    for (min_gap, weight), samples in results.items():
+        failed = np.isnan(samples[:, 0])
+        row = {
+            "min_gap": min_gap,
+            "weight": weight,
+            "infeasible": round(float(failed.mean()), 3),
+        }
+        for column, metric in enumerate(["coverage", "gini", "spread"]):
+            values = samples[~failed, column]
+            if not len(values):
+                continue
+            p10, p50, p90 = np.percentile(values, [10, 50, 90])
+            row[f"{metric}_mean"] = round(float(values.mean()), 3)
+            row[f"{metric}_p10"] = round(float(p10), 3)
+            row[f"{metric}_p50"] = round(float(p50), 3)
+            row[f"{metric}_p90"] = round(float(p90), 3)
+        rows.append(row)
+    return rows
+
+
+def default_roster(min_gaps):
+    # Each person presents at most once per min_gap weeks, so a full term needs
+    # a roster of at least (slots per week) x min_gap; two more leave slack
+    return str(len(sm.ROLE_COLS) * max(min_gaps) + 2)
+
+
+def read_roster(value):
+    # "store" reads the configured participants; a number makes a synthetic roster
+    if value == "store":
+        import storage
+
+        return [p["Name"] for p in storage.get_storage().get_participants_list()]
+    return [f"Participant {i}" for i in range(int(value))]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", help="TOML config (default: MLATML_CONFIG)")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    parser.add_argument(
+        "--min-gap", type=int, nargs="+", default=[assign.DEFAULT_MIN_PRESENTER_GAP]
+    )
+    parser.add_argument(
+        "--weight", type=int, nargs="+", default=[assign.DEFAULT_PRESENTATION_WEIGHT]
+    )
+    parser.add_argument("--terms", type=int, default=1000)
+    parser.add_argument("--weeks", type=int, default=16, help="weeks per term")
+    parser.add_argument(
+        "--roster",
+        help='participant count (default: enough for the largest --min-gap), '
+        'or "store"',
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="invitation rounds")
+    parser.add_argument("--decline", type=float, default=0.15)
+    parser.add_argument("--reschedule", type=float, default=0.1)
+    parser.add_argument(
+        "--churn", type=float, default=0.02, help="chance to leave per round"
+    )
+    parser.add_argument(
+        "--holidays", type=float, default=0.05, help="chance a week is skipped"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.config:
+        import settings
+
+        settings.load_config(args.config)
+    if len(set(args.weight)) > 1 and min(args.weight) > 0:
+        print(
+            "note: positive presentation weights all rank candidates the same, "
+            "so their rows will be identical",
+            file=sys.stderr,
+        )
+    params = {
+        "roster": read_roster(args.roster or default_roster(args.min_gap)),
+        "weeks": args.weeks,
+        "rounds": args.rounds,
+        "decline": args.decline,
+        "reschedule": args.reschedule,
+        "churn": args.churn,
+        "holidays": args.holidays,
+    }
+    policies = [(g, w) for g in args.min_gap for w in args.weight]
+    rows = summarize(simulate(policies, params, args.terms, args.seed, args.workers))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(pd.DataFrame(rows).set_index(["min_gap", "weight"]).to_string())
+
+
+if __name__ == "__main__":
+    main()
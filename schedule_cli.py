@@ -0,0 +1,344 @@
+"""Headless scheduling CLI (no Streamlit runtime needed).
+
+Examples:
+    python schedule_cli.py fill sheets --dry-run
+    python schedule_cli.py replay sheets --at 2025-03-01T12:00
+    python schedule_cli.py archive store --days 365
+    python schedule_cli.py extract-pdfs store
+    python schedule_cli.py --json fill sheets:<spreadsheet_id> other.csv \
+        --participants participants.csv
+"""
+
+import argparse
+import json
+import random
+import sys
+
+import pandas as pd
+
+import archive
+import assign_schedule as assign
+import concurrency
+import event_log
+import schedule_model as sm
+import settings
+import storage
+import tenancy
+import usage_stats
+
+###############################################################################
+# Sources
+###############################################################################
+# A source is "store" (the configured storage backend), "sheets" (the
+# configured spreadsheet), "sheets:<spreadsheet_id>", "sqlite:<path>", or the
+# path of a local CSV file with the same columns as the Schedule sheet.
+# Spreadsheets get the [storage] wrappers (event_log, snapshot_dir) of the
+# group they belong to, or of the default group.
+
+
+def sheets_storage(spreadsheet_id=""):
+    # Built from the [storage] config of the group owning the spreadsheet, so
+    # its wrappers (event log, snapshots) see the CLI's writes like the app's
+    tenants = tenancy.get_tenants()
+    tenant = tenants[""]
+    for candidate in tenants.values():
+        if spreadsheet_id and candidate.spreadsheet_id == spreadsheet_id:
+            tenant = candidate
+    config = dict(tenant.config.get("storage", {}))
+    config["backend"] = "sheets"
+    config["spreadsheet_id"] = spreadsheet_id or tenant.spreadsheet_id
+    return storage.create_storage(config)
+
+
+def open_storage(source):
+    """The storage.Storage behind `source`, or None for a plain CSV file."""
+    if source == "store":
+        return storage.get_storage()
+    if source == "sheets":
+        return sheets_storage()
+    if source.startswith("sheets:"):
+        return sheets_storage(source.split(":", 1)[1])
+    if source.startswith("sqlite:"):
+        return storage.SQLiteStorage(source.split(":", 1)[1])
+    return None
+
+
+def read_schedule(source):
+    store = open_storage(source)
+    if store is not None:
+        return store.get_schedule_df()
+    return pd.read_csv(source, dtype=str, keep_default_na=False)
+
+
+def read_participant_names(source, participants_path=None):
+    if participants_path:
+        df = pd.read_csv(participants_path, dtype=str, keep_default_na=False)
+        return [n for n in df["Name"] if n]
+    store = open_storage(source)
+    if store is None:
+        raise ValueError(f"{source}: CSV schedules need --participants")
+    return [p["Name"] for p in store.get_participants_list()]
+
+
+def write_schedule(destination, df):
+    store = open_storage(destination)
+    if store is not None:
+        store.save_schedule_df(df)
+    else:
+        df.astype(str).to_csv(destination, index=False)
+
+
+###############################################################################
+# Commands
+###############################################################################
+
+
+def schedule_changes(before, after):
+    """Cell-level diff of two aligned schedule frames."""
+    before_model, after_model = sm.ScheduleModel(before), sm.ScheduleModel(after)
+    changes = []
+    for role in after_model.roles:
+        old = before_model.frame[role].astype(str)
+        new = after_model.frame[role].astype(str)
+        for position in (old != new).to_numpy().nonzero()[0]:
+            date = after_model.dates.iloc[position]
+            changes.append(
+                {
+                    "position": int(position),
+                    "date": date.strftime("%Y-%m-%d") if pd.notna(date) else "",
+                    "role": role,
+                    "old": old.iloc[position],
+                    "new": new.iloc[position],
+                }
+            )
+    return changes
+
+
+def fill_source(source, args):
+    result = {
+        "source": source,
+        "changes": [],
+        "unfilled": 0,
+        "written": False,
+        "error": None,
+    }
+    try:
+        if args.seed is not None:
+            random.seed(args.seed)
+        before = read_schedule(source)
+        names = read_participant_names(source, args.participants)
+        store = open_storage(source)
+        unavailable = store.get_unavailability() if store is not None else []
+
+        def fill(current):
+            after = assign.assign_roles(
+                current,
+                names,
+                min_presenter_gap=args.min_gap,
+                presentation_weight=args.weight,
+                window_days=args.window_days or None,
+                half_life_days=args.half_life,
+                unavailable=unavailable,
+            )
+            result["changes"] = schedule_changes(current, after)
+            result["unfilled"] = assign.empty_slots(after)
+            return after
+
+        if store is not None and not args.output and not args.dry_run:
+            # Only the filled rows are written, stamped with the revision read;
+            # if the schedule changed meanwhile it is re-filled on the new one
+            with event_log.acting_as("cli"):
+                concurrency.retry_schedule_write(store, fill, before)
+            result["written"] = bool(result["changes"])
+        else:
+            after = fill(before)
+            if result["changes"] and not args.dry_run:
+                write_schedule(args.output or source, after)
+                result["written"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def print_text(results, dry_run):
+    for result in results:
+        if result["error"]:
+            print(f"{result['source']}: ERROR {result['error']}")
+            continue
+        verb = "would fill" if dry_run else "filled"
+        print(f"{result['source']}: {verb} {len(result['changes'])} slot(s)")
+        if result["unfilled"]:
+            print(f"  {result['unfilled']} slot(s) left EMPTY: nobody eligible")
+        for change in result["changes"]:
+            print(
+                f"  {change['date']} {change['role']}: "
+                f"{change['old']!r} -> {change['new']!r}"
+            )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", help="TOML config (default: MLATML_CONFIG)")
+    parser.add_argument(
+        "--json", action="store_true", help="machine-readable output"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fill = commands.add_parser("fill", help="fill EMPTY presenter slots")
+    fill.add_argument(
+        "sources", nargs="+", help="store, sheets[:<id>], sqlite:<path> or CSV"
+    )
+    fill.add_argument("--participants", help="participants CSV (Name, Email)")
+    fill.add_argument("--output", help="write here instead of back to the source")
+    fill.add_argument("--dry-run", action="store_true", help="only show the diff")
+    fill.add_argument("--seed", type=int, default=None)
+    fill.add_argument(
+        "--min-gap", type=int, default=assign.DEFAULT_MIN_PRESENTER_GAP
+    )
+    fill.add_argument(
+        "--weight", type=int, default=assign.DEFAULT_PRESENTATION_WEIGHT
+    )
+    fill.add_argument(
+        "--window-days",
+        type=int,
+        default=usage_stats.DEFAULT_WINDOW_DAYS,
+        help="usage counts presentations this recent (0: all)",
+    )
+    fill.add_argument(
+        "--half-life", type=float, default=None, help="decay usage with age (days)"
+    )
+
+    replay = commands.add_parser(
+        "replay", help="rebuild the schedule from the event log"
+    )
+    replay.add_argument("source", help="store, sheets[:<id>] or sqlite:<path>")
+    replay.add_argument(
+        "--at", help="ISO timestamp, e.g. 2025-03-01T12:00 (default: now)"
+    )
+    replay.add_argument("--output", help="CSV file (default: print)")
+
+    compact = commands.add_parser(
+        "compact", help="write the event log's schedule back as the snapshot"
+    )
+    compact.add_argument("source", help="store, sheets[:<id>] or sqlite:<path>")
+
+    archive_cmd = commands.add_parser(
+        "archive", help="move past meetings out of the hot worksheets"
+    )
+    archive_cmd.add_argument("source", help="store, sheets[:<id>] or sqlite:<path>")
+    archive_cmd.add_argument(
+        "--days", type=int, help="keep this many past days (default: archive_days)"
+    )
+    archive_cmd.add_argument(
+        "--archive-path", help="Parquet directory (default: archive_path)"
+    )
+    archive_cmd.add_argument("--dry-run", action="store_true", help="only count")
+
+    extract = commands.add_parser(
+        "extract-pdfs", help="extract the text of material PDFs for search"
+    )
+    extract.add_argument("source", help="store, sheets[:<id>] or sqlite:<path>")
+    extract.add_argument("--index", help="SQLite index (default: pdf_index)")
+    return parser
+
+
+def replay_source(args):
+    store = open_storage(args.source)
+    at = args.at or event_log._now()
+    df = event_log.schedule_at(store, at)
+    if args.output:
+        write_schedule(args.output, df)
+    elif args.json:
+        print(df.astype(str).to_json(orient="records", indent=2))
+    else:
+        print(df.to_string(index=False))
+    return 0
+
+
+def compact_source(args):
+    store = open_storage(args.source)
+    if not getattr(store, "event_log", False):
+        store = event_log.EventLogStorage(store)
+    with event_log.acting_as("cli"):
+        store.compact()
+    return 0
+
+
+def archive_source(args):
+    store = open_storage(args.source)
+    config = dict(settings.get_secrets().get("storage", {}))
+    if args.days is not None:
+        config["archive_days"] = args.days
+    if args.archive_path:
+        config["archive_path"] = args.archive_path
+    cutoff = archive.horizon_cutoff(config)
+    moved = archive.run(store, archive.get_archive(store, config), cutoff, args.dry_run)
+    if args.json:
+        print(json.dumps({"before": str(cutoff), "dry_run": args.dry_run, **moved}))
+    else:
+        verb = "would move" if args.dry_run else "moved"
+        print(
+            f"{verb} {moved['schedule']} meeting(s) and "
+            f"{moved['materials']} material(s) from before {cutoff}"
+        )
+    return 0
+
+
+def extract_source(args):
+    # Imported here: it pulls in the Google clients for downloads
+    import pdf_text
+
+    store = open_storage(args.source)
+    config = dict(settings.get_secrets().get("storage", {}))
+    if args.index:
+        config["pdf_index"] = args.index
+    extractor = pdf_text.get_extractor(config)
+    materials = store.get_materials()
+    # The queue is bounded, so feed it until nothing new is accepted
+    queued = 0
+    while True:
+        futures = extractor.backfill(materials)
+        if not futures:
+            break
+        queued += len(futures)
+        for future in futures:
+            future.result()
+    counts = extractor.index.counts()
+    if args.json:
+        print(json.dumps({"queued": queued, **counts}))
+    else:
+        print(
+            f"extracted {extractor.extracted} PDF(s), {extractor.failed} failed; "
+            f"index: {counts}"
+        )
+    return 1 if extractor.failed else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.config:
+        settings.load_config(args.config)
+    if args.command == "replay":
+        return replay_source(args)
+    if args.command == "compact":
+        return compact_source(args)
+    if args.command == "archive":
+        return archive_source(args)
+    if args.command == "extract-pdfs":
+        return extract_source(args)
+    if args.output and len(args.sources) > 1:
+        print("--output needs a single source", file=sys.stderr)
+        return 2
+
+    results = [fill_source(source, args) for source in args.sources]
+
+    if args.json:
+        json.dump({"dry_run": args.dry_run, "results": results}, sys.stdout, indent=2)
+        print()
+    else:
+        print_text(results, args.dry_run)
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
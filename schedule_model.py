@@ -0,0 +1,139 @@
+import enum
+import re
+
+import pandas as pd
+
+ROLE_COLS = ["Presenter 1", "Presenter 2"]
+
+
+def frame_version(df):
+    # Content fingerprint of a frame, used to key caches derived from it
+    return str(int(pd.util.hash_pandas_object(df, index=True).sum()))
+
+
+###############################################################################
+# Cell Status
+###############################################################################
+
+
+class Status(enum.Enum):
+    ACCEPTED = "accepted"
+    PENDING = "pending"  # "[P] Name"
+    RESCHEDULE = "reschedule"  # "[R] Name"
+    CANCELLED = "cancelled"  # "[C] Name"
+    EMPTY = "empty"  # "EMPTY" or blank
+
+
+STATUS_PREFIXES = {
+    Status.PENDING: "[P]",
+    Status.RESCHEDULE: "[R]",
+    Status.CANCELLED: "[C]",
+}
+FLAG_STATUS = {"P": Status.PENDING, "R": Status.RESCHEDULE, "C": Status.CANCELLED}
+EMPTY_NAMES = ["", "EMPTY"]
+
+# Statuses where the person is (tentatively) presenting that week
+PRESENTING = [Status.ACCEPTED, Status.PENDING]
+
+CELL_RE = re.compile(r"^\s*(?:\[(?P<flag>[PRC])\]\s*)?(?P<name>.*?)\s*$", re.S)
+
+
+def parse_cell(value):
+    """Split a raw schedule cell such as "[P] Abdul" into (Status, name)."""
+    match = CELL_RE.match("" if pd.isna(value) else str(value))
+    name = match.group("name")
+    if name in EMPTY_NAMES:
+        return Status.EMPTY, ""
+    return FLAG_STATUS.get(match.group("flag"), Status.ACCEPTED), name
+
+
+def format_cell(status, name=""):
+    """Inverse of parse_cell: the text stored in the sheet."""
+    if status is Status.EMPTY or not name:
+        return "EMPTY"
+    if status is Status.ACCEPTED:
+        return name
+    return f"{STATUS_PREFIXES[status]} {name}"
+
+
+def parse_role_column(values):
+    """Vectorized parse_cell over a column, returning (status, name) Series."""
+    parts = values.fillna("").astype(str).str.extract(CELL_RE)
+    empty = parts["name"].isin(EMPTY_NAMES)
+    status = parts["flag"].map(FLAG_STATUS).fillna(Status.ACCEPTED)
+    status = status.where(~empty, Status.EMPTY)
+    status = pd.Series(
+        pd.Categorical(status, categories=list(Status)), index=values.index
+    )
+    names = pd.Series(
+        pd.Categorical(parts["name"].where(~empty)), index=values.index
+    )
+    return status, names
+
+
+###############################################################################
+# Schedule Model
+###############################################################################
+
+
+class ScheduleModel:
+    """Schedule parsed once: dates, per-role status and participant columns.
+
+    Instances are cached and shared across sessions, so treat them as
+    read-only. `frame` hands out a shallow copy: rows and columns may be
+    added or dropped, but callers that edit cells `.copy()` it first.
+    """
+
+    def __init__(self, df):
+        df = df.copy()
+        other_cols = [c for c in df.columns if c != "Date"]
+        df[other_cols] = df[other_cols].fillna("")
+        if "Date" in df.columns:
+            self.dates = pd.to_datetime(df["Date"], errors="coerce")
+            df["Date"] = self.dates.dt.date
+        else:
+            self.dates = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+        self._frame = df
+        self.roles = [c for c in ROLE_COLS if c in df.columns]
+        self.status = pd.DataFrame(index=df.index)
+        self.names = pd.DataFrame(index=df.index)
+        for role in self.roles:
+            self.status[role], self.names[role] = parse_role_column(df[role])
+        self.version = frame_version(df)
+
+    @property
+    def frame(self):
+        return self._frame.copy(deep=False)
+
+    @property
+    def has_dates(self):
+        return "Date" in self._frame.columns
+
+    def __len__(self):
+        return len(self._frame)
+
+    def role_mask(self, statuses):
+        """Boolean frame (rows x roles) of cells whose status is in `statuses`."""
+        return self.status.apply(lambda col: col.isin(statuses))
+
+    def cells(self, statuses=None):
+        """Long-form (position, date, role, status, name) rows, optionally filtered."""
+        parts = []
+        for role in self.roles:
+            part = pd.DataFrame(
+                {
+                    "position": range(len(self._frame)),
+                    "date": self.dates.to_numpy(),
+                    "role": role,
+                    "status": self.status[role].to_numpy(),
+                    "name": self.names[role].astype(object).to_numpy(),
+                }
+            )
+            parts.append(part)
+        if not parts:
+            return pd.DataFrame(columns=["position", "date", "role", "status", "name"])
+        cells = pd.concat(parts, ignore_index=True)
+        cells = cells.sort_values("position", kind="stable")
+        if statuses is not None:
+            cells = cells[cells["status"].isin(statuses)]
+        return cells
@@ -0,0 +1,96 @@
+import bisect
+import difflib
+import re
+import unicodedata
+
+###############################################################################
+# Participant Search Index
+###############################################################################
+
+STATUS_PREFIX_RE = re.compile(r"^\s*\[[A-Z]\]\s*")
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Minimum similarity for a fuzzy token match (difflib ratio, 0..1)
+FUZZY_CUTOFF = 0.75
+
+
+def fold_text(text):
+    # Case- and accent-fold so "José" and "jose" compare equal
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return text.casefold()
+
+
+def name_tokens(value, aliases=None):
+    """Return the set of normalized tokens a schedule cell or name can be found by.
+
+    Status markers ("[P] ", "[R] ", "[C] ") are dropped and parenthesised
+    nicknames count as aliases, so "[P] Yuchi (Allan)" yields {"yuchi", "allan"}.
+    """
+    value = STATUS_PREFIX_RE.sub("", str(value))
+    tokens = set(TOKEN_RE.findall(fold_text(value)))
+    if aliases:
+        for token in list(tokens):
+            for alias in aliases.get(token, ()):
+                tokens.update(TOKEN_RE.findall(fold_text(alias)))
+    tokens.discard("empty")
+    return tokens
+
+
+class SearchIndex:
+    """Token -> row positions map with prefix and fuzzy lookup."""
+
+    def __init__(self, postings, n_rows):
+        self.postings = postings
+        self.tokens = sorted(postings)
+        self.n_rows = n_rows
+
+    def _prefix_matches(self, token):
+        start = bisect.bisect_left(self.tokens, token)
+        matches = []
+        for candidate in self.tokens[start:]:
+            if not candidate.startswith(token):
+                break
+            matches.append(candidate)
+        return matches
+
+    def _token_rows(self, token):
+        matches = self._prefix_matches(token)
+        if not matches:
+            matches = difflib.get_close_matches(
+                token, self.tokens, n=5, cutoff=FUZZY_CUTOFF
+            )
+        rows = set()
+        for match in matches:
+            rows.update(self.postings[match])
+        return rows
+
+    def lookup(self, query):
+        """Return the sorted row positions matching every token of `query`."""
+        query_tokens = set(TOKEN_RE.findall(fold_text(query)))
+        if not query_tokens:
+            return list(range(self.n_rows))
+        rows = None
+        for token in query_tokens:
+            token_rows = self._token_rows(token)
+            rows = token_rows if rows is None else rows & token_rows
+            if not rows:
+                return []
+        return sorted(rows)
+
+
+def build_search_index(values_by_column, aliases=None):
+    """Build a SearchIndex over parallel columns of cell values.
+
+    `values_by_column` is an iterable of equal-length sequences (e.g. the
+    presenter columns of the schedule); positions refer to their row order.
+    """
+    postings = {}
+    n_rows = 0
+    for values in values_by_column:
+        values = list(values)
+        n_rows = max(n_rows, len(values))
+        for position, value in enumerate(values):
+            for token in name_tokens(value, aliases):
+                postings.setdefault(token, set()).add(position)
+    return SearchIndex(postings, n_rows)
@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+import tomllib
+
+###############################################################################
+# Configuration
+###############################################################################
+# Inside `streamlit run` the secrets come from st.secrets. Headless tools (the
+# CLI, cron jobs) read the same keys from a TOML file, pointed to by
+# MLATML_CONFIG or defaulting to .streamlit/secrets.toml, and environment
+# variables named MLATML_<KEY> or MLATML_<SECTION>__<KEY> override it, e.g.
+#   MLATML_GOOGLE_SHEETS__SPREADSHEET_ID=...
+#   MLATML_GCP_SERVICE_ACCOUNT='{"type": "service_account", ...}'
+
+DEFAULT_CONFIG_PATH = os.path.join(".streamlit", "secrets.toml")
+ENV_PREFIX = "MLATML_"
+
+_config = None
+
+
+def in_streamlit():
+    # True under `streamlit run` (or a script run context, e.g. AppTest);
+    # never imports streamlit itself
+    st = sys.modules.get("streamlit")
+    if st is None:
+        return False
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    return st.runtime.exists() or get_script_run_ctx(suppress_warning=True) is not None
+
+
+def _env_value(raw):
+    if raw[:1] in "{[":
+        try:
+            return json.loads(raw)
+        except ValueError:
+            pass
+    return raw
+
+
+def load_config(path=None):
+    """Read the TOML config and apply MLATML_* environment overrides."""
+    global _config
+    path = path or os.environ.get("MLATML_CONFIG", DEFAULT_CONFIG_PATH)
+    config = {}
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+    for key, raw in os.environ.items():
+        if not key.startswith(ENV_PREFIX) or key == "MLATML_CONFIG":
+            continue
+        parts = key[len(ENV_PREFIX):].lower().split("__")
+        section = config
+        for part in parts[:-1]:
+            section = section.setdefault(part, {})
+        section[parts[-1]] = _env_value(raw)
+    _config = config
+    return config
+
+
+def get_secrets():
+    if in_streamlit():
+        import streamlit as st
+
+        return st.secrets
+    if _config is None:
+        load_config()
+    return _config
@@ -0,0 +1,164 @@
+import collections
+import datetime
+import logging
+import threading
+import uuid
+
+import pandas as pd
+
+import google_utils as gu
+
+###############################################################################
+# Slide Deck Pool
+###############################################################################
+# "Make Slides" used to copy the template, share the copy and fill it in while
+# the user waited. The pool keeps a few copies that are already made and
+# shared in the slides folder, so a click only renames one and fills in the
+# placeholders. It is refilled on a background thread, up to the number of
+# upcoming meetings that have no deck yet (at most slides_pool_size, default
+# 3; 0 turns the pool off).
+# Pooled decks are tagged in Drive with the template and the process that
+# made them. A process only hands out its own decks, so replicas never give
+# the same deck to two meetings. On its first refill a process trashes the
+# other processes' decks made before it started: after a restart or redeploy
+# they belong to processes that are gone. A deck trashed under a live replica
+# is noticed when that replica hands it out, and the click falls back to a
+# full copy.
+
+DEFAULT_POOL_SIZE = 3
+POOL_NAME = "Unused ML Subgroup Meeting deck"
+
+_owner = uuid.uuid4().hex  # this process
+_started = pd.Timestamp.now(tz="UTC")
+
+logger = logging.getLogger(__name__)
+
+
+class SlidePool:
+    def __init__(self, template_id, folder_id=None, max_size=DEFAULT_POOL_SIZE):
+        self.template_id = template_id
+        self.folder_id = folder_id
+        self.max_size = max_size
+        self.made = 0  # decks copied by this pool
+        self.served = 0  # clicks answered from the pool
+        self._decks = collections.deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._cleaned = False
+
+    def take(self, date, presenter1, presenter2):
+        """(presentation_id, url) of a pooled deck made out for `date`, or None."""
+        while True:
+            with self._lock:
+                if not self._decks:
+                    return None
+                presentation_id = self._decks.popleft()
+            # Untag and rename while the placeholders are filled in
+            claim = {
+                "name": gu.presentation_name(date),
+                "appProperties": {"mlatml_pool": None, "mlatml_owner": None},
+            }
+            try:
+                claimed, _ = gu.gather(
+                    (gu.update_file, presentation_id, claim, "trashed"),
+                    (
+                        gu.fill_placeholders,
+                        presentation_id,
+                        date,
+                        presenter1,
+                        presenter2,
+                    ),
+                )
+                if claimed.get("trashed"):
+                    raise LookupError("trashed by another replica")
+            except Exception as e:
+                # Deleted in Drive meanwhile, or half renamed/filled: it can't go
+                # back to the pool, so trash what is left and try the next one
+                logger.warning(f"Could not hand out pooled deck {presentation_id}: {e}")
+                try:
+                    gu.trash_file(presentation_id)
+                except Exception:
+                    pass
+                continue
+            with self._lock:
+                self.served += 1
+            return presentation_id, gu.presentation_url(presentation_id)
+
+    def ensure(self, wanted):
+        """Refill in the background until min(wanted, max_size) decks are ready."""
+        target = min(wanted, self.max_size)
+        with self._lock:
+            if self._refilling or len(self._decks) >= target:
+                return
+            self._refilling = True
+        threading.Thread(
+            target=self._refill, args=(target,), name="slide-pool", daemon=True
+        ).start()
+
+    def _refill(self, target):
+        try:
+            with self._lock:
+                clean, self._cleaned = not self._cleaned, True
+            if clean:
+                self._remove_orphans()
+            while True:
+                with self._lock:
+                    missing = target - len(self._decks)
+                if missing <= 0:
+                    return
+                # Copies are independent; make the missing ones concurrently
+                made = gu.gather(*[(self._make,) for _ in range(missing)])
+                with self._lock:
+                    self._decks.extend(made)
+                    self.made += len(made)
+        except Exception as e:
+            logger.warning(f"Could not refill the slide pool: {e}")
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    def _make(self):
+        presentation_id = gu.copy_template(
+            self.template_id,
+            POOL_NAME,
+            self.folder_id,
+            {"mlatml_pool": self.template_id, "mlatml_owner": _owner},
+        )
+        gu.share_presentation(presentation_id)
+        return presentation_id
+
+    def _remove_orphans(self):
+        query = (
+            "appProperties has { key='mlatml_pool' and "
+            f"value='{self.template_id}' }} and trashed = false"
+        )
+        if self.folder_id:
+            query += f" and '{self.folder_id}' in parents"
+        for deck in gu.list_files(query):
+            owner = deck.get("appProperties", {}).get("mlatml_owner")
+            if owner != _owner and pd.Timestamp(deck["createdTime"]) < _started:
+                gu.trash_file(deck["id"])
+
+
+def decks_wanted(model, slides, today=None):
+    """Upcoming meetings that have no deck yet."""
+    today = pd.Timestamp(today or datetime.date.today())
+    upcoming = model.dates[model.dates >= today].dt.strftime("%Y-%m-%d")
+    have = {str(s.get("Date")) for s in slides}
+    return int((~upcoming.isin(have)).sum())
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(template_id, folder_id=None, max_size=DEFAULT_POOL_SIZE):
+    """The shared pool for this template and folder."""
+    with _pools_lock:
+        pool = _pools.get((template_id, folder_id))
+        if pool is None:
+            pool = _pools[(template_id, folder_id)] = SlidePool(
+                template_id, folder_id, max_size
+            )
+        pool.max_size = max_size
+        return pool
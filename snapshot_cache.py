@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from storage import (
+    MATERIAL_COLUMNS,
+    PARTICIPANT_COLUMNS,
+    SLIDE_COLUMNS,
+    Storage,
+    parse_schedule_frame,
+    records_revision,
+)
+
+###############################################################################
+# Local Snapshot Cache
+###############################################################################
+# A fresh process normally has to download every worksheet before the first
+# page can be drawn. With snapshot_dir set, the last Schedule, Participants,
+# Materials and Slides read are kept on local disk as Arrow (Feather) files
+# plus a manifest of their revisions. The first read of each after a restart
+# returns the snapshot at once and re-reads the backend in the background;
+# if the data changed, the snapshot is replaced and the registered listeners
+# (the app's caches) are told, so the next rerun shows the fresh data. Later
+# reads go to the backend as usual and refresh the snapshot when it changed.
+# Writes go straight to the backend; one made from stale snapshot data fails
+# the revision check and is retried on the fresh data like any other conflict.
+#   [storage]
+#   snapshot_dir = ".mlatml_snapshots"
+
+FORMAT_VERSION = 1
+RECORD_COLUMNS = {
+    "participants": PARTICIPANT_COLUMNS,
+    "materials": MATERIAL_COLUMNS,
+    "slides": SLIDE_COLUMNS,
+}
+
+
+def snapshot_path(config):
+    """Per-backend directory under snapshot_dir, so tenants never share one."""
+    backend = {k: v for k, v in config.items() if not k.startswith("snapshot")}
+    key = hashlib.sha1(
+        json.dumps(backend, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:12]
+    return os.path.join(config["snapshot_dir"], key)
+
+
+def _revision(kind, value):
+    if kind == "schedule":
+        return value.attrs["revision"]
+    return records_revision(value)
+
+
+class SnapshotStorage:
+    """Wraps a backend so reads survive restarts as local Arrow snapshots."""
+
+    snapshot = True
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.name = inner.name
+        self.path = path
+        self._fresh = set()  # kinds read from the backend by this process
+        self._listeners = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        return getattr(self.inner, attr)
+
+    def on_revalidated(self, key, callback):
+        """Call `callback(kind)` when a background re-read found newer data.
+
+        Registering again under the same `key` replaces the callback, so a
+        page script can register on every rerun.
+        """
+        self._listeners[key] = callback
+
+    # Files
+
+    def _file(self, kind):
+        return os.path.join(self.path, f"{kind}.arrow")
+
+    def _manifest(self):
+        try:
+            with open(os.path.join(self.path, "manifest.json")) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("format") != FORMAT_VERSION:
+            return {}
+        return manifest
+
+    def _load(self, kind):
+        entry = self._manifest().get(kind)
+        if entry is None:
+            return None
+        try:
+            df = pd.read_feather(self._file(kind))
+        except (OSError, ValueError):
+            return None
+        if kind == "schedule":
+            return parse_schedule_frame(df)
+        return df.to_dict("records")
+
+    def _save(self, kind, value, revision):
+        # Caller holds the lock. Written aside and renamed, never half-written.
+        if kind == "schedule":
+            df = value.astype(str)
+        else:
+            df = pd.DataFrame(value, columns=RECORD_COLUMNS[kind]).fillna("")
+            df = df.astype(str)
+        os.makedirs(self.path, exist_ok=True)
+        tmp = self._file(kind) + ".tmp"
+        df.reset_index(drop=True).to_feather(tmp)
+        os.replace(tmp, self._file(kind))
+        manifest = self._manifest()
+        manifest["format"] = FORMAT_VERSION
+        manifest[kind] = {"revision": revision, "saved": time.time()}
+        tmp = os.path.join(self.path, "manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(self.path, "manifest.json"))
+
+    def _store(self, kind, value):
+        """Refresh the snapshot if `value` differs; True when it did."""
+        revision = _revision(kind, value)
+        with self._lock:
+            entry = self._manifest().get(kind)
+            if entry is not None and entry["revision"] == revision:
+                return False
+            try:
+                self._save(kind, value, revision)
+            except OSError:
+                return False  # a read-only disk only costs the fast start
+        return True
+
+    # Reads
+
+    def _read(self, kind, fetch):
+        with self._lock:
+            cold = kind not in self._fresh
+            self._fresh.add(kind)
+        cached = self._load(kind) if cold else None
+        if cached is None:
+            value = fetch()
+            self._store(kind, value)
+            return value
+        threading.Thread(
+            target=self._revalidate,
+            args=(kind, fetch),
+            name=f"snapshot-{kind}",
+            daemon=True,
+        ).start()
+        return cached
+
+    def _revalidate(self, kind, fetch):
+        try:
+            value = fetch()
+        except Exception:
+            # Retry on the next read instead of serving the snapshot for good
+            with self._lock:
+                self._fresh.discard(kind)
+            return
+        if self._store(kind, value):
+            for callback in list(self._listeners.values()):
+                callback(kind)
+
+    def get_schedule_df(self):
+        return self._read("schedule", self.inner.get_schedule_df)
+
+    def get_participants_list(self):
+        return self._read("participants", self.inner.get_participants_list)
+
+    def get_materials(self):
+        return self._read("materials", self.inner.get_materials)
+
+    def get_slides(self):
+        return self._read("slides", self.inner.get_slides)
+
+    find_slide = Storage.find_slide
@@ -0,0 +1,884 @@
+import collections
+import contextlib
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from settings import get_secrets
+
+###############################################################################
+# Storage Backends
+###############################################################################
+# Everything the app and the scheduler persist goes through one of these:
+#   SheetsStorage  - the Google spreadsheet (production)
+#   SQLiteStorage  - a local database file, no Google round-trips
+#   MemoryStorage  - an in-process fake with optional injected latency, for
+#                    offline development, benchmarks and load tests
+# Pick one in the config:
+#   [storage]
+#   backend = "sqlite"          # "sheets" (default), "sqlite" or "memory"
+#   path = "mlatml.sqlite"      # sqlite only
+#   latency_ms = 150            # memory only, per call
+#   seed = "mlatml.sqlite"      # memory only, start from this sqlite file
+
+# Optimistic concurrency: every read carries a revision (a hash of the content
+# as read; get_schedule_df stores it in df.attrs["revision"], for participants
+# use records_revision on the list). Writers pass it back as
+# expected_revision and get a ConflictError if the data changed in between;
+# see concurrency.py for the merge-or-retry helpers.
+
+PARTICIPANT_COLUMNS = ["Name", "Email"]
+MATERIAL_COLUMNS = ["Date", "Title", "Description", "PDF_Name", "PDF_Link"]
+SLIDE_COLUMNS = ["Date", "Presentation_ID", "Presentation_Link"]
+UNAVAILABLE_COLUMNS = ["Name", "Start", "End", "Note"]
+EVENT_COLUMNS = ["Timestamp", "Actor", "Date", "Role", "Old", "New"]
+# Job claims are dropped after this long; jobs only claim keys of the coming
+# days (see jobs.py), so an expired claim can never be contested again
+CLAIM_KEEP_DAYS = 30
+
+
+class ConflictError(Exception):
+    """The data changed since it was read; `current` holds the fresh copy."""
+
+    def __init__(self, message, current=None, revision=None):
+        super().__init__(message)
+        self.current = current
+        self.revision = revision
+
+
+def _content_hash(value):
+    return hashlib.sha1(
+        json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def schedule_revision(df):
+    return _content_hash([list(map(str, df.columns))] + schedule_rows(df))
+
+
+def _now_iso(days_ago=0):
+    return time.strftime(
+        "%Y-%m-%dT%H:%M:%S", time.localtime(time.time() - days_ago * 86400)
+    )
+
+
+def records_revision(records):
+    return _content_hash([sorted(r.items()) for r in records])
+
+
+def check_revision(expected_revision, current, revision, what):
+    if expected_revision is not None and expected_revision != revision:
+        raise ConflictError(
+            f"The {what} changed since it was loaded", current, revision
+        )
+
+
+def parse_schedule_frame(df):
+    # Same shape get_schedule_df returns: strings, with Date as datetime.date,
+    # stamped with the revision it was read at
+    df = pd.DataFrame(df)
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dt.date
+    df.attrs["revision"] = schedule_revision(df)
+    return df
+
+
+def schedule_rows(df):
+    return df.astype(str).values.tolist()
+
+
+class Storage:
+    """Interface shared by all backends.
+
+    Material rows are addressed like sheet rows: the first record is row 2.
+    """
+
+    name = "base"
+
+    # Schedule
+    def get_schedule_df(self):
+        raise NotImplementedError
+
+    def save_schedule_df(self, df, expected_revision=None):
+        raise NotImplementedError
+
+    def update_schedule_rows(
+        self, df, updated_positions=(), inserted_positions=(), expected_revision=None
+    ):
+        raise NotImplementedError
+
+    def delete_schedule_rows(self, dates, expected_revision=None):
+        raise NotImplementedError
+
+    # Participants
+    def get_participants_list(self):
+        raise NotImplementedError
+
+    def save_participants_list(self, participants, expected_revision=None):
+        raise NotImplementedError
+
+    def add_participants(self, participants, expected_revision=None):
+        raise NotImplementedError
+
+    def delete_participants(self, names, expected_revision=None):
+        raise NotImplementedError
+
+    # Materials
+    def get_materials(self):
+        raise NotImplementedError
+
+    def add_material(self, date_str, title, description="", pdf_name="", pdf_link=""):
+        raise NotImplementedError
+
+    def delete_material_row(self, row_index):
+        raise NotImplementedError
+
+    def delete_material_rows(self, row_indices):
+        # Bottom-up, so the remaining indices stay valid
+        for row_index in sorted(row_indices, reverse=True):
+            self.delete_material_row(row_index)
+
+    # Slides
+    def get_slides(self):
+        raise NotImplementedError
+
+    def add_slide_entry(self, date_str, presentation_id, presentation_link):
+        raise NotImplementedError
+
+    def find_slide(self, date_str):
+        for slide in self.get_slides():
+            if str(slide.get("Date")) == date_str:
+                return slide
+        return None
+
+    # Availability (rows addressed like materials)
+    def get_unavailability(self):
+        raise NotImplementedError
+
+    def add_unavailability(self, name, start_str, end_str, note=""):
+        raise NotImplementedError
+
+    def delete_unavailability_row(self, row_index):
+        raise NotImplementedError
+
+    # Schedule events (see event_log.py), oldest first, from the `start`-th on
+    def get_schedule_events(self, start=0):
+        raise NotImplementedError
+
+    def append_schedule_events(self, events):
+        raise NotImplementedError
+
+    # Archived rows (see archive.py); `kind` is "schedule" or "materials"
+    def get_archive_records(self, kind):
+        raise NotImplementedError
+
+    def append_archive_records(self, kind, records):
+        raise NotImplementedError
+
+    # Job claims (see jobs.py): True only for the first claim of `key`; the
+    # owner must be unique per attempt
+    def claim_job(self, key, owner):
+        raise NotImplementedError
+
+
+class SheetsStorage(Storage):
+    name = "sheets"
+
+    def __init__(self, spreadsheet_id=None):
+        self.spreadsheet_id = spreadsheet_id
+
+    # Sheets has no compare-and-swap, so the revision check re-reads the
+    # worksheet right before writing. That narrows the race to the time
+    # between the two calls instead of the whole edit session.
+
+    def get_schedule_df(self):
+        import google_utils as gu
+
+        df = gu.get_schedule_df(self.spreadsheet_id)
+        df.attrs["revision"] = schedule_revision(df)
+        return df
+
+    def _check_schedule(self, expected_revision):
+        if expected_revision is not None:
+            current = self.get_schedule_df()
+            check_revision(
+                expected_revision, current, current.attrs["revision"], "schedule"
+            )
+
+    def _check_participants(self, expected_revision):
+        if expected_revision is not None:
+            current = self.get_participants_list()
+            check_revision(
+                expected_revision, current, records_revision(current), "participants"
+            )
+
+    def save_schedule_df(self, df, expected_revision=None):
+        import google_utils as gu
+
+        self._check_schedule(expected_revision)
+        gu.save_schedule_df(df, self.spreadsheet_id)
+
+    def update_schedule_rows(
+        self, df, updated_positions=(), inserted_positions=(), expected_revision=None
+    ):
+        import google_utils as gu
+
+        self._check_schedule(expected_revision)
+        gu.update_schedule_rows(
+            df, updated_positions, inserted_positions, self.spreadsheet_id
+        )
+
+    def delete_schedule_rows(self, dates, expected_revision=None):
+        import google_utils as gu
+
+        # The revision check re-reads the sheet, so its keys are fresh enough
+        # to resolve the deletes; without it they are re-read from the sheet
+        self._check_schedule(expected_revision)
+        keys = None
+        if expected_revision is not None:
+            keys = gu.get_row_keys("Schedule", "Date", self.spreadsheet_id)
+        try:
+            gu.delete_schedule_rows(dates, self.spreadsheet_id, keys)
+        except KeyError as e:
+            raise ConflictError(str(e)) from e
+
+    def get_participants_list(self):
+        import google_utils as gu
+
+        return gu.get_participants_list(self.spreadsheet_id)
+
+    def save_participants_list(self, participants, expected_revision=None):
+        import google_utils as gu
+
+        self._check_participants(expected_revision)
+        gu.save_participants_list(participants, self.spreadsheet_id)
+
+    def add_participants(self, participants, expected_revision=None):
+        import google_utils as gu
+
+        self._check_participants(expected_revision)
+        gu.add_participants(participants, self.spreadsheet_id)
+
+    def delete_participants(self, names, expected_revision=None):
+        import google_utils as gu
+
+        self._check_participants(expected_revision)
+        keys = None
+        if expected_revision is not None:
+            keys = gu.get_row_keys("Participants", "Name", self.spreadsheet_id)
+        try:
+            gu.delete_participants(names, self.spreadsheet_id, keys)
+        except KeyError as e:
+            raise ConflictError(str(e)) from e
+
+    def get_materials(self):
+        import google_utils as gu
+
+        return gu.get_materials_records(self.spreadsheet_id)
+
+    def add_material(self, date_str, title, description="", pdf_name="", pdf_link=""):
+        import google_utils as gu
+
+        gu.add_material(
+            date_str, title, description, pdf_name, pdf_link, self.spreadsheet_id
+        )
+
+    def delete_material_row(self, row_index):
+        import google_utils as gu
+
+        gu.delete_material_row(row_index, self.spreadsheet_id)
+
+    def delete_material_rows(self, row_indices):
+        import google_utils as gu
+
+        gu.delete_material_rows(row_indices, self.spreadsheet_id)
+
+    def get_slides(self):
+        import google_utils as gu
+
+        return gu.get_all_slides(self.spreadsheet_id)
+
+    def add_slide_entry(self, date_str, presentation_id, presentation_link):
+        import google_utils as gu
+
+        gu.add_slide_entry(
+            date_str, presentation_id, presentation_link, self.spreadsheet_id
+        )
+
+    def get_unavailability(self):
+        import google_utils as gu
+
+        return gu.get_unavailable_records(self.spreadsheet_id)
+
+    def add_unavailability(self, name, start_str, end_str, note=""):
+        import google_utils as gu
+
+        gu.add_unavailable(name, start_str, end_str, note, self.spreadsheet_id)
+
+    def delete_unavailability_row(self, row_index):
+        import google_utils as gu
+
+        gu.delete_unavailable_row(row_index, self.spreadsheet_id)
+
+    def get_schedule_events(self, start=0):
+        import google_utils as gu
+
+        return gu.get_schedule_event_records(self.spreadsheet_id, start)
+
+    def append_schedule_events(self, events):
+        import google_utils as gu
+
+        rows = [[str(e[c]) for c in EVENT_COLUMNS] for e in events]
+        gu.append_schedule_event_rows(rows, self.spreadsheet_id)
+
+    def get_archive_records(self, kind):
+        import google_utils as gu
+
+        return gu.get_archive_records(kind, self.spreadsheet_id)
+
+    def append_archive_records(self, kind, records):
+        import google_utils as gu
+
+        gu.append_archive_records(kind, records, self.spreadsheet_id)
+
+    def claim_job(self, key, owner):
+        import google_utils as gu
+
+        return gu.claim_job(
+            key, owner, _now_iso(), _now_iso(CLAIM_KEEP_DAYS), self.spreadsheet_id
+        )
+
+
+def _quote(column):
+    return '"' + str(column).replace('"', '""') + '"'
+
+
+class SQLiteStorage(Storage):
+    name = "sqlite"
+
+    def __init__(self, path="mlatml.sqlite"):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS participants (Name TEXT, Email TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS materials (id INTEGER PRIMARY KEY, "
+                + ", ".join(f"{_quote(c)} TEXT" for c in MATERIAL_COLUMNS)
+                + ")"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS slides ("
+                + ", ".join(f"{_quote(c)} TEXT" for c in SLIDE_COLUMNS)
+                + ")"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS unavailable (id INTEGER PRIMARY KEY, "
+                + ", ".join(f"{_quote(c)} TEXT" for c in UNAVAILABLE_COLUMNS)
+                + ")"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, "
+                + ", ".join(f"{_quote(c)} TEXT" for c in EVENT_COLUMNS)
+                + ")"
+            )
+            # Archived rows as JSON, since archived schedules keep their columns
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS archive "
+                "(id INTEGER PRIMARY KEY, kind TEXT, record TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_claims "
+                "(key TEXT PRIMARY KEY, owner TEXT, claimed TEXT)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One connection per call keeps the backend safe to share across threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commits, or rolls back on error
+                yield conn
+        finally:
+            conn.close()  # the sqlite3 context manager alone leaves it open
+
+    def _records(self, query, columns):
+        with self._connect() as conn:
+            rows = conn.execute(query).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _read_schedule(self, conn):
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='schedule'"
+        ).fetchone()
+        if not exists:
+            return parse_schedule_frame(pd.DataFrame())
+        df = pd.read_sql("SELECT * FROM schedule ORDER BY position", conn)
+        return parse_schedule_frame(df.drop(columns="position"))
+
+    def _begin_checked(self, conn, expected_revision):
+        # BEGIN IMMEDIATE takes the write lock first, so check-and-write is atomic
+        conn.execute("BEGIN IMMEDIATE")
+        if expected_revision is not None:
+            current = self._read_schedule(conn)
+            check_revision(
+                expected_revision, current, current.attrs["revision"], "schedule"
+            )
+
+    def _ensure_schedule(self, conn, columns):
+        # Row edits may come before any full save created the table (to_sql
+        # makes it with these types), or bring a column it does not have yet
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schedule (position INTEGER, "
+            + ", ".join(f"{_quote(c)} TEXT" for c in columns)
+            + ")"
+        )
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(schedule)")}
+        for column in columns:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE schedule ADD COLUMN {_quote(column)} TEXT")
+
+    def get_schedule_df(self):
+        with self._connect() as conn:
+            return self._read_schedule(conn)
+
+    def save_schedule_df(self, df, expected_revision=None):
+        out = df.astype(str).reset_index(drop=True)
+        with self._connect() as conn:
+            self._begin_checked(conn, expected_revision)
+            out.to_sql("schedule", conn, if_exists="replace", index_label="position")
+
+    def update_schedule_rows(
+        self, df, updated_positions=(), inserted_positions=(), expected_revision=None
+    ):
+        values = schedule_rows(df)
+        columns = ", ".join(_quote(c) for c in df.columns)
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in df.columns)
+        with self._connect() as conn:
+            self._begin_checked(conn, expected_revision)
+            self._ensure_schedule(conn, list(df.columns))
+            conn.executemany(
+                f"UPDATE schedule SET {assignments} WHERE position = ?",
+                [values[pos] + [pos] for pos in updated_positions],
+            )
+            conn.executemany(
+                f"INSERT INTO schedule (position, {columns}) "
+                f"VALUES (?, {', '.join('?' for _ in df.columns)})",
+                [[pos] + values[pos] for pos in inserted_positions],
+            )
+
+    def delete_schedule_rows(self, dates, expected_revision=None):
+        with self._connect() as conn:
+            self._begin_checked(conn, expected_revision)
+            self._ensure_schedule(conn, ["Date"])
+            conn.executemany(
+                "DELETE FROM schedule WHERE Date = ?", [(str(d),) for d in dates]
+            )
+            # Close the gaps: updates and inserts address rows by frame position
+            rowids = conn.execute(
+                "SELECT rowid FROM schedule ORDER BY position"
+            ).fetchall()
+            conn.executemany(
+                "UPDATE schedule SET position = ? WHERE rowid = ?",
+                [(pos, rowid) for pos, (rowid,) in enumerate(rowids)],
+            )
+
+    def get_participants_list(self):
+        rows = self._records(
+            "SELECT Name, Email FROM participants ORDER BY rowid", PARTICIPANT_COLUMNS
+        )
+        return [r for r in rows if r["Name"]]
+
+    def _begin_participants(self, conn, expected_revision):
+        conn.execute("BEGIN IMMEDIATE")
+        if expected_revision is not None:
+            current = [
+                dict(zip(PARTICIPANT_COLUMNS, row))
+                for row in conn.execute(
+                    "SELECT Name, Email FROM participants ORDER BY rowid"
+                )
+                if row[0]
+            ]
+            check_revision(
+                expected_revision, current, records_revision(current), "participants"
+            )
+
+    def add_participants(self, participants, expected_revision=None):
+        with self._connect() as conn:
+            self._begin_participants(conn, expected_revision)
+            conn.executemany(
+                "INSERT INTO participants VALUES (?, ?)",
+                [(p["Name"], p.get("Email", "")) for p in participants],
+            )
+
+    def delete_participants(self, names, expected_revision=None):
+        with self._connect() as conn:
+            self._begin_participants(conn, expected_revision)
+            conn.executemany(
+                "DELETE FROM participants WHERE Name = ?", [(n,) for n in names]
+            )
+
+    def save_participants_list(self, participants, expected_revision=None):
+        with self._connect() as conn:
+            self._begin_participants(conn, expected_revision)
+            conn.execute("DELETE FROM participants")
+            conn.executemany(
+                "INSERT INTO participants VALUES (?, ?)",
+                [(p["Name"], p.get("Email", "")) for p in participants],
+            )
+
+    def get_materials(self):
+        columns = ", ".join(_quote(c) for c in MATERIAL_COLUMNS)
+        return self._records(
+            f"SELECT {columns} FROM materials ORDER BY id", MATERIAL_COLUMNS
+        )
+
+    def add_material(self, date_str, title, description="", pdf_name="", pdf_link=""):
+        columns = ", ".join(_quote(c) for c in MATERIAL_COLUMNS)
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO materials ({columns}) VALUES (?, ?, ?, ?, ?)",
+                (date_str, title, description, pdf_name, pdf_link),
+            )
+
+    def delete_material_row(self, row_index):
+        self.delete_material_rows([row_index])
+
+    def delete_material_rows(self, row_indices):
+        with self._connect() as conn:
+            ids = [row[0] for row in conn.execute("SELECT id FROM materials ORDER BY id")]
+            conn.executemany(
+                "DELETE FROM materials WHERE id = ?",
+                [(ids[i - 2],) for i in row_indices if 0 <= i - 2 < len(ids)],
+            )
+
+    def get_slides(self):
+        columns = ", ".join(_quote(c) for c in SLIDE_COLUMNS)
+        return self._records(
+            f"SELECT {columns} FROM slides ORDER BY rowid", SLIDE_COLUMNS
+        )
+
+    def add_slide_entry(self, date_str, presentation_id, presentation_link):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO slides VALUES (?, ?, ?)",
+                (date_str, presentation_id, presentation_link),
+            )
+
+    def get_unavailability(self):
+        columns = ", ".join(_quote(c) for c in UNAVAILABLE_COLUMNS)
+        return self._records(
+            f"SELECT {columns} FROM unavailable ORDER BY id", UNAVAILABLE_COLUMNS
+        )
+
+    def add_unavailability(self, name, start_str, end_str, note=""):
+        columns = ", ".join(_quote(c) for c in UNAVAILABLE_COLUMNS)
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO unavailable ({columns}) VALUES (?, ?, ?, ?)",
+                (name, start_str, end_str, note),
+            )
+
+    def delete_unavailability_row(self, row_index):
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM unavailable WHERE id = "
+                "(SELECT id FROM unavailable ORDER BY id LIMIT 1 OFFSET ?)",
+                (row_index - 2,),
+            )
+
+    def get_schedule_events(self, start=0):
+        columns = ", ".join(_quote(c) for c in EVENT_COLUMNS)
+        return self._records(
+            f"SELECT {columns} FROM events ORDER BY id LIMIT -1 OFFSET {int(start)}",
+            EVENT_COLUMNS,
+        )
+
+    def append_schedule_events(self, events):
+        columns = ", ".join(_quote(c) for c in EVENT_COLUMNS)
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO events ({columns}) VALUES (?, ?, ?, ?, ?, ?)",
+                [[str(e[c]) for c in EVENT_COLUMNS] for e in events],
+            )
+
+    def get_archive_records(self, kind):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT record FROM archive WHERE kind = ? ORDER BY id", (kind,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def append_archive_records(self, kind, records):
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO archive (kind, record) VALUES (?, ?)",
+                [(kind, json.dumps(r, ensure_ascii=False)) for r in records],
+            )
+
+    def claim_job(self, key, owner):
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM job_claims WHERE claimed < ?", (_now_iso(CLAIM_KEEP_DAYS),)
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO job_claims VALUES (?, ?, ?)",
+                (key, owner, _now_iso()),
+            )
+            return cursor.rowcount == 1
+
+
+class MemoryStorage(Storage):
+    """In-process fake; every call sleeps `latency` seconds (+/- `jitter`)."""
+
+    name = "memory"
+
+    def __init__(self, latency=0.0, jitter=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = collections.Counter()
+        self._lock = threading.Lock()
+        self._schedule = pd.DataFrame()
+        self._participants = []
+        self._materials = []
+        self._slides = []
+        self._unavailable = []
+        self._events = []
+        self._archive = collections.defaultdict(list)
+        self._claims = {}
+
+    @classmethod
+    def from_storage(cls, other, **kwargs):
+        store = cls(**kwargs)
+        store._schedule = other.get_schedule_df().astype(str)
+        store._participants = list(other.get_participants_list())
+        store._materials = list(other.get_materials())
+        store._slides = list(other.get_slides())
+        store._unavailable = list(other.get_unavailability())
+        store._events = list(other.get_schedule_events())
+        for kind in ("schedule", "materials"):
+            store._archive[kind] = list(other.get_archive_records(kind))
+        return store
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.latency or self.jitter:
+            delay = self.latency + random.uniform(-self.jitter, self.jitter)
+            time.sleep(max(delay, 0.0))
+
+    def get_schedule_df(self):
+        self._call("get_schedule_df")
+        with self._lock:
+            return parse_schedule_frame(self._schedule.copy())
+
+    def _check_schedule(self, expected_revision):
+        # Caller holds the lock
+        if expected_revision is not None:
+            current = parse_schedule_frame(self._schedule.copy())
+            check_revision(
+                expected_revision, current, current.attrs["revision"], "schedule"
+            )
+
+    def save_schedule_df(self, df, expected_revision=None):
+        self._call("save_schedule_df")
+        with self._lock:
+            self._check_schedule(expected_revision)
+            self._schedule = df.astype(str).reset_index(drop=True)
+
+    def update_schedule_rows(
+        self, df, updated_positions=(), inserted_positions=(), expected_revision=None
+    ):
+        self._call("update_schedule_rows")
+        values = schedule_rows(df)
+        with self._lock:
+            self._check_schedule(expected_revision)
+            schedule = self._schedule.copy()
+            for pos in updated_positions:
+                schedule.iloc[pos] = values[pos]
+            for pos in inserted_positions:
+                schedule.loc[len(schedule)] = values[pos]
+            self._schedule = schedule
+
+    def delete_schedule_rows(self, dates, expected_revision=None):
+        self._call("delete_schedule_rows")
+        dates = {str(d) for d in dates}
+        with self._lock:
+            self._check_schedule(expected_revision)
+            schedule = self._schedule
+            if "Date" in schedule.columns:
+                schedule = schedule[~schedule["Date"].astype(str).isin(dates)]
+            self._schedule = schedule.reset_index(drop=True)
+
+    def get_participants_list(self):
+        self._call("get_participants_list")
+        with self._lock:
+            return [dict(p) for p in self._participants]
+
+    def _check_participants(self, expected_revision):
+        # Caller holds the lock
+        current = [dict(p) for p in self._participants]
+        check_revision(
+            expected_revision, current, records_revision(current), "participants"
+        )
+
+    def save_participants_list(self, participants, expected_revision=None):
+        self._call("save_participants_list")
+        with self._lock:
+            self._check_participants(expected_revision)
+            self._participants = [
+                {"Name": p["Name"], "Email": p.get("Email", "")} for p in participants
+            ]
+
+    def add_participants(self, participants, expected_revision=None):
+        self._call("add_participants")
+        with self._lock:
+            self._check_participants(expected_revision)
+            self._participants = self._participants + [
+                {"Name": p["Name"], "Email": p.get("Email", "")} for p in participants
+            ]
+
+    def delete_participants(self, names, expected_revision=None):
+        self._call("delete_participants")
+        names = set(names)
+        with self._lock:
+            self._check_participants(expected_revision)
+            self._participants = [
+                p for p in self._participants if p["Name"] not in names
+            ]
+
+    def get_materials(self):
+        self._call("get_materials")
+        with self._lock:
+            return [dict(m) for m in self._materials]
+
+    def add_material(self, date_str, title, description="", pdf_name="", pdf_link=""):
+        self._call("add_material")
+        row = [date_str, title, description, pdf_name, pdf_link]
+        with self._lock:
+            self._materials.append(dict(zip(MATERIAL_COLUMNS, row)))
+
+    def delete_material_row(self, row_index):
+        self._call("delete_material_row")
+        with self._lock:
+            del self._materials[row_index - 2]
+
+    def delete_material_rows(self, row_indices):
+        self._call("delete_material_rows")
+        drop = {i - 2 for i in row_indices}
+        with self._lock:
+            self._materials = [
+                m for i, m in enumerate(self._materials) if i not in drop
+            ]
+
+    def get_slides(self):
+        self._call("get_slides")
+        with self._lock:
+            return [dict(s) for s in self._slides]
+
+    def add_slide_entry(self, date_str, presentation_id, presentation_link):
+        self._call("add_slide_entry")
+        row = [date_str, presentation_id, presentation_link]
+        with self._lock:
+            self._slides.append(dict(zip(SLIDE_COLUMNS, row)))
+
+    def get_unavailability(self):
+        self._call("get_unavailability")
+        with self._lock:
+            return [dict(u) for u in self._unavailable]
+
+    def add_unavailability(self, name, start_str, end_str, note=""):
+        self._call("add_unavailability")
+        row = [name, start_str, end_str, note]
+        with self._lock:
+            self._unavailable.append(dict(zip(UNAVAILABLE_COLUMNS, row)))
+
+    def delete_unavailability_row(self, row_index):
+        self._call("delete_unavailability_row")
+        with self._lock:
+            del self._unavailable[row_index - 2]
+
+    def get_schedule_events(self, start=0):
+        self._call("get_schedule_events")
+        with self._lock:
+            return [dict(e) for e in self._events[start:]]
+
+    def append_schedule_events(self, events):
+        self._call("append_schedule_events")
+        with self._lock:
+            self._events.extend(
+                {c: str(e[c]) for c in EVENT_COLUMNS} for e in events
+            )
+
+    def get_archive_records(self, kind):
+        self._call("get_archive_records")
+        with self._lock:
+            return [dict(r) for r in self._archive[kind]]
+
+    def append_archive_records(self, kind, records):
+        self._call("append_archive_records")
+        with self._lock:
+            self._archive[kind].extend(dict(r) for r in records)
+
+    def claim_job(self, key, owner):
+        self._call("claim_job")
+        with self._lock:
+            return self._claims.setdefault(key, owner) == owner
+
+
+###############################################################################
+# Backend Selection
+###############################################################################
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def create_storage(config):
+    store = _create_backend(config)
+    if config.get("event_log"):
+        import event_log
+
+        store = event_log.EventLogStorage(
+            store, int(config.get("compact_every", 50))
+        )
+    if config.get("snapshot_dir"):
+        import snapshot_cache
+
+        store = snapshot_cache.SnapshotStorage(
+            store, snapshot_cache.snapshot_path(config)
+        )
+    import materials_search
+
+    return materials_search.SearchableStorage(store)
+
+
+def _create_backend(config):
+    backend = config.get("backend", "sheets")
+    if backend == "sheets":
+        return SheetsStorage(config.get("spreadsheet_id"))
+    if backend == "sqlite":
+        return SQLiteStorage(config.get("path", "mlatml.sqlite"))
+    if backend == "memory":
+        latency = float(config.get("latency_ms", 0)) / 1000
+        jitter = float(config.get("jitter_ms", 0)) / 1000
+        if config.get("seed"):
+            return MemoryStorage.from_storage(
+                SQLiteStorage(config["seed"]), latency=latency, jitter=jitter
+            )
+        return MemoryStorage(latency=latency, jitter=jitter)
+    raise ValueError(f"Unknown storage backend: {backend!r}")
+
+
+def get_storage():
+    """The process-wide backend selected by the [storage] config section."""
+    config = dict(get_secrets().get("storage", {}))
+    key = tuple(sorted((k, str(v)) for k, v in config.items()))
+    with _storages_lock:
+        if key not in _storages:
+            _storages[key] = create_storage(config)
+        return _storages[key]
@@ -0,0 +1,182 @@
+import collections
+import functools
+import threading
+import time
+
+import storage
+from settings import get_secrets
+
+###############################################################################
+# Tenants (reading groups)
+###############################################################################
+# One deployment can serve several groups. Each group is a [tenants.<name>]
+# section in the secrets; its keys override the top-level ones, e.g.
+#   [tenants.quantum]
+#   spreadsheet_id = "..."
+#   mlatml_folder_id = "..."
+#   mlatml_slides_folder_id = "..."
+#   slides_template_id = "..."
+#   zoom_link = "..."
+# and it is selected with ?group=quantum. Without the parameter the app uses
+# the top-level secrets, exactly as a single-group deployment does.
+
+GROUP_PARAM = "group"
+
+
+class Tenant:
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+
+    def __getitem__(self, key):
+        return self.config[key]
+
+    def get(self, key, default=None):
+        return self.config.get(key, default)
+
+    @property
+    def spreadsheet_id(self):
+        if self.config.get("spreadsheet_id"):
+            return self.config["spreadsheet_id"]
+        return self.config.get("google_sheets", {}).get("spreadsheet_id")
+
+    @property
+    def storage(self):
+        return _tenant_storage(self.name, self.storage_config())
+
+    @property
+    def archive(self):
+        import archive
+
+        return archive.get_archive(self.storage, self.storage_config())
+
+    @property
+    def pdf_text(self):
+        import pdf_text
+
+        return pdf_text.get_extractor(self.storage_config())
+
+    def storage_config(self):
+        config = dict(self.config.get("storage", {}))
+        config.setdefault("spreadsheet_id", self.spreadsheet_id)
+        backend = config.get("backend", "sheets")
+        if self.name and backend == "sheets" and not config["spreadsheet_id"]:
+            raise KeyError(f"Group {self.name!r} has no spreadsheet_id")
+        if self.name and backend == "sqlite":
+            # Never let two groups share one local database by accident
+            config.setdefault("path", f"mlatml_{self.name}.sqlite")
+        if self.name:
+            config.setdefault("pdf_index", f"mlatml_pdf_text_{self.name}.sqlite")
+        return config
+
+    def query(self, **params):
+        """Relative link that keeps this tenant selected."""
+        if self.name:
+            params = {GROUP_PARAM: self.name, **params}
+        return "?" + "&".join(f"{k}={v}" for k, v in params.items())
+
+    def reset_query_params(self, query_params):
+        query_params.clear()
+        if self.name:
+            query_params[GROUP_PARAM] = self.name
+
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def _tenant_storage(name, config):
+    key = (name, tuple(sorted((k, str(v)) for k, v in config.items())))
+    with _storages_lock:
+        if key not in _storages:
+            _storages[key] = storage.create_storage(config)
+        return _storages[key]
+
+
+def get_tenants():
+    secrets = get_secrets()
+    base = {k: v for k, v in secrets.items() if k != "tenants"}
+    tenants = {"": Tenant("", base)}
+    for name, overrides in secrets.get("tenants", {}).items():
+        config = dict(base)
+        # The spreadsheet is never inherited from the default group
+        config.pop("spreadsheet_id", None)
+        config.pop("google_sheets", None)
+        config.update(overrides)
+        tenants[name] = Tenant(name, config)
+    return tenants
+
+
+def resolve_tenant(query_params):
+    """The Tenant picked by ?group=..., or None if the group is unknown."""
+    return get_tenants().get(query_params.get(GROUP_PARAM, ""))
+
+
+###############################################################################
+# Per-tenant caches
+###############################################################################
+# Cached values are shared by every session of the same tenant (like
+# st.cache_resource), so callers must not mutate them. Each tenant gets its
+# own LRU of at most `max_entries` per function, so one busy group cannot
+# evict another group's data.
+
+
+class TenantCache:
+    def __init__(self, func, ttl=None, max_entries=16):
+        self.func = func
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        functools.update_wrapper(self, func)
+
+    def __call__(self, tenant, *args):
+        now = time.monotonic()
+        with self._lock:
+            entries = self._entries.setdefault(tenant.name, collections.OrderedDict())
+            hit = entries.get(args)
+            if hit is not None and (self.ttl is None or now - hit[0] < self.ttl):
+                entries.move_to_end(args)
+                return hit[1]
+        value = self.func(tenant, *args)
+        with self._lock:
+            entries = self._entries.setdefault(tenant.name, collections.OrderedDict())
+            entries[args] = (now, value)
+            entries.move_to_end(args)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+        return value
+
+    def clear(self, tenant=None):
+        with self._lock:
+            if tenant is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(tenant.name, None)
+
+
+# Streamlit re-executes the page script on every rerun, which redefines the
+# decorated functions; the registry keeps their caches alive across reruns.
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def tenant_cache(ttl=None, max_entries=16):
+    def decorator(func):
+        key = (func.__module__, func.__qualname__)
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = _caches[key] = TenantCache(func, ttl, max_entries)
+            cache.func = func
+        return cache
+
+    return decorator
+
+
+def clear_caches(tenant=None):
+    """Empty every tenant cache (of one tenant, or of all)."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear(tenant)
@@ -0,0 +1,65 @@
+import datetime
+
+import pandas as pd
+
+import archive
+import assign_schedule as assign
+import schedule_model as sm
+import storage
+
+
+class RacingStorage(storage.MemoryStorage):
+    """Runs `between` once, after the first read of the materials."""
+
+    def __init__(self, between):
+        super().__init__()
+        self.between = between
+
+    def get_materials(self):
+        records = super().get_materials()
+        between, self.between = self.between, None
+        if between:
+            between(self)
+        return records
+
+
+def test_archive_materials_deletes_the_rows_it_read():
+    store = RacingStorage(lambda s: s.delete_material_row(2))
+    store.add_material("2020-01-01", "old 1")
+    store.add_material("2099-01-01", "new")
+    store.add_material("2020-01-08", "old 2")
+    backend = archive.BackendArchive(store)
+
+    moved = archive.archive_materials(store, backend, datetime.date(2021, 1, 1))
+
+    assert moved == 2
+    assert [m["Title"] for m in store.get_materials()] == ["new"]
+    assert [m["Title"] for m in archive.archived_materials(backend)] == [
+        "old 1",
+        "old 2",
+    ]
+
+
+def test_fill_counts_archived_presentations():
+    store = storage.MemoryStorage()
+    store.save_participants_list([{"Name": "A"}, {"Name": "B"}])
+    store.save_schedule_df(
+        pd.DataFrame(
+            {"Date": ["2099-01-07"], "Presenter 1": ["EMPTY"], "Presenter 2": ["C"]}
+        )
+    )
+    backend = archive.BackendArchive(store)
+    backend.append(
+        "schedule",
+        [
+            {"Date": "2001-01-03", "Presenter 1": "B", "Presenter 2": "B"},
+            {"Date": "2001-01-10", "Presenter 1": "B", "Presenter 2": "C"},
+        ],
+    )
+
+    for seed in range(5):
+        filled = assign.fill_empty_slots(
+            seed=seed, store=store, window_days=None, archive=backend
+        )
+        # Only the archive tells them apart: B presented there, A never did
+        assert filled.at[0, "Presenter 1"] == sm.format_cell(sm.Status.PENDING, "A")
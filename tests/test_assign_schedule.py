@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+import assign_schedule as assign
+import schedule_model as sm
+
+
+def empty_term(n_weeks):
+    shape = (n_weeks, len(sm.ROLE_COLS))
+    status = np.full(shape, sm.Status.EMPTY, dtype=object)
+    return status, np.full(shape, "", dtype=object)
+
+
+def test_fill_slots_skips_weeks_when_everyone_is_away():
+    status, presenter = empty_term(3)
+    names = ["A", "B", "C", "D"]
+    away = {name: 0b010 for name in names}  # everyone misses week 1
+
+    picks = assign.fill_slots(
+        status, presenter, np.ones(3), names, 1, 1, unavailable=away
+    )
+
+    assert {week for week, _, _ in picks} == {0, 2}
+    assert len(picks) == 2 * len(sm.ROLE_COLS)
+
+
+def test_fill_slots_skips_slots_when_nobody_is_past_the_gap():
+    status, presenter = empty_term(2)
+
+    picks = assign.fill_slots(status, presenter, np.ones(2), ["A"], 4, 1)
+
+    # A takes the first slot and is then too recent for all the others
+    assert [name for _, _, name in picks] == ["A"]
+
+
+def test_assign_roles_leaves_a_shared_model_untouched():
+    model = sm.ScheduleModel(
+        pd.DataFrame(
+            {"Date": ["2099-01-07"], "Presenter 1": ["EMPTY"], "Presenter 2": ["C"]}
+        )
+    )
+
+    filled = assign.assign_roles(model, ["A", "B"])
+
+    assert filled.at[0, "Presenter 1"] != "EMPTY"
+    assert model.frame.at[0, "Presenter 1"] == "EMPTY"
+    assert model.status.at[0, "Presenter 1"] is sm.Status.EMPTY
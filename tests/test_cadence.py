@@ -0,0 +1,96 @@
+import datetime
+
+import pandas as pd
+
+import cadence
+
+
+def days(*values):
+    return [datetime.date.fromisoformat(v) for v in values]
+
+
+def test_weekly_wednesdays_from_any_start():
+    # 2025-01-01 was a Wednesday
+    dates = cadence.meeting_dates(datetime.date(2024, 12, 30), 3)
+
+    assert dates == days("2025-01-01", "2025-01-08", "2025-01-15")
+
+
+def test_several_weekdays_in_order():
+    mon_thu = cadence.Cadence(weekdays=(3, 0))
+
+    dates = cadence.meeting_dates(datetime.date(2025, 1, 1), 4, mon_thu)
+
+    assert dates == days("2025-01-02", "2025-01-06", "2025-01-09", "2025-01-13")
+
+
+def test_holidays_blackouts_and_skipped_weeks_are_left_out():
+    off = cadence.Cadence(
+        holidays=("2025-01-08",),
+        blackouts=(("2025-01-20", "2025-02-02"),),
+    )
+
+    dates = cadence.meeting_dates(
+        datetime.date(2025, 1, 1), 4, off, skip_weeks=days("2025-02-07")
+    )
+
+    # Skipping any day of a week skips the whole week (here Feb 5)
+    assert dates == days("2025-01-01", "2025-01-15", "2025-02-12", "2025-02-19")
+
+
+def test_long_breaks_grow_the_span():
+    dates = cadence.meeting_dates(
+        datetime.date(2025, 1, 1),
+        2,
+        cadence.Cadence(blackouts=(("2025-01-01", "2025-12-31"),)),
+    )
+
+    assert dates == days("2026-01-07", "2026-01-14")
+
+
+def test_biweekly_continues_the_rhythm_of_the_last_meeting():
+    biweekly = cadence.Cadence(every_weeks=2)
+    df = pd.DataFrame({"Date": ["2025-01-01", "2025-01-15"]})
+
+    dates = cadence.next_meeting_dates(df, 3, biweekly)
+
+    assert dates == days("2025-01-29", "2025-02-12", "2025-02-26")
+
+
+def test_biweekly_holiday_does_not_shift_the_rhythm():
+    biweekly = cadence.Cadence(every_weeks=2, holidays=("2025-01-29",))
+    df = pd.DataFrame({"Date": ["2025-01-15"]})
+
+    dates = cadence.next_meeting_dates(df, 2, biweekly)
+
+    assert dates == days("2025-02-12", "2025-02-26")
+
+
+def test_cadence_from_config():
+    config = {
+        "weekdays": ["thursday", "Mon"],
+        "every_weeks": "2",
+        "holidays": ["2025-12-24"],
+        "blackouts": [["2025-12-20", "2026-01-06"]],
+    }
+
+    assert cadence.cadence_from_config(config) == cadence.Cadence(
+        weekdays=(3, 0),
+        every_weeks=2,
+        holidays=("2025-12-24",),
+        blackouts=(("2025-12-20", "2026-01-06"),),
+    )
+    assert cadence.cadence_from_config({}) == cadence.Cadence()
+
+
+def test_append_meetings_adds_empty_rows():
+    df = pd.DataFrame(
+        {"Date": ["2025-01-01"], "Presenter 1": ["A"], "Notes": ["x"]}
+    )
+
+    new = cadence.append_meetings(df, days("2025-01-08"))
+
+    assert new.to_dict("records") == [
+        {"Date": "2025-01-01", "Presenter 1": "A", "Notes": "x"},
+        {"Date": "2025-01-08", "Presenter 1": "EMPTY", "Notes": ""},
+    ]
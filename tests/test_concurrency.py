@@ -0,0 +1,132 @@
+import pandas as pd
+import pytest
+
+import concurrency
+import storage
+
+
+def schedule(*rows):
+    return pd.DataFrame(rows, columns=["Date", "Presenter 1", "Presenter 2"])
+
+
+BASE = schedule(
+    ("2025-01-01", "A", "B"),
+    ("2025-01-08", "C", "D"),
+    ("2025-01-15", "E", "F"),
+)
+
+
+def edited(df, position, column, value):
+    df = df.copy()
+    df.loc[position, column] = value
+    return df
+
+
+def test_merge_keeps_both_sides_edits():
+    ours = edited(BASE, 0, "Presenter 1", "Ours")
+    theirs = edited(BASE, 2, "Presenter 2", "Theirs")
+
+    merged, conflicts = concurrency.merge_schedule(BASE, ours, theirs)
+
+    assert merged.values.tolist() == [
+        ["2025-01-01", "Ours", "B"],
+        ["2025-01-08", "C", "D"],
+        ["2025-01-15", "E", "Theirs"],
+    ]
+    assert conflicts == []
+
+
+def test_merge_keeps_their_value_when_both_changed_a_cell():
+    ours = edited(BASE, 1, "Presenter 1", "Ours")
+    theirs = edited(BASE, 1, "Presenter 1", "Theirs")
+
+    merged, conflicts = concurrency.merge_schedule(BASE, ours, theirs)
+
+    assert merged.at[1, "Presenter 1"] == "Theirs"
+    assert conflicts == [("2025-01-08", "Presenter 1", "Theirs")]
+
+
+def test_merge_row_inserts_and_deletes():
+    ours = pd.concat(
+        [BASE.drop(index=0), schedule(("2025-01-22", "G", "H"))], ignore_index=True
+    )
+    theirs = BASE.drop(index=2).reset_index(drop=True)
+
+    merged, conflicts = concurrency.merge_schedule(BASE, ours, theirs)
+
+    assert merged["Date"].tolist() == ["2025-01-08", "2025-01-22"]
+    assert conflicts == []
+
+
+def test_merge_does_not_drop_a_row_they_changed():
+    ours = BASE.drop(index=1).reset_index(drop=True)
+    theirs = edited(BASE, 1, "Presenter 2", "Theirs")
+
+    merged, conflicts = concurrency.merge_schedule(BASE, ours, theirs)
+
+    assert merged["Date"].tolist() == BASE["Date"].tolist()
+    assert conflicts == [("2025-01-08", None, "row changed by someone else")]
+
+
+def test_merge_reports_edits_to_a_row_they_deleted():
+    ours = edited(BASE, 1, "Presenter 1", "Ours")
+    theirs = BASE.drop(index=1).reset_index(drop=True)
+
+    merged, conflicts = concurrency.merge_schedule(BASE, ours, theirs)
+
+    assert merged["Date"].tolist() == ["2025-01-01", "2025-01-15"]
+    assert conflicts == [("2025-01-08", "Presenter 1", "row deleted by someone else")]
+
+
+def test_retry_reapplies_the_edit_on_top_of_a_concurrent_save():
+    store = storage.MemoryStorage()
+    store.save_schedule_df(BASE)
+    stale = store.get_schedule_df()
+    # Someone else saves after we read
+    store.save_schedule_df(edited(BASE, 2, "Presenter 2", "Theirs"))
+    seen = []
+
+    def edit(current):
+        seen.append(current["Presenter 2"].iloc[2])
+        return edited(current, 0, "Presenter 1", "Ours")
+
+    concurrency.retry_schedule_write(store, edit, stale)
+
+    assert seen == ["F", "Theirs"]
+    saved = store.get_schedule_df()
+    assert saved.at[0, "Presenter 1"] == "Ours"
+    assert saved.at[2, "Presenter 2"] == "Theirs"
+
+
+def test_retry_gives_up_after_the_last_attempt():
+    store = storage.MemoryStorage()
+    store.save_schedule_df(BASE)
+    saves = iter(range(10))
+
+    def edit(current):
+        # Someone else always saves between our read and our write
+        store.save_schedule_df(edited(current, 1, "Presenter 2", str(next(saves))))
+        return edited(current, 0, "Presenter 1", "Ours")
+
+    with pytest.raises(storage.ConflictError):
+        concurrency.retry_schedule_write(store, edit, attempts=2)
+    assert store.get_schedule_df().at[0, "Presenter 1"] == "A"
+
+
+def test_write_schedule_sends_only_the_rows_that_changed():
+    store = storage.MemoryStorage()
+    store.save_schedule_df(BASE)
+    current = store.get_schedule_df()
+
+    concurrency.write_schedule(
+        store, current, edited(current, 1, "Presenter 1", "X")
+    )
+    current = store.get_schedule_df()
+    concurrency.write_schedule(
+        store, current, current.drop(index=0).reset_index(drop=True)
+    )
+
+    assert store.calls["update_schedule_rows"] == 1
+    assert store.calls["delete_schedule_rows"] == 1
+    assert store.calls["save_schedule_df"] == 1  # the initial save
+    assert store.get_schedule_df()["Presenter 1"].tolist() == ["X", "E"]
@@ -0,0 +1,168 @@
+import pandas as pd
+
+import concurrency
+import event_log
+import storage
+
+
+def schedule(dates, presenters):
+    return pd.DataFrame(
+        {
+            "Date": dates,
+            "Presenter 1": presenters,
+            "Presenter 2": [f"{p}2" for p in presenters],
+        }
+    )
+
+
+def logged_store(tmp_path, df, compact_every=50):
+    inner = storage.SQLiteStorage(str(tmp_path / "db.sqlite"))
+    inner.save_schedule_df(df)
+    return event_log.EventLogStorage(inner, compact_every=compact_every)
+
+
+def rows_of(df):
+    return list(zip(df["Date"].astype(str), df["Presenter 1"]))
+
+
+def test_replay_keeps_rows_sharing_a_date(tmp_path):
+    store = logged_store(
+        tmp_path,
+        schedule(["2026-11-04", "2026-11-04", "2026-11-11"], ["A", "B", "C"]),
+    )
+    current = store.get_schedule_df()
+    edited = current.copy()
+    edited.loc[2, "Presenter 2"] = "Edited"
+    concurrency.write_schedule(store, current, edited)
+
+    expected = [("2026-11-04", "A"), ("2026-11-04", "B"), ("2026-11-11", "C")]
+    assert rows_of(store.get_schedule_df()) == expected
+    store.compact()
+    assert rows_of(store.inner.get_schedule_df()) == expected
+    assert store.get_schedule_df()["Presenter 2"].tolist() == ["A2", "B2", "Edited"]
+
+
+def test_replay_edits_and_deletes_the_right_same_date_row(tmp_path):
+    store = logged_store(
+        tmp_path,
+        schedule(["2026-11-04", "2026-11-04", "2026-11-04"], ["A", "B", "C"]),
+    )
+    current = store.get_schedule_df()
+    edited = current.copy()
+    edited.loc[1, "Presenter 1"] = "B'"
+    store.save_schedule_df(edited, expected_revision=current.attrs["revision"])
+    current = store.get_schedule_df()
+    store.save_schedule_df(
+        current.iloc[[2]], expected_revision=current.attrs["revision"]
+    )
+
+    assert rows_of(store.get_schedule_df()) == [("2026-11-04", "C")]
+    # The whole log replays to the same schedule
+    replayed = event_log.schedule_at(store, "9999")
+    assert rows_of(replayed) == [("2026-11-04", "C")]
+
+
+def test_compaction_after_every_event_keeps_duplicates(tmp_path):
+    store = logged_store(
+        tmp_path,
+        schedule(["2026-11-04", "2026-11-04"], ["A", "B"]),
+        compact_every=1,
+    )
+    for name in ["X", "Y"]:
+        current = store.get_schedule_df()
+        edited = current.copy()
+        edited.loc[1, "Presenter 1"] = name
+        concurrency.write_schedule(store, current, edited)
+
+    assert rows_of(store.inner.get_schedule_df()) == [
+        ("2026-11-04", "A"),
+        ("2026-11-04", "Y"),
+    ]
+
+
+def test_merge_schedule_pairs_same_date_rows_in_order():
+    base = schedule(["d1", "d1", "d2"], ["A", "B", "C"])
+    ours = base.copy()
+    ours.loc[1, "Presenter 1"] = "Ours"
+    theirs = base.copy()
+    theirs.loc[0, "Presenter 1"] = "Theirs"
+
+    merged, conflicts = concurrency.merge_schedule(base, ours, theirs)
+
+    assert merged["Presenter 1"].tolist() == ["Theirs", "Ours", "C"]
+    assert conflicts == []
+
+
+def edit_cell(store, position, column, value):
+    current = store.get_schedule_df()
+    edited = current.copy()
+    edited.loc[position, column] = value
+    concurrency.write_schedule(store, current, edited)
+
+
+def test_writes_append_events_instead_of_rewriting_the_snapshot(tmp_path):
+    store = logged_store(
+        tmp_path, schedule(["2026-11-04", "2026-11-11"], ["A", "B"])
+    )
+
+    with event_log.acting_as("tester"):
+        edit_cell(store, 1, "Presenter 1", "X")
+
+    assert rows_of(store.inner.get_schedule_df())[1] == ("2026-11-11", "B")
+    assert rows_of(store.get_schedule_df())[1] == ("2026-11-11", "X")
+    events = store.inner.get_schedule_events()
+    # The existing sheet is recorded once as the start of the log
+    assert {e["Actor"] for e in events} == {"import", "tester"}
+    last = events[-1]
+    assert (last["Date"], last["Role"], last["Old"], last["New"]) == (
+        "2026-11-11",
+        "Presenter 1",
+        "B",
+        "X",
+    )
+
+
+def test_compaction_writes_the_snapshot_and_reads_from_the_marker(tmp_path):
+    store = logged_store(
+        tmp_path, schedule(["2026-11-04", "2026-11-11"], ["A", "B"]), compact_every=3
+    )
+    for name in ["X", "Y", "Z"]:
+        edit_cell(store, 0, "Presenter 1", name)
+
+    assert rows_of(store.inner.get_schedule_df())[0] == ("2026-11-04", "Z")
+    events = store.inner.get_schedule_events()
+    assert events[-1]["Role"] == event_log.SNAPSHOT
+
+    edit_cell(store, 1, "Presenter 1", "W")
+    store.get_schedule_df()
+    # Only the log from the last marker on is read
+    assert store._marker == len(events) - 1
+    assert rows_of(store.get_schedule_df()) == [
+        ("2026-11-04", "Z"),
+        ("2026-11-11", "W"),
+    ]
+
+
+def test_schedule_at_replays_to_a_point_in_time(tmp_path):
+    store = logged_store(tmp_path, schedule(["2026-11-04"], ["A"]))
+    edit_cell(store, 0, "Presenter 1", "X")
+    later = ["2999-01-01T00:00:00+00:00", "later", "2026-11-04", "Presenter 1"]
+    store.inner.append_schedule_events(
+        [dict(zip(storage.EVENT_COLUMNS, later + ["X", "Y"]))]
+    )
+
+    assert rows_of(event_log.schedule_at(store, "2998")) == [("2026-11-04", "X")]
+    assert event_log.schedule_at(store, "2000").empty
+    assert rows_of(store.get_schedule_df()) == [("2026-11-04", "Y")]
+
+
+def test_row_events_add_and_delete_meetings():
+    base = schedule(["2026-11-04"], ["A"])
+    after = schedule(["2026-11-04", "2026-11-11"], ["A", "B"]).iloc[[1]]
+
+    events = event_log.schedule_events(base, after.reset_index(drop=True))
+
+    roles = [(e["Date"], e["Role"]) for e in events]
+    assert ("2026-11-11", event_log.ROW_ADDED) in roles
+    assert ("2026-11-04", event_log.ROW_DELETED) in roles
+    assert rows_of(event_log.replay(base, events)) == [("2026-11-11", "B")]
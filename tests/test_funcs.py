@@ -0,0 +1,18 @@
+import pandas as pd
+
+import funcs
+
+
+def test_merge_schedule_edits_matches_same_date_rows_in_order():
+    full = pd.DataFrame(
+        {"Date": ["d1", "d2", "d2", "d3"], "Presenter 1": ["a", "b", "c", "d"]}
+    )
+    edited = full.copy()
+    edited.loc[2, "Presenter 1"] = "Edited"
+    edited.loc[4] = ["d4", "e"]
+
+    merged, updated, inserted = funcs.merge_schedule_edits(full, edited)
+
+    assert merged["Presenter 1"].tolist() == ["a", "b", "Edited", "d", "e"]
+    assert updated == [2]
+    assert inserted == [4]
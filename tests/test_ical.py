@@ -0,0 +1,46 @@
+import datetime
+
+import pandas as pd
+
+import ical
+import schedule_model as sm
+
+
+def test_timed_events_are_utc_across_daylight_saving():
+    config = {"meeting_time": "14:00", "meeting_timezone": "America/Toronto"}
+
+    summer = ical.event_times(datetime.date(2025, 7, 2), config)
+    winter = ical.event_times(datetime.date(2025, 12, 3), config)
+
+    assert summer == ["DTSTART:20250702T180000Z", "DTEND:20250702T190000Z"]
+    assert winter == ["DTSTART:20251203T190000Z", "DTEND:20251203T200000Z"]
+
+
+def test_events_without_timezone_are_floating_or_all_day():
+    day = datetime.date(2025, 7, 2)
+
+    assert ical.event_times(day, {"meeting_time": "9:30"}) == [
+        "DTSTART:20250702T093000",
+        "DTEND:20250702T103000",
+    ]
+    assert ical.event_times(day, {}) == [
+        "DTSTART;VALUE=DATE:20250702",
+        "DTEND;VALUE=DATE:20250703",
+    ]
+
+
+def test_feeds_reference_no_undefined_timezone():
+    model = sm.ScheduleModel(
+        pd.DataFrame(
+            {"Date": ["2025-07-02"], "Presenter 1": ["A"], "Presenter 2": ["[P] B"]}
+        )
+    )
+    feeds = ical.CalendarFeeds(group="quantum")
+    feeds.update(
+        model, [], {"meeting_time": "14:00", "meeting_timezone": "Europe/Paris"}
+    )
+
+    body, _ = feeds.get()
+    assert "TZID" not in body
+    assert "DTSTART:20250702T120000Z" in body
+    assert "UID:2025-07-02@quantum.mlatml" in body
@@ -0,0 +1,129 @@
+import concurrent.futures
+import datetime
+import threading
+
+import pytest
+
+import jobs
+import storage
+
+# 2025-06-01 was a Sunday
+SUNDAY = datetime.datetime(2025, 6, 1, 9, 0)
+
+
+def minutes_of(expr):
+    return sorted(jobs.Cron(expr).minutes)
+
+
+def test_cron_ranges_steps_and_lists():
+    assert minutes_of("*/15 * * * *") == [0, 15, 30, 45]
+    assert minutes_of("10-30/10 * * * *") == [10, 20, 30]
+    assert minutes_of("5/20 * * * *") == [5, 25, 45]
+    assert minutes_of("1,2,40-42 * * * *") == [1, 2, 40, 41, 42]
+    assert jobs.Cron("0 9-17/4 * * *").hours == {9, 13, 17}
+
+
+def test_cron_weekday_7_is_sunday():
+    for expr in ["0 9 * * 0", "0 9 * * 7", "0 9 * * 5-7"]:
+        cron = jobs.Cron(expr)
+        assert cron.matches(SUNDAY)
+        assert not cron.matches(SUNDAY + datetime.timedelta(days=1))
+    assert jobs.Cron("0 9 * * 5-7").weekdays == {5, 6, 0}
+
+
+def test_cron_restricted_day_fields_match_either():
+    # The 15th of the month, or any Monday
+    cron = jobs.Cron("0 9 15 * 1")
+    assert cron.matches(datetime.datetime(2025, 6, 15, 9, 0))  # a Sunday
+    assert cron.matches(datetime.datetime(2025, 6, 2, 9, 0))  # a Monday
+    assert not cron.matches(datetime.datetime(2025, 6, 3, 9, 0))
+    # Only one restricted: both must hold
+    cron = jobs.Cron("0 9 */2 * *")
+    assert cron.matches(datetime.datetime(2025, 6, 3, 9, 0))
+    assert not cron.matches(datetime.datetime(2025, 6, 2, 9, 0))
+
+
+def test_cron_aliases_and_minute_matching():
+    cron = jobs.Cron("@weekly")
+    assert cron.matches(SUNDAY.replace(hour=0))
+    assert not cron.matches(SUNDAY.replace(hour=0, minute=1))
+    assert jobs.Cron(" @daily ").matches(datetime.datetime(2025, 6, 3))
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "* * * *",
+        "* * * * * *",
+        "60 * * * *",
+        "* 24 * * *",
+        "* * 0 * *",
+        "* * * 13 *",
+        "* * * * 8",
+        "30-10 * * * *",
+        "*/0 * * * *",
+        "x * * * *",
+    ],
+)
+def test_cron_rejects_bad_expressions(expr):
+    with pytest.raises(ValueError):
+        jobs.Cron(expr)
+
+
+def claim_concurrently(stores, key, workers=16):
+    barrier = threading.Barrier(workers)
+
+    def claim(i):
+        barrier.wait()
+        return stores[i % len(stores)].claim_job(key, f"owner-{i}")
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(claim, range(workers)))
+
+
+def test_sqlite_claim_job_has_one_winner_across_replicas(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    replicas = [storage.SQLiteStorage(path) for _ in range(4)]
+
+    results = claim_concurrently(replicas, "remind@2025-06-01T09:00")
+
+    assert results.count(True) == 1
+    # Later claims of the same key lose too, other keys are free
+    assert not replicas[0].claim_job("remind@2025-06-01T09:00", "late")
+    assert replicas[0].claim_job("remind@2025-06-01T09:01", "late")
+
+
+def test_memory_claim_job_has_one_winner():
+    results = claim_concurrently([storage.MemoryStorage()], "fill@2025-06-02T08:00")
+
+    assert results.count(True) == 1
+
+
+class FakeTenant:
+    name = "test"
+
+    def __init__(self, store, config):
+        self.storage = store
+        self.config = config
+
+    def get(self, key, default=None):
+        return self.config.get(key, default)
+
+
+def test_due_job_runs_once_across_schedulers(monkeypatch):
+    runs = []
+    monkeypatch.setattr(
+        jobs, "JOBS", {"remind": lambda tenant, today: runs.append(today) or 1}
+    )
+    store = storage.MemoryStorage()
+    config = {"jobs": {"remind": "0 9 * * *"}}
+    schedulers = [jobs.JobScheduler(FakeTenant(store, config)) for _ in range(3)]
+
+    futures = [s.tick(SUNDAY) for s in schedulers]
+    futures += [s.tick(SUNDAY + datetime.timedelta(minutes=1)) for s in schedulers]
+
+    started = [f["remind"] for f in futures if "remind" in f]
+    assert len(started) == 1
+    assert started[0].result() == 1
+    assert runs == [SUNDAY.date()]
+    assert sum(s.stats["remind"].skipped for s in schedulers) == 2
@@ -0,0 +1,77 @@
+import threading
+
+import pandas as pd
+
+import google_utils as gu
+import slide_pool
+
+
+class FakeDrive:
+    """The few Drive calls the pool makes, on a dict of files."""
+
+    def __init__(self, monkeypatch):
+        self.files = {}
+        self.lock = threading.Lock()
+        self.listed = 0
+        for name in ["list_files", "trash_file", "copy_template", "update_file"]:
+            monkeypatch.setattr(gu, name, getattr(self, name))
+        monkeypatch.setattr(gu, "share_presentation", lambda file_id: None)
+        monkeypatch.setattr(gu, "fill_placeholders", lambda *args: None)
+
+    def add(self, file_id, owner, created):
+        self.files[file_id] = {
+            "id": file_id,
+            "createdTime": created.isoformat(),
+            "appProperties": {"mlatml_pool": "tpl", "mlatml_owner": owner},
+            "trashed": False,
+        }
+
+    def list_files(self, query):
+        with self.lock:
+            self.listed += 1
+        return [dict(f) for f in self.files.values() if not f["trashed"]]
+
+    def trash_file(self, file_id):
+        self.files[file_id]["trashed"] = True
+
+    def update_file(self, file_id, body, fields=None):
+        self.files[file_id].update(body)
+        return dict(self.files[file_id])
+
+    def copy_template(self, template_id, name, folder_id=None, app_properties=None):
+        with self.lock:
+            file_id = f"copy{len(self.files)}"
+            owner = app_properties["mlatml_owner"]
+            self.add(file_id, owner, pd.Timestamp.now(tz="UTC"))
+        return file_id
+
+
+def test_first_refill_trashes_decks_of_earlier_processes_once(monkeypatch):
+    drive = FakeDrive(monkeypatch)
+    before = slide_pool._started - pd.Timedelta(minutes=5)
+    drive.add("gone", "old-process", before)
+    drive.add("sibling", "live-process", pd.Timestamp.now(tz="UTC"))
+    pool = slide_pool.SlidePool("tpl", max_size=2)
+
+    threads = [threading.Thread(target=pool._refill, args=(2,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert drive.listed == 1
+    assert drive.files["gone"]["trashed"]
+    assert not drive.files["sibling"]["trashed"]
+
+
+def test_take_skips_a_deck_trashed_by_another_replica(monkeypatch):
+    drive = FakeDrive(monkeypatch)
+    pool = slide_pool.SlidePool("tpl", max_size=2)
+    pool._refill(2)
+    first, second = list(pool._decks)
+    drive.trash_file(first)
+
+    taken = pool.take("2025-06-04", "A", "B")
+
+    assert taken[0] == second
+    assert pool.take("2025-06-04", "A", "B") is None
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+import concurrency
+import storage
+
+
+def schedule(dates):
+    return pd.DataFrame(
+        {
+            "Date": dates,
+            "Presenter 1": [f"A{i}" for i in range(len(dates))],
+            "Presenter 2": [f"B{i}" for i in range(len(dates))],
+        }
+    )
+
+
+def dates_of(store):
+    return store.get_schedule_df()["Date"].astype(str).tolist()
+
+
+def test_sqlite_update_after_delete(tmp_path):
+    store = storage.SQLiteStorage(str(tmp_path / "db.sqlite"))
+    dates = ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"]
+    store.save_schedule_df(schedule(dates))
+
+    current = store.get_schedule_df()
+    concurrency.write_schedule(store, current, current.drop(index=1))
+
+    assert dates_of(store) == ["2025-01-01", "2025-01-03", "2025-01-04"]
+    current = store.get_schedule_df()
+    edited = current.copy()
+    edited.loc[1, "Presenter 1"] = "Edited"
+    concurrency.write_schedule(store, current, edited)
+
+    saved = store.get_schedule_df()
+    assert dates_of(store) == ["2025-01-01", "2025-01-03", "2025-01-04"]
+    assert saved["Presenter 1"].tolist() == ["A0", "Edited", "A3"]
+
+    # Inserts land after the remaining rows
+    edited = pd.concat([saved, schedule(["2025-01-05"])], ignore_index=True)
+    concurrency.write_schedule(store, saved, edited)
+    assert dates_of(store)[-2:] == ["2025-01-04", "2025-01-05"]
+
+
+def test_sqlite_row_edits_before_any_save(tmp_path):
+    store = storage.SQLiteStorage(str(tmp_path / "db.sqlite"))
+    store.delete_schedule_rows(["2025-01-01"])
+
+    df = schedule(["2025-01-01", "2025-01-02"])
+    store.update_schedule_rows(df, inserted_positions=[0, 1])
+
+    assert dates_of(store) == ["2025-01-01", "2025-01-02"]
+    assert store.get_schedule_df()["Presenter 2"].tolist() == ["B0", "B1"]
+
+
+def test_sqlite_closes_its_connections(tmp_path, monkeypatch):
+    opened = []
+    connect = storage.sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        opened.append(connect(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(storage.sqlite3, "connect", tracking_connect)
+    store = storage.SQLiteStorage(str(tmp_path / "db.sqlite"))
+    store.save_schedule_df(schedule(["2025-01-01"]))
+    store.get_schedule_df()
+
+    assert len(opened) == 3
+    for conn in opened:
+        with pytest.raises(storage.sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
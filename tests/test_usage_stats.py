@@ -0,0 +1,82 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import schedule_model as sm
+import usage_stats
+
+TODAY = datetime.date(2025, 6, 4)
+
+
+def model(rows):
+    dates, first, second = zip(*rows)
+    return sm.ScheduleModel(
+        pd.DataFrame(
+            {"Date": dates, "Presenter 1": first, "Presenter 2": second}
+        )
+    )
+
+
+def scan(m, window_days, half_life_days):
+    # The full rescan the aggregates replace
+    weights = usage_stats.usage_weights(m.dates, window_days, half_life_days, TODAY)
+    usage = {}
+    for role in m.roles:
+        presenting = m.status[role].isin(sm.PRESENTING).to_numpy()
+        for name, weight in zip(m.names[role][presenting], weights[presenting]):
+            usage[name] = usage.get(name, 0) + weight
+    return usage
+
+
+SCHEDULE = [
+    ("2024-01-03", "A", "B"),
+    ("2024-09-04", "[P] A", "C"),
+    ("2025-03-05", "B", "[R] C"),
+    ("2025-05-28", "C", "EMPTY"),
+    ("2025-06-11", "[P] B", "A"),
+    ("bad date", "A", "A"),
+]
+
+
+@pytest.mark.parametrize("window_days", [90, 150, 365, None])
+@pytest.mark.parametrize("half_life_days", [None, 30, 180])
+def test_counts_match_a_full_scan(window_days, half_life_days):
+    aggregates = usage_stats.UsageAggregates()
+    m = model(SCHEDULE)
+    aggregates.sync(m)
+
+    counts = aggregates.counts(window_days, half_life_days, as_of=TODAY)
+
+    expected = scan(m, window_days, half_life_days)
+    assert counts.keys() == expected.keys()
+    for name in expected:
+        assert counts[name] == pytest.approx(expected[name])
+
+
+def test_sync_applies_only_the_differences():
+    aggregates = usage_stats.UsageAggregates()
+    aggregates.sync(model(SCHEDULE))
+    edited = list(SCHEDULE)
+    edited[1] = ("2024-09-04", "EMPTY", "C")  # A's invitation withdrawn
+    edited.append(("2025-06-18", "A", "D"))  # a new meeting date
+    m = model(edited)
+
+    aggregates.sync(m)
+
+    counts = aggregates.counts(None, as_of=TODAY)
+    assert counts == pytest.approx(scan(m, None, None))
+    assert counts["A"] == 3 and counts["D"] == 1
+
+
+def test_decay_halves_per_half_life_and_future_counts_fully():
+    aggregates = usage_stats.UsageAggregates()
+    aggregates.sync(
+        model([("2025-05-05", "A", "B"), ("2025-06-24", "B", "EMPTY")])
+    )
+
+    counts = aggregates.counts(None, half_life_days=30, as_of=TODAY)
+
+    assert counts["A"] == pytest.approx(np.exp2(-30 / 30))
+    assert counts["B"] == pytest.approx(0.5 + 1)
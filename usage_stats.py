@@ -0,0 +1,152 @@
+import collections
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+
+import schedule_model as sm
+
+###############################################################################
+# Usage Aggregates
+###############################################################################
+# How much each participant presented, over any window or with any decay
+# half-life, without rescanning the schedule. Per participant we keep a
+# cumulative count per distinct meeting date (a prefix sum), so a window
+# [as_of - window_days, ...) is one subtraction per participant. A decayed
+# count weighs a presentation `age` days old by 2 ** (-age / half_life);
+# scheduled (future) presentations count fully, like they do in the window.
+# Cells are added and removed incrementally via sync().
+
+DEFAULT_WINDOW_DAYS = 150  # ~5 months
+WINDOW_OPTIONS = {
+    "3 months": 90,
+    "5 months": 150,
+    "1 year": 365,
+    "All time": None,
+}
+HALF_LIFE_OPTIONS = {
+    "No decay": None,
+    "1 month": 30,
+    "3 months": 90,
+    "6 months": 180,
+}
+
+
+def usage_weights(
+    dates, window_days=DEFAULT_WINDOW_DAYS, half_life_days=None, as_of=None
+):
+    """Weight of one presentation on each of `dates` (NaT weighs 0).
+
+    Without a half-life this is 1 inside the window and 0 outside; with one it
+    decays with age (future dates weigh 1) and the window still applies if set.
+    """
+    as_of = pd.Timestamp(as_of or datetime.date.today())
+    dates = pd.to_datetime(pd.Series(dates), errors="coerce")
+    age = (as_of - dates).dt.days.to_numpy(dtype=float)
+    weights = np.where(np.isnan(age), 0.0, 1.0)
+    if window_days is not None:
+        weights[~(age <= window_days)] = 0.0
+    if half_life_days:
+        weights *= np.exp2(-np.clip(np.nan_to_num(age), 0, None) / half_life_days)
+    return weights
+
+
+class UsageAggregates:
+    def __init__(self, statuses=sm.PRESENTING):
+        self.statuses = list(statuses)
+        self.version = None
+        self._lock = threading.Lock()
+        self._events = collections.Counter()  # (name, day ordinal) -> count
+        self._names = {}  # name -> row
+        self._days = np.zeros(0, dtype=np.int64)  # sorted distinct ordinals
+        self._cumulative = np.zeros((0, 0), dtype=np.int64)
+        self._decayed = {}  # half-life -> cumulative sums of 2 ** (day / half-life)
+
+    def sync(self, model):
+        """Bring the counters in line with `model`, applying only the differences."""
+        with self._lock:
+            if model.version == self.version:
+                return
+            cells = model.cells(self.statuses)
+            cells = cells[cells["date"].notna()]
+            events = collections.Counter(
+                zip(
+                    cells["name"].astype(str),
+                    cells["date"].map(pd.Timestamp.toordinal),
+                )
+            )
+            changes = events.copy()
+            changes.subtract(self._events)
+            for (name, day), delta in changes.items():
+                if delta:
+                    self._add(name, day, delta)
+            self._events = events
+            self.version = model.version
+
+    def _add(self, name, day, delta):
+        # Caller holds the lock
+        if name not in self._names:
+            self._names[name] = len(self._names)
+            self._cumulative = np.vstack(
+                [self._cumulative, np.zeros((1, len(self._days)), dtype=np.int64)]
+            )
+            self._decayed.clear()
+        k = np.searchsorted(self._days, day)
+        if k == len(self._days) or self._days[k] != day:
+            # New meeting date: a column carrying the previous cumulative sums
+            self._days = np.insert(self._days, k, day)
+            previous = self._cumulative[:, k - 1] if k else 0
+            self._cumulative = np.insert(self._cumulative, k, previous, axis=1)
+            # Decayed sums are scaled to the latest date; rebuild them on demand
+            self._decayed.clear()
+        row = self._names[name]
+        self._cumulative[row, k:] += delta
+        for half_life, sums in self._decayed.items():
+            sums[row, k:] += delta * np.exp2(self._scaled(day, half_life))
+
+    def _scaled(self, days, half_life):
+        # Exponents are taken relative to the latest date so they never overflow
+        latest = self._days[-1] if len(self._days) else 0
+        return (np.asarray(days) - latest) / half_life
+
+    def _decayed_sums(self, half_life):
+        sums = self._decayed.get(half_life)
+        if sums is None:
+            per_day = np.diff(self._cumulative, axis=1, prepend=0)
+            scale = np.exp2(self._scaled(self._days, half_life))
+            sums = np.cumsum(per_day * scale, axis=1)
+            self._decayed[half_life] = sums
+        return sums
+
+    def counts(
+        self, window_days=DEFAULT_WINDOW_DAYS, half_life_days=None, as_of=None
+    ):
+        """{name: usage} for every participant seen, in O(participants)."""
+        as_of = (as_of or datetime.date.today()).toordinal()
+        with self._lock:
+            names = list(self._names)
+            if not len(self._days):
+                return dict.fromkeys(names, 0)
+            totals = self._cumulative[:, -1]
+
+            def before(day):
+                # Cumulative value just before `day`
+                k = np.searchsorted(self._days, day)
+                return self._cumulative[:, k - 1] if k else np.zeros(len(names))
+
+            if not half_life_days:
+                start = -np.inf if window_days is None else as_of - window_days
+                values = totals - before(start)
+            else:
+                # Future presentations count fully, past ones decay with age
+                k = np.searchsorted(self._days, as_of + 1)
+                future = totals - (self._cumulative[:, k - 1] if k else 0)
+                sums = self._decayed_sums(half_life_days)
+                past = sums[:, k - 1] if k else np.zeros(len(names))
+                if window_days is not None:
+                    j = np.searchsorted(self._days, as_of - window_days)
+                    past = past - (sums[:, j - 1] if j else 0.0)
+                latest = self._days[-1]
+                values = future + past * np.exp2((latest - as_of) / half_life_days)
+        return dict(zip(names, np.asarray(values).tolist()))
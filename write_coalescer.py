@@ -0,0 +1,107 @@
+import concurrent.futures
+import threading
+import time
+
+import concurrency
+import event_log
+import schedule_model as sm
+from storage import ConflictError
+
+###############################################################################
+# Write Coalescing
+###############################################################################
+# After a confirmation batch goes out many presenters answer within minutes.
+# Instead of one schedule save per click, cell updates from every session are
+# queued and applied together: one read and one batched row update per
+# `window` seconds. Each caller gets a Future that resolves once its cell is
+# saved, or fails with ConflictError if its update no longer applies.
+# Optional config:
+#   [storage]
+#   write_window_ms = 500
+
+DEFAULT_WINDOW = 0.5
+
+
+class WriteCoalescer:
+    def __init__(self, store, window=DEFAULT_WINDOW):
+        self.store = store
+        self.window = window
+        self.flushes = 0
+        self._pending = []  # (date, column, update, future)
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, date, column, update):
+        """Queue `update(cell) -> new cell` for the cell at (date, column).
+
+        `update` runs against the latest saved value and may raise
+        ConflictError to reject the change. Returns a Future.
+        """
+        future = concurrent.futures.Future()
+        with self._cond:
+            self._pending.append((date, column, update, future))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="write-coalescer", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let the other clicks of the burst join this batch
+            time.sleep(self.window)
+            with self._cond:
+                batch, self._pending = self._pending, []
+            self.flush(batch)
+
+    def flush(self, batch):
+        accepted = []
+
+        def apply(current):
+            model = sm.ScheduleModel(current)
+            new = model.frame.copy()
+            dates = model.dates.dt.date
+            accepted.clear()
+            for date, column, update, future in batch:
+                if future.done():
+                    continue
+                rows = new.index[dates == date]
+                try:
+                    if rows.empty or column not in model.roles:
+                        raise ConflictError(f"No {column} slot on {date}")
+                    new.at[rows[0], column] = update(new.at[rows[0], column])
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                accepted.append(future)
+            return new
+
+        try:
+            with event_log.acting_as("confirmation"):
+                concurrency.retry_schedule_write(self.store, apply)
+        except Exception as e:
+            for future in accepted:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.flushes += 1
+        for future in accepted:
+            future.set_result(True)
+
+
+_coalescers = {}
+_coalescers_lock = threading.Lock()
+
+
+def get_coalescer(store, window=DEFAULT_WINDOW):
+    """The shared coalescer for `store` (one per backend instance)."""
+    with _coalescers_lock:
+        coalescer = _coalescers.get(id(store))
+        if coalescer is None or coalescer.store is not store:
+            coalescer = _coalescers[id(store)] = WriteCoalescer(store, window)
+        return coalescer